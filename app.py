@@ -1,10 +1,17 @@
 import streamlit as st
-import tempfile
+import hashlib
 import os
+import time
+import shutil
 from io import BytesIO
 from dataclasses import dataclass
 from typing import Optional
 
+# Uploads, caches and outputs of web translations, one directory per job;
+# finished jobs are removed, stopped or failed ones are kept for a week
+WEB_JOBS_DIR = os.path.join("translation_cache", "web")
+WEB_JOB_MAX_AGE = 7 * 24 * 3600
+
 # Page config must be first Streamlit command
 st.set_page_config(
     page_title="PDF Translator",
@@ -20,13 +27,44 @@ class TranslationConfig:
     source_lang: str
     target_lang: str
     model: str = "gpt-4o-mini"
+    text_model: Optional[str] = None
+    image_model: Optional[str] = None
+    escalation_model: Optional[str] = None
+    model_limits: Optional[str] = None
     output: Optional[str] = None
     format: str = "both"
     resume: bool = False
     output_dir: str = "translation_cache"
     dpi: int = 200
+    crop_margins: bool = False
+    split_dense: bool = False
+    max_tiles: int = 6
+    dense_threshold: int = 2500
+    adaptive_dpi: bool = False
+    min_dpi: int = 100
+    max_dpi: int = 300
+    pixel_budget: Optional[int] = None
     workers: int = 3
+    adaptive_workers: bool = False
+    min_workers: int = 1
+    max_workers: int = 16
+    schedule: str = "largest-first"
+    request_timeout: float = 300.0
+    connect_timeout: float = 10.0
+    read_timeout: Optional[float] = None
+    hedge: bool = False
+    hedge_factor: float = 1.5
+    retry_attempts: int = 2
+    retry_workers: int = 1
+    retry_delay: float = 30.0
+    precheck: bool = False
+    profile: bool = False
+    max_memory: Optional[str] = None
+    text_mode: str = "auto"
+    text_cleanup: bool = True
     sleep: float = 0.5
+    stream: bool = False
+    structured_output: bool = False
 
 
 # Common languages
@@ -60,6 +98,12 @@ def main():
             help="More workers = faster, but higher API usage"
         )
         
+        adaptive_workers = st.checkbox(
+            "Adaptive Concurrency",
+            value=False,
+            help="Start at the worker count above and adjust it to the API's rate limits"
+        )
+        
         dpi = st.slider(
             "Image DPI",
             min_value=100,
@@ -68,11 +112,29 @@ def main():
             help="Higher DPI = better quality for scanned PDFs"
         )
         
+        adaptive_dpi = st.checkbox(
+            "Adaptive DPI",
+            value=False,
+            help="Pick the resolution per page from its size and text height (ignores Image DPI)"
+        )
+        
+        crop_margins = st.checkbox(
+            "Crop Margins",
+            value=False,
+            help="Send only the content area of scanned pages (faster, cheaper)"
+        )
+        
         output_format = st.selectbox(
             "Output Format",
             ["both", "docx", "pdf"],
             help="Choose output file format(s)"
         )
+        
+        stream = st.checkbox(
+            "Stream Output",
+            value=True,
+            help="Show each page's translation as it is generated"
+        )
     
     # Main content
     col1, col2 = st.columns(2)
@@ -102,6 +164,9 @@ def main():
         st.success(f"Uploaded: {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
         
         # Translate button
+        if st.session_state.get("stop_translation"):
+            st.warning("Translation stopped. Finished pages are cached; translate again to resume.")
+
         if st.button("🚀 Translate", type="primary", use_container_width=True):
             translate_document(
                 uploaded_file=uploaded_file,
@@ -110,121 +175,175 @@ def main():
                 model=model,
                 workers=workers,
                 dpi=dpi,
-                output_format=output_format
+                output_format=output_format,
+                stream=stream,
+                crop_margins=crop_margins,
+                adaptive_workers=adaptive_workers,
+                adaptive_dpi=adaptive_dpi
             )
 
 
-def translate_document(uploaded_file, source_lang, target_lang, model, workers, dpi, output_format):
+def remove_stale_jobs(max_age: float = WEB_JOB_MAX_AGE):
+    """Delete web job directories whose files have not changed for max_age seconds."""
+    if not os.path.isdir(WEB_JOBS_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(WEB_JOBS_DIR):
+        job_dir = os.path.join(WEB_JOBS_DIR, name)
+        mtimes = [
+            os.path.getmtime(os.path.join(root, f))
+            for root, _, files in os.walk(job_dir) for f in files
+        ]
+        if max(mtimes, default=0) < cutoff:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def translate_document(uploaded_file, source_lang, target_lang, model, workers, dpi, output_format,
+                       stream=False, crop_margins=False, adaptive_workers=False, adaptive_dpi=False):
     """Run the translation pipeline with progress updates."""
     
     # Import here to avoid circular imports and slow startup
-    from pipeline import run_translation_pipeline
+    from events import iter_pipeline_events, PartialText, PageDone, PageFailed, JobDone
+    from utils.cancellation import CancellationToken
+    
+    # Work directory per upload and settings, kept between runs so a stopped
+    # or failed translation resumes from the cached pages
+    remove_stale_jobs()
+    data = uploaded_file.getvalue()
+    job_key = hashlib.sha256(data + f"|{source_lang}|{target_lang}|{model}".encode("utf-8")).hexdigest()[:16]
+    job_dir = os.path.join(WEB_JOBS_DIR, job_key)
+    os.makedirs(job_dir, exist_ok=True)
     
-    # Create temp directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Save uploaded file
-        pdf_path = os.path.join(temp_dir, uploaded_file.name)
+    # Save uploaded file
+    pdf_path = os.path.join(job_dir, uploaded_file.name)
+    if not os.path.exists(pdf_path):
         with open(pdf_path, "wb") as f:
-            f.write(uploaded_file.getvalue())
-        
-        # Output paths
-        base_name = os.path.splitext(uploaded_file.name)[0]
-        output_docx = os.path.join(temp_dir, f"{base_name}_translated.docx")
-        output_pdf = os.path.join(temp_dir, f"{base_name}_translated.pdf")
-        
-        # Create config
-        config = TranslationConfig(
-            pdf=pdf_path,
-            source_lang=source_lang,
-            target_lang=target_lang,
-            model=model,
-            output=os.path.join(temp_dir, f"{base_name}_translated"),
-            format=output_format,
-            output_dir=os.path.join(temp_dir, "cache"),
-            dpi=dpi,
-            workers=workers
-        )
+            f.write(data)
+    
+    # Output paths
+    base_name = os.path.splitext(uploaded_file.name)[0]
+    output_docx = os.path.join(job_dir, f"{base_name}_translated.docx")
+    output_pdf = os.path.join(job_dir, f"{base_name}_translated.pdf")
+    
+    # Create config
+    config = TranslationConfig(
+        pdf=pdf_path,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        model=model,
+        output=os.path.join(job_dir, f"{base_name}_translated"),
+        format=output_format,
+        output_dir=os.path.join(job_dir, "cache"),
+        resume=True,
+        dpi=dpi,
+        crop_margins=crop_margins,
+        adaptive_dpi=adaptive_dpi,
+        workers=workers,
+        adaptive_workers=adaptive_workers,
+        stream=stream
+    )
+    
+    # Progress tracking
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    partial_text = st.empty()
+    
+    # Clicking Stop reruns the script, which interrupts the event loop
+    # below; the finally block then cancels the pipeline
+    st.button("⏹ Stop", key="stop_translation")
+    cancel_token = CancellationToken()
+    
+    # Run translation; events are consumed here, in the Streamlit script
+    # thread, so widgets are only updated from that thread
+    try:
+        results = {}
+        complete = False
+        with st.spinner("Loading and analyzing PDF..."):
+            for event in iter_pipeline_events(config, cancel_token=cancel_token):
+                if isinstance(event, PartialText):
+                    # Plain text, not a widget: it is redrawn many times per page
+                    partial_text.text(
+                        f"Page {event.page_num} (in progress)\n\n"
+                        f"{event.translated or event.original}"
+                    )
+                elif isinstance(event, PageDone):
+                    progress_bar.progress(event.completed / event.total_pages)
+                    status_text.info(f"Translated page {event.page_num} of {event.total_pages}")
+                elif isinstance(event, PageFailed):
+                    status_text.warning(f"Page {event.page_num}: Error - {event.error}")
+                elif isinstance(event, JobDone):
+                    results = event.results
+                    complete = not event.summary.get("cancelled") and not event.summary.get("failed_pages")
         
-        # Progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def update_progress(completed, total, result):
-            progress = completed / total
-            progress_bar.progress(progress)
-            
-            if "error" in result:
-                status_text.warning(f"Page {result['page_num']}: Error - {result['error']}")
-            else:
-                status_text.info(f"Translated page {result['page_num']} of {total}")
-        
-        # Run translation
-        try:
-            with st.spinner("Loading and analyzing PDF..."):
-                results = run_translation_pipeline(config, progress_callback=update_progress)
-            
-            progress_bar.progress(1.0)
-            status_text.success(f"✅ Translation complete! {len(results)} pages processed.")
-            
-            # Download buttons
-            st.markdown("### 📥 Download Results")
-            
-            col1, col2 = st.columns(2)
-            
-            if output_format in ("docx", "both") and os.path.exists(output_docx):
-                with open(output_docx, "rb") as f:
-                    docx_data = f.read()
-                col1.download_button(
-                    label="📄 Download DOCX",
-                    data=docx_data,
-                    file_name=f"{base_name}_translated.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    use_container_width=True
-                )
-            
-            if output_format in ("pdf", "both") and os.path.exists(output_pdf):
-                with open(output_pdf, "rb") as f:
-                    pdf_data = f.read()
-                col2.download_button(
-                    label="📕 Download PDF",
-                    data=pdf_data,
-                    file_name=f"{base_name}_translated.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
+        progress_bar.progress(1.0)
+        partial_text.empty()
+        status_text.success(f"✅ Translation complete! {len(results)} pages processed.")
+        
+        # Download buttons
+        st.markdown("### 📥 Download Results")
+        
+        col1, col2 = st.columns(2)
+        
+        if output_format in ("docx", "both") and os.path.exists(output_docx):
+            with open(output_docx, "rb") as f:
+                docx_data = f.read()
+            col1.download_button(
+                label="📄 Download DOCX",
+                data=docx_data,
+                file_name=f"{base_name}_translated.docx",
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                use_container_width=True
+            )
+        
+        if output_format in ("pdf", "both") and os.path.exists(output_pdf):
+            with open(output_pdf, "rb") as f:
+                pdf_data = f.read()
+            col2.download_button(
+                label="📕 Download PDF",
+                data=pdf_data,
+                file_name=f"{base_name}_translated.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+        
+        # The downloads are held in memory; only unfinished jobs are kept to resume
+        if complete:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        
+        # Preview section
+        if results:
+            with st.expander("👀 Preview Translation", expanded=True):
+                page_nums = sorted([int(k) for k in results.keys()])
+                selected_page = st.selectbox(
+                    "Select page to preview",
+                    page_nums,
+                    format_func=lambda x: f"Page {x}"
                 )
-            
-            # Preview section
-            if results:
-                with st.expander("👀 Preview Translation", expanded=True):
-                    page_nums = sorted([int(k) for k in results.keys()])
-                    selected_page = st.selectbox(
-                        "Select page to preview",
-                        page_nums,
-                        format_func=lambda x: f"Page {x}"
+                
+                if selected_page:
+                    page_data = results[str(selected_page)]
+                    
+                    st.markdown(f"**Original ({source_lang}):**")
+                    st.text_area(
+                        "Original",
+                        page_data.get("original", ""),
+                        height=200,
+                        label_visibility="collapsed"
+                    )
+                    
+                    st.markdown(f"**Translation ({target_lang}):**")
+                    st.text_area(
+                        "Translation",
+                        page_data.get("translated", ""),
+                        height=200,
+                        label_visibility="collapsed"
                     )
                     
-                    if selected_page:
-                        page_data = results[str(selected_page)]
-                        
-                        st.markdown(f"**Original ({source_lang}):**")
-                        st.text_area(
-                            "Original",
-                            page_data.get("original", ""),
-                            height=200,
-                            label_visibility="collapsed"
-                        )
-                        
-                        st.markdown(f"**Translation ({target_lang}):**")
-                        st.text_area(
-                            "Translation",
-                            page_data.get("translated", ""),
-                            height=200,
-                            label_visibility="collapsed"
-                        )
-                        
-        except Exception as e:
-            st.error(f"❌ Translation failed: {str(e)}")
-            st.exception(e)
+    except Exception as e:
+        st.error(f"❌ Translation failed: {str(e)}")
+        st.exception(e)
+    finally:
+        cancel_token.cancel()  # no-op once the pipeline has finished
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+"""
+Microbenchmarks for the CPU-bound parts of the pipeline: page analysis,
+rendering, image encoding and the DOCX/PDF exporters.
+
+Inputs are synthetic and reproducible (seeded), so results are comparable
+between runs. No API key or network access is needed.
+
+Usage:
+    python -m benchmarks.run                     # run and compare with the baseline
+    python -m benchmarks.run --quick             # 10x smaller inputs
+    python -m benchmarks.run --save-baseline     # store the results as the new baseline
+    python -m benchmarks.run --only docx --threshold 0.3
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import platform
+import tempfile
+import tracemalloc
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loader.image_loader import analyze_pdf_page, render_page_to_image
+from exporter.docx_exporter import create_bilingual_docx
+from exporter.pdf_exporter import create_bilingual_pdf
+from utils.images import encode_image_to_base64
+from benchmarks.synthetic import cached_pdf, make_pages, FONT_PATH
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, "data")
+
+# Time differences below this are treated as noise
+MIN_SECONDS_DELTA = 0.005
+
+
+class Benchmark:
+    """A named function to time; setup runs once, outside the measurement."""
+
+    def __init__(self, name: str, setup: Callable[[], object], run: Callable[[object], None]):
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+
+def _analyze_all(path: str) -> Callable[[object], None]:
+    def run(_):
+        with fitz.open(path) as doc:
+            for page in doc:
+                analyze_pdf_page(page)
+    return run
+
+
+def _open(path: str) -> Callable[[], object]:
+    def setup():
+        return fitz.open(path)
+    return setup
+
+
+def _render_all(pages: int, dpi: int = 200) -> Callable[[object], None]:
+    def run(doc):
+        for i in range(pages):
+            render_page_to_image(doc[i], dpi=dpi)
+    return run
+
+
+def _encode_setup(path: str, pages: int) -> Callable[[], object]:
+    def setup():
+        with fitz.open(path) as doc:
+            return [render_page_to_image(doc[i], dpi=200) for i in range(pages)]
+    return setup
+
+
+def _encode_all(images: list):
+    for img in images:
+        encode_image_to_base64(img)
+
+
+def _export(exporter: Callable, suffix: str, **kwargs) -> Callable[[object], None]:
+    def run(pages):
+        # Exporters print the output path; keep the report readable
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            exporter(pages, os.path.join(tmp, f"out{suffix}"), "Source", "Target", **kwargs)
+    return run
+
+
+def build_benchmarks(scale: float, data_dir: str) -> List[Benchmark]:
+    """All benchmarks, with input sizes multiplied by scale."""
+    def n(count: int) -> int:
+        return max(1, int(count * scale))
+
+    text_pages, scan_pages, render_pages, encode_pages, export_pages = n(1000), n(200), n(20), n(10), n(300)
+    benchmarks = []
+
+    for script in ("latin", "cyrillic", "cjk"):
+        path = cached_pdf(data_dir, "text", text_pages, script)
+        benchmarks.append(Benchmark(f"analyze_pdf_page[text-{script}-{text_pages}]", lambda: None, _analyze_all(path)))
+
+    scan_path = cached_pdf(data_dir, "scan", scan_pages)
+    benchmarks += [
+        Benchmark(f"analyze_pdf_page[scan-{scan_pages}]", lambda: None, _analyze_all(scan_path)),
+        Benchmark(f"render_page_to_image[scan-{render_pages}@200dpi]",
+                  _open(scan_path), _render_all(render_pages)),
+        Benchmark(f"encode_image_to_base64[scan-{encode_pages}@200dpi]",
+                  _encode_setup(scan_path, encode_pages), _encode_all),
+    ]
+
+    for script in ("latin", "cyrillic", "cjk"):
+        pages = make_pages(export_pages, script)
+        benchmarks += [
+            Benchmark(f"create_bilingual_docx[{script}-{export_pages}]",
+                      lambda pages=pages: pages, _export(create_bilingual_docx, ".docx")),
+            Benchmark(f"create_bilingual_pdf[{script}-{export_pages}]",
+                      lambda pages=pages: pages, _export(create_bilingual_pdf, ".pdf", font_path=FONT_PATH)),
+        ]
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict:
+    """
+    Time a benchmark and measure its peak Python heap allocation.
+
+    Timing uses the best of repeat runs; memory is measured in a separate
+    run, since tracemalloc slows allocation-heavy code down. Memory held by
+    C libraries (MuPDF pixmaps) is not seen by tracemalloc.
+    """
+    state = benchmark.setup()
+    benchmark.run(state)  # warm-up: fonts, lazy imports, OS file cache
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark.run(state)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        benchmark.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if isinstance(state, fitz.Document):
+        state.close()
+
+    times.sort()
+    return {
+        "seconds": round(times[0], 4),
+        "median_seconds": round(times[len(times) // 2], 4),
+        "peak_kb": round(peak / 1024),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Regressions of results against baseline results.
+
+    A benchmark regresses when its best time or peak memory exceeds the
+    baseline by more than threshold (a fraction, 0.2 = 20%).
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        seconds_limit = base["seconds"] * (1 + threshold)
+        if result["seconds"] > seconds_limit and result["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append(f"{name}: {result['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+        if result["peak_kb"] > base["peak_kb"] * (1 + threshold) and result["peak_kb"] - base["peak_kb"] > 64:
+            regressions.append(f"{name}: peak {result['peak_kb']} KB vs baseline {base['peak_kb']} KB")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the loader and exporters on synthetic PDFs")
+    parser.add_argument("--quick", action="store_true", help="Use 10x smaller inputs")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (best is kept)")
+    parser.add_argument("--only", default=None, help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown / memory growth over the baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where generated PDFs are kept")
+    args = parser.parse_args(argv)
+
+    scale = 0.1 if args.quick else 1.0
+    benchmarks = [b for b in build_benchmarks(scale, args.data_dir) if not args.only or args.only in b.name]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = result = measure(benchmark, args.repeat)
+        base = baseline.get(benchmark.name)
+        change = f"  ({result['seconds'] / base['seconds'] - 1:+.0%})" if base and base["seconds"] else ""
+        print(f"{benchmark.name:<52} {result['seconds']:>8.3f}s  {result['peak_kb']:>8} KB{change}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pymupdf": fitz.VersionBind,
+        "quick": args.quick,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        # Keep entries of benchmarks that were not run (--only)
+        report["results"] = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("No baseline to compare with; create one with --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No regressions (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
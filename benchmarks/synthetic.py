@@ -0,0 +1,119 @@
+import os
+import random
+from io import BytesIO
+from typing import List
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+import fitz  # PyMuPDF
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "DejaVuSans.ttf")
+
+# Character pools per script; words are drawn from them with a seeded RNG
+_ALPHABETS = {
+    "latin": "abcdefghijklmnopqrstuvwxyzäöüß",
+    "cyrillic": "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+    "cjk": "的一是不了人我在有他这为之大来以个中上们到说国和地也子时道出而要于就下得可你年生会自着去之过家学对",
+}
+
+
+def synthetic_text(rng: random.Random, script: str = "latin", words: int = 350) -> str:
+    """Reproducible pseudo-text in a script, with sentences and paragraphs."""
+    alphabet = _ALPHABETS[script]
+    sentences = []
+    sentence = []
+    for i in range(words):
+        if script == "cjk":
+            word = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+        else:
+            word = "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 10)))
+        sentence.append(word)
+        if rng.random() < 0.08 or i == words - 1:
+            sep = "" if script == "cjk" else " "
+            end = "。" if script == "cjk" else "."
+            text = sep.join(sentence) + end
+            sentences.append(text[0].upper() + text[1:])
+            sentence = []
+
+    paragraphs = []
+    while sentences:
+        take = rng.randint(3, 6)
+        paragraphs.append(("" if script == "cjk" else " ").join(sentences[:take]))
+        sentences = sentences[take:]
+    return "\n\n".join(paragraphs)
+
+
+def make_text_pdf(path: str, pages: int, script: str = "latin", seed: int = 0) -> str:
+    """Write a PDF of text pages (extractable text layer) in the given script."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        rect = page.rect + (56, 56, -56, -56)
+        if script == "cjk":
+            page.insert_textbox(rect, synthetic_text(rng, script, 250), fontname="china-s", fontsize=10)
+        else:
+            page.insert_textbox(rect, synthetic_text(rng, script), fontname="dejavu",
+                                fontfile=FONT_PATH, fontsize=10)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def make_scan_image(rng: random.Random, width: int = 1240, height: int = 1754) -> Image.Image:
+    """A grayscale "scan" of a text page: lines of words, paper noise and a slight blur."""
+    img = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.truetype(FONT_PATH, 22)
+    y = 120
+    while y < height - 150:
+        draw.text((110, y), synthetic_text(rng, "latin", 10).replace("\n", " ")[:80], fill=30, font=font)
+        y += 34 if rng.random() > 0.1 else 68
+
+    noise = Image.frombytes("L", (width, height), rng.randbytes(width * height))
+    return Image.blend(img, noise, 0.08).filter(ImageFilter.GaussianBlur(0.6))
+
+
+def make_scanned_pdf(path: str, pages: int, seed: int = 0) -> str:
+    """Write a PDF whose pages are single full-page JPEG scans without a text layer."""
+    rng = random.Random(seed)
+    # A few distinct scans are reused, so generating large documents stays fast
+    scans: List[bytes] = []
+    for _ in range(min(pages, 4)):
+        out = BytesIO()
+        make_scan_image(rng).save(out, "JPEG", quality=75)
+        scans.append(out.getvalue())
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=scans[i % len(scans)])
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def make_pages(count: int, script: str = "latin", seed: int = 0) -> List[dict]:
+    """Translated-page records, as passed to the exporters."""
+    rng = random.Random(seed)
+    return [
+        {
+            "page_num": i + 1,
+            "original": synthetic_text(rng, script, 250 if script == "cjk" else 350),
+            "translated": synthetic_text(rng, "latin"),
+        }
+        for i in range(count)
+    ]
+
+
+def cached_pdf(data_dir: str, kind: str, pages: int, script: str = "latin", seed: int = 0) -> str:
+    """Path of a synthetic PDF, generated on first use and reused afterwards."""
+    os.makedirs(data_dir, exist_ok=True)
+    name = f"{kind}_{script}_{pages}_{seed}.pdf" if kind == "text" else f"{kind}_{pages}_{seed}.pdf"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if kind == "text":
+            make_text_pdf(tmp_path, pages, script, seed)
+        else:
+            make_scanned_pdf(tmp_path, pages, seed)
+        os.replace(tmp_path, path)
+    return path
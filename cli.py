@@ -1,9 +1,10 @@
 import argparse
 
 
-def build_cli_parser():
+def build_cli_parser(add_help: bool = True):
     parser = argparse.ArgumentParser(
-        description="Translate PDF documents (regular or scanned) using GPT-4o-mini vision"
+        description="Translate PDF documents (regular or scanned) using GPT-4o-mini vision",
+        add_help=add_help
     )
     parser.add_argument(
         "--pdf",
@@ -20,8 +21,10 @@ def build_cli_parser():
     parser.add_argument(
         "--target-lang",
         type=str,
+        nargs="+",
         required=True,
-        help="Target language (e.g., Serbian, Spanish, French)"
+        help="Target language(s) (e.g., Serbian, Spanish, French). With several languages "
+             "each page is transcribed once and one output set is written per language"
     )
     parser.add_argument(
         "--model",
@@ -29,6 +32,24 @@ def build_cli_parser():
         default="gpt-4o-mini",
         help="OpenAI model to use (default: gpt-4o-mini)"
     )
+    parser.add_argument(
+        "--text-model",
+        type=str,
+        default=None,
+        help="Model for pages with a text layer (default: --model)"
+    )
+    parser.add_argument(
+        "--image-model",
+        type=str,
+        default=None,
+        help="Model for scanned pages (default: --model)"
+    )
+    parser.add_argument(
+        "--escalation-model",
+        type=str,
+        default=None,
+        help="Retry pages with an empty or malformed response once with this (stronger) model"
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -38,9 +59,11 @@ def build_cli_parser():
     parser.add_argument(
         "--format",
         type=str,
-        choices=["docx", "pdf", "both"],
+        nargs="+",
+        choices=["docx", "pdf", "both", "txt", "jsonl", "md"],
         default="docx",
-        help="Output format: docx, pdf, or both (default: docx)"
+        help="Output format(s): docx, pdf, both (docx + pdf), or the streaming txt, jsonl "
+             "and md exporters (default: docx)"
     )
     parser.add_argument(
         "--resume",
@@ -53,22 +76,361 @@ def build_cli_parser():
         default="translation_cache",
         help="Cache directory for intermediate files"
     )
+    parser.add_argument(
+        "--cache-max-size",
+        type=str,
+        default=None,
+        help="Cap the cache directory size (e.g. 2GB); least recently used files are "
+             "evicted after the run, rendered images before translations"
+    )
     parser.add_argument(
         "--dpi",
         type=int,
         default=200,
         help="Resolution for image rendering (for scanned PDFs)"
     )
+    parser.add_argument(
+        "--crop-margins",
+        action="store_true",
+        help="Crop blank margins and scanner borders from scanned pages before sending them"
+    )
+    parser.add_argument(
+        "--split-dense",
+        action="store_true",
+        help="Split dense scanned pages (newspapers, multi-column layouts) into overlapping "
+             "tiles that are translated concurrently and stitched back in reading order"
+    )
+    parser.add_argument(
+        "--max-tiles",
+        type=int,
+        default=6,
+        help="Maximum tiles per page for --split-dense (default: 6)"
+    )
+    parser.add_argument(
+        "--dense-threshold",
+        type=int,
+        default=2500,
+        help="Estimated output tokens above which --split-dense splits a page (default: 2500)"
+    )
+    parser.add_argument(
+        "--adaptive-dpi",
+        action="store_true",
+        help="Choose the render resolution per scanned page from its size and text height "
+             "(within --min-dpi/--max-dpi) instead of using --dpi"
+    )
+    parser.add_argument(
+        "--min-dpi",
+        type=int,
+        default=100,
+        help="Lowest resolution for --adaptive-dpi (default: 100)"
+    )
+    parser.add_argument(
+        "--max-dpi",
+        type=int,
+        default=300,
+        help="Highest resolution for --adaptive-dpi (default: 300)"
+    )
+    parser.add_argument(
+        "--pixel-budget",
+        type=int,
+        default=None,
+        help="Target pixels per rendered page for --adaptive-dpi "
+             "(default: 1572864, the largest image the vision model keeps)"
+    )
     parser.add_argument(
         "--workers",
         type=int,
         default=3,
         help="Number of parallel workers for translation (default: 3)"
     )
+    parser.add_argument(
+        "--adaptive-workers",
+        action="store_true",
+        help="Adjust concurrency at runtime from latency, 429s and timeouts, starting at --workers"
+    )
+    parser.add_argument(
+        "--min-workers",
+        type=int,
+        default=1,
+        help="Lower bound for adaptive concurrency (default: 1)"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=16,
+        help="Upper bound for adaptive concurrency (default: 16)"
+    )
+    parser.add_argument(
+        "--model-limits",
+        type=str,
+        default=None,
+        help="Per-model concurrency, requests and tokens per minute, "
+             "e.g. \"gpt-4o=2:100,gpt-4o-mini=8:500:2000000\" (model=concurrency[:rpm[:tpm]]); "
+             "tpm is only used by --plan"
+    )
+    parser.add_argument(
+        "--schedule",
+        type=str,
+        choices=["largest-first", "document"],
+        default="largest-first",
+        help="Page submission order: largest estimated pages first, or document order "
+             "(default: largest-first)"
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=300.0,
+        help="Deadline for a single API request in seconds (default: 300)"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for a connection to the API (default: 10)"
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=None,
+        help="Longest wait in seconds for the next bytes of a response, so a stalled "
+             "stream fails instead of hanging (default: --request-timeout)"
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Near the end of a job, send a duplicate request for pages running far past the p95 latency"
+    )
+    parser.add_argument(
+        "--hedge-factor",
+        type=float,
+        default=1.5,
+        help="Hedge pages running longer than this multiple of the p95 latency (default: 1.5)"
+    )
+    parser.add_argument(
+        "--retry-attempts",
+        type=int,
+        default=2,
+        help="Attempts per failed page in the end-of-run retry pass; 0 disables it (default: 2)"
+    )
+    parser.add_argument(
+        "--retry-workers",
+        type=int,
+        default=1,
+        help="Concurrency of the end-of-run retry pass (default: 1)"
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=30.0,
+        help="Initial delay between end-of-run attempts in seconds, doubling each time (default: 30)"
+    )
     parser.add_argument(
         "--sleep",
         type=float,
         default=0.5,
         help="Sleep between API calls to avoid rate limits (default: 0.5)"
     )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Submit pages through the OpenAI Batch API instead of live requests (cheaper, slower)"
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between Batch API status checks (default: 30)"
+    )
+    parser.add_argument(
+        "--multi-page",
+        type=int,
+        default=1,
+        help="Send up to N short scanned pages per vision request (default: 1, disabled)"
+    )
+    parser.add_argument(
+        "--text-mode",
+        choices=["auto", "translate", "clean"],
+        default="auto",
+        help="Text pages: request only the translation and keep the extracted text as the "
+             "original ('translate'), also request a cleaned copy of the original ('clean'), "
+             "or translate only pages with a clean text layer ('auto', default)"
+    )
+    parser.add_argument(
+        "--no-text-cleanup",
+        dest="text_cleanup",
+        action="store_false",
+        help="Keep the extracted text exactly as is in translation-only mode "
+             "(no local hyphenation/whitespace cleanup)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream completions to show partial text and record first-token latency"
+    )
+    parser.add_argument(
+        "--structured-output",
+        action="store_true",
+        help="Request JSON responses with a fixed schema instead of #ORIGINAL#/#TRANSLATED# "
+             "markers; an invalid response is requested once more, then the page fails"
+    )
+    parser.add_argument(
+        "--ocr",
+        action="store_true",
+        help="OCR scanned pages locally (Tesseract) and send confident ones through the text path"
+    )
+    parser.add_argument(
+        "--ocr-min-confidence",
+        type=float,
+        default=80.0,
+        help="Minimum OCR confidence (0-100) to skip the vision model (default: 80)"
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=None,
+        help="Number of OCR processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--precheck",
+        action="store_true",
+        help="Copy text pages already in the target language, or without translatable "
+             "text (numbers, code), unchanged instead of sending them to the API"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record CPU profiles and memory peaks per pipeline stage in <output-dir>/profile"
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=str,
+        default=None,
+        help="Soft memory limit (e.g. 1GB): above it, rendered images stay on disk and "
+             "workers wait for pages in flight instead of starting new ones (Linux only)"
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: analyze the PDF locally, predict tokens, cost and wall time, and write "
+             "<output-dir>/plan.json (used by the next run to schedule pages) without API calls"
+    )
+    parser.add_argument(
+        "--prices",
+        type=str,
+        default=None,
+        help="Price overrides for --plan in USD per 1M tokens, e.g. \"gpt-4o=2.5:10\" "
+             "(model=input:output)"
+    )
+    return parser
+
+
+def build_cache_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py cache",
+        description="Inspect and clean up the translation cache directory"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats = subparsers.add_parser("stats", help="Show cache size per category")
+    stats.add_argument(
+        "--output-dir",
+        type=str,
+        default="translation_cache",
+        help="Cache directory (default: translation_cache)"
+    )
+
+    gc = subparsers.add_parser("gc", help="Evict least recently used files down to a size limit")
+    gc.add_argument(
+        "--output-dir",
+        type=str,
+        default="translation_cache",
+        help="Cache directory (default: translation_cache)"
+    )
+    gc.add_argument(
+        "--max-size",
+        type=str,
+        required=True,
+        help="Maximum cache size, e.g. 500MB or 2GB"
+    )
+    gc.add_argument(
+        "--grace",
+        type=float,
+        default=300,
+        help="Never evict files accessed within this many seconds (default: 300)"
+    )
+    gc.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the files that would be removed"
+    )
+    return parser
+
+
+def build_queue_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py queue",
+        description="Split one document across worker processes and hosts through a shared work queue"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init = subparsers.add_parser(
+        "init",
+        parents=[build_cli_parser(add_help=False)],
+        help="Create a queue with every page of a PDF and the translation settings"
+    )
+
+    work = subparsers.add_parser("work", help="Lease and translate pages until the queue is empty")
+    work.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of worker processes to start on this machine (default: 1)"
+    )
+    work.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Pages translated concurrently per process (default: the job's --workers)"
+    )
+    work.add_argument(
+        "--lease",
+        type=float,
+        default=600,
+        help="Seconds a page stays leased to a worker that stopped responding (default: 600)"
+    )
+    work.add_argument(
+        "--poll-interval",
+        type=float,
+        default=10,
+        help="Seconds between checks while other workers hold the last pages (default: 10)"
+    )
+    work.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Attempts before a page is marked failed (default: 3)"
+    )
+
+    export = subparsers.add_parser("export", help="Write the output documents from the queue results")
+    export.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wait until every page is done or failed before exporting"
+    )
+    export.add_argument(
+        "--poll-interval",
+        type=float,
+        default=10,
+        help="Seconds between status checks with --wait (default: 10)"
+    )
+
+    status = subparsers.add_parser("status", help="Show page counts per state")
+
+    for subparser in (init, work, export, status):
+        subparser.add_argument(
+            "--queue",
+            type=str,
+            required=True,
+            help="Path of the shared queue file (SQLite), e.g. on a network filesystem"
+        )
     return parser
@@ -5,5 +5,8 @@ load_dotenv()  # Automatically looks for .env in current directory
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Optional override, e.g. to point the client at a local stand-in endpoint
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY not found in .env file.")
\ No newline at end of file
@@ -0,0 +1,257 @@
+import os
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from typing import Optional
+
+import fitz  # PyMuPDF
+
+from loader.image_loader import load_page
+from pipeline import (
+    create_translate_function,
+    failure_placeholder,
+    build_request_gates,
+    model_routing,
+    loader_options,
+    output_paths,
+    request_timeout,
+    target_languages,
+    write_outputs,
+    _compact_cache,
+    _write_run_summary,
+)
+from utils.work_queue import WorkQueue, worker_id, PENDING, LEASED, DONE, FAILED
+
+logger = logging.getLogger(__name__)
+
+# Options of "queue init" that are not part of the translation job
+_QUEUE_OPTIONS = ("command", "queue")
+# Settings holding paths; stored absolute so workers can start from any directory
+_PATH_SETTINGS = ("pdf", "output_dir", "output")
+
+
+def init_queue(args) -> WorkQueue:
+    """
+    Create a work queue holding every page of args.pdf.
+
+    The translation settings are stored in the queue, so workers only need
+    the queue path. Running init again for the same job adds nothing and
+    puts permanently failed pages back in the queue.
+    """
+    if not os.path.exists(args.pdf):
+        raise FileNotFoundError(f"PDF not found: {args.pdf}")
+
+    with fitz.open(args.pdf) as doc:
+        page_count = len(doc)
+
+    settings = {k: v for k, v in vars(args).items() if k not in _QUEUE_OPTIONS}
+    for key in _PATH_SETTINGS:
+        if settings.get(key):
+            settings[key] = os.path.abspath(settings[key])
+    os.makedirs(os.path.dirname(os.path.abspath(args.queue)), exist_ok=True)
+    queue = WorkQueue(args.queue)
+    queue.init(settings, list(range(1, page_count + 1)))
+
+    released = queue.release_failed()
+    if released:
+        print(f"Re-queued {released} failed pages")
+    print_queue_status(queue)
+    return queue
+
+
+def print_queue_status(queue: WorkQueue):
+    counts = queue.counts()
+    total = sum(counts.values())
+    print(f"Queue {queue.path}: {counts[DONE]}/{total} done, {counts[PENDING]} pending, "
+          f"{counts[LEASED]} leased, {counts[FAILED]} failed")
+
+
+def run_queue_worker(
+    queue_path: str,
+    threads: Optional[int] = None,
+    lease_seconds: float = 600.0,
+    poll_interval: float = 10.0,
+    max_attempts: int = 3,
+    name: Optional[str] = None
+) -> int:
+    """
+    Lease pages from a work queue, translate them and commit the results
+    until no page is left.
+
+    Leases are renewed in the background while pages are being translated;
+    if this process dies, its pages become available to other workers once
+    their lease expires. When the queue is empty but other workers still
+    hold leases, the worker waits and takes over any lease that expires.
+
+    Args:
+        queue_path: Path of the queue's SQLite file
+        threads: Concurrent pages in this process (default: the job's --workers)
+        lease_seconds: Lease duration; must exceed the time a page can take
+        poll_interval: Seconds between checks while other workers hold the remaining pages
+        max_attempts: Attempts before a page is marked failed
+        name: Optional suffix for the worker id
+
+    Returns:
+        Number of pages this worker committed
+    """
+    queue = WorkQueue(queue_path)
+    args = argparse.Namespace(**queue.settings())
+    worker = worker_id(name)
+
+    text_model, image_model, escalation_model, models = model_routing(args)
+    gates = build_request_gates(args, models)
+    translate_func = create_translate_function(
+        args.source_lang,
+        target_languages(args)[0],
+        text_model,
+        timeout=request_timeout(args),
+        image_model=image_model,
+        escalation_model=escalation_model,
+        gates=gates,
+        split_dense=getattr(args, "split_dense", False),
+        max_tiles=getattr(args, "max_tiles", 6),
+        dense_threshold=getattr(args, "dense_threshold", 2500),
+        tile_workers=threads or args.workers,
+        text_mode=getattr(args, "text_mode", "auto"),
+        text_cleanup=getattr(args, "text_cleanup", True),
+        structured=getattr(args, "structured_output", False)
+    )
+    options = loader_options(args)
+
+    # PyMuPDF documents are not thread-safe; pages are loaded one at a time
+    doc = fitz.open(args.pdf)
+    doc_lock = threading.Lock()
+    stop = threading.Event()
+    committed = []
+
+    def heartbeat():
+        while not stop.wait(lease_seconds / 3):
+            queue.renew(worker, lease_seconds)
+
+    def work():
+        while True:
+            page_nums = queue.lease(worker, lease_seconds, max_attempts=max_attempts)
+            if not page_nums:
+                if queue.is_finished():
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            page_num = page_nums[0]
+            try:
+                with doc_lock:
+                    page = load_page(doc[page_num - 1], **options)
+                result = translate_func(page)
+                result["page_num"] = page_num
+            except Exception as e:
+                logger.warning(f"[{worker}] Page {page_num} failed: {e}")
+                queue.fail(page_num, worker, str(e), max_attempts=max_attempts)
+                continue
+
+            if queue.complete(page_num, worker, result):
+                committed.append(page_num)
+                print(f"[{worker}] Page {page_num} done")
+
+    threads = threads or max(1, args.workers)
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    try:
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+    finally:
+        stop.set()
+        doc.close()
+
+    print(f"[{worker}] Finished: {len(committed)} pages committed")
+    return len(committed)
+
+
+def run_queue_workers(queue_path: str, processes: int = 1, **worker_options):
+    """
+    Run several worker processes against one queue on this machine.
+
+    Other hosts can run "main.py queue work" against the same queue file
+    at the same time.
+    """
+    if processes <= 1:
+        run_queue_worker(queue_path, **worker_options)
+        return
+
+    children = [
+        multiprocessing.Process(
+            target=run_queue_worker,
+            args=(queue_path,),
+            kwargs={**worker_options, "name": str(i + 1)}
+        )
+        for i in range(processes)
+    ]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+    print_queue_status(WorkQueue(queue_path))
+
+
+def export_queue(queue_path: str, wait: bool = False, poll_interval: float = 10.0) -> dict:
+    """
+    Coordinator step: write the output documents from a work queue.
+
+    Args:
+        queue_path: Path of the queue's SQLite file
+        wait: Wait until no page is pending or leased before exporting
+        poll_interval: Seconds between status checks while waiting
+
+    Returns:
+        dict: Translation results by page number
+    """
+    queue = WorkQueue(queue_path)
+    args = argparse.Namespace(**queue.settings())
+
+    while wait and not queue.is_finished():
+        print_queue_status(queue)
+        time.sleep(poll_interval)
+
+    if not queue.is_finished():
+        print("Warning: pages are still pending; exporting the pages done so far")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    base_output, cache_file = output_paths(args)
+
+    # The queue results become the regular translation cache, so the
+    # streaming exporters and later --resume runs can use them
+    translated_pages = {str(result["page_num"]): result for result in queue.results()}
+    _compact_cache(cache_file, translated_pages)
+
+    with fitz.open(args.pdf) as doc:
+        total_pages = len(doc)
+
+    failures = queue.failures()
+    placeholders = {
+        str(failure["page_num"]): failure_placeholder(failure["page_num"], failure["error"])
+        for failure in failures
+    }
+
+    _, _, _, models = model_routing(args)
+    pages_list, _ = write_outputs(
+        args, translated_pages, total_pages, base_output, cache_file,
+        gates=build_request_gates(args, models), placeholders=placeholders
+    )
+
+    print(f"\nPages translated: {len(pages_list)}/{total_pages}")
+    for failure in failures:
+        print(f"  Page {failure['page_num']} failed after {failure['attempts']} attempts: {failure['error']}")
+
+    _write_run_summary(args.output_dir, {
+        "pdf": args.pdf,
+        "total_pages": total_pages,
+        "pages_translated": len(pages_list),
+        "queue": queue_path,
+        "queue_counts": queue.counts(),
+        "failed_pages": failures,
+    })
+    return translated_pages
@@ -0,0 +1,162 @@
+import queue
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, Optional
+
+from utils.cancellation import CancellationToken
+
+
+@dataclass
+class Event:
+    """Base class of all pipeline events."""
+
+
+@dataclass
+class PageLoaded(Event):
+    """A page was analyzed (and rendered, for scanned pages)."""
+    page_num: int
+    page_type: str
+    total_pages: int
+
+
+@dataclass
+class RequestSent(Event):
+    """Translation of a page started."""
+    page_num: int
+    model: str
+
+
+@dataclass
+class PartialText(Event):
+    """Partially generated sections of a page (streaming only)."""
+    page_num: int
+    original: str
+    translated: str
+
+
+@dataclass
+class PageDone(Event):
+    """A page was translated and saved to the cache."""
+    page_num: int
+    completed: int
+    total_pages: int
+    result: dict
+
+
+@dataclass
+class PageFailed(Event):
+    """
+    A page failed. permanent is False while the page is still queued for
+    the end-of-run retry pass, True once it is marked in the output.
+    """
+    page_num: int
+    error: str
+    permanent: bool = False
+
+
+@dataclass
+class ExportProgress(Event):
+    """An output file was written."""
+    format: str
+    path: str
+    target_lang: str
+
+
+@dataclass
+class JobDone(Event):
+    """The pipeline finished; results are those returned by run_translation_pipeline."""
+    results: dict
+    summary: dict = field(default_factory=dict)
+
+
+_END = object()
+
+
+@dataclass
+class _Error:
+    error: BaseException
+
+
+def _start_pipeline(args, put, cancel_token: CancellationToken) -> threading.Thread:
+    # Imported here: the pipeline needs the API key configuration
+    from pipeline import run_translation_pipeline
+
+    def run():
+        try:
+            run_translation_pipeline(args, event_callback=put, cancel_token=cancel_token)
+        except BaseException as e:
+            put(_Error(e))
+        finally:
+            put(_END)
+
+    thread = threading.Thread(target=run, name="translation-pipeline", daemon=True)
+    thread.start()
+    return thread
+
+
+def iter_pipeline_events(args, cancel_token: Optional[CancellationToken] = None) -> Iterator[Event]:
+    """
+    Run the translation pipeline in a background thread and yield its events.
+
+    Worker threads only append to an unbounded queue, so a slow consumer
+    never blocks translation. An exception raised by the pipeline is
+    re-raised from the iterator after the events before it. Cancelling
+    cancel_token, or closing the iterator before JobDone (break, an
+    exception in the consumer), cancels the job.
+
+    Example:
+        for event in iter_pipeline_events(args):
+            if isinstance(event, PageDone):
+                print(event.page_num, event.result["translated"])
+
+    Args:
+        args: Pipeline arguments, as for run_translation_pipeline
+        cancel_token: Optional CancellationToken to stop the job
+
+    Yields:
+        Event instances, ending with JobDone
+    """
+    cancel_token = cancel_token or CancellationToken()
+    events = queue.Queue()
+    _start_pipeline(args, events.put, cancel_token)
+
+    try:
+        while True:
+            event = events.get()
+            if event is _END:
+                return
+            if isinstance(event, _Error):
+                raise event.error
+            yield event
+    finally:
+        cancel_token.cancel()  # no-op once the pipeline has finished
+
+
+async def aiter_pipeline_events(
+    args,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> AsyncIterator[Event]:
+    """
+    Async version of iter_pipeline_events for asyncio services.
+
+    The pipeline runs in a background thread; events are handed to the
+    event loop with call_soon_threadsafe. Cancelling the consuming task
+    cancels the job.
+    """
+    loop = loop or asyncio.get_running_loop()
+    cancel_token = cancel_token or CancellationToken()
+    events = asyncio.Queue()
+    _start_pipeline(args, lambda event: loop.call_soon_threadsafe(events.put_nowait, event), cancel_token)
+
+    try:
+        while True:
+            event = await events.get()
+            if event is _END:
+                return
+            if isinstance(event, _Error):
+                raise event.error
+            yield event
+    finally:
+        cancel_token.cancel()
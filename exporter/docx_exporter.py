@@ -1,14 +1,21 @@
 import os
+import copy
+from typing import Optional
+from lxml import etree
 from docx import Document
+from docx.oxml import OxmlElement, parse_xml
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 
+from .fragments import FragmentStore, fragment_key
+
 
 def create_bilingual_docx(
     pages: list,
     output_path: str,
     source_lang: str,
-    target_lang: str
+    target_lang: str,
+    fragment_dir: Optional[str] = None
 ):
     """
     Create a Word document with original and translated text for each page.
@@ -19,53 +26,32 @@ def create_bilingual_docx(
         output_path: Output .docx file path
         source_lang: Source language name (for headers)
         target_lang: Target language name (for headers)
+        fragment_dir: Optional directory of cached per-page fragments (the
+            body XML of each page, keyed by its content). The document is
+            assembled from them, so re-exports only build pages that changed.
     """
-    doc = Document()
-    
-    # Set default style
-    style = doc.styles["Normal"]
-    style.font.name = "Calibri"
-    style.font.size = Pt(11)
+    doc = _new_document()
+    store = FragmentStore(fragment_dir, "docx", ext="xml") if fragment_dir else None
     
+    body = doc.element.body
     for page_data in pages:
-        page_num = page_data["page_num"]
-        original = page_data.get("original", "")
-        translated = page_data.get("translated", "")
-        
-        # Page header
-        header = doc.add_heading(f"Page {page_num}", level=1)
-        header.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        if store is None:
+            _add_page(doc, page_data, source_lang, target_lang)
+            continue
         
-        # Original text section
-        original_header = doc.add_heading(f"Original ({source_lang})", level=2)
-        for run in original_header.runs:
-            run.font.color.rgb = RGBColor(70, 70, 70)
+        key = fragment_key(page_data, "docx", source_lang=source_lang, target_lang=target_lang)
+        if store.has(key):
+            with open(store.path(key), "rb") as f:
+                fragment = parse_xml(f.read())
+            # Insert before the body's final section properties
+            for element in list(fragment):
+                body.insert_element_before(element, "w:sectPr")
+            continue
         
-        for para in original.split("\n"):
-            if para.strip():
-                p = doc.add_paragraph(para.strip())
-                p.paragraph_format.space_after = Pt(6)
-            else:
-                doc.add_paragraph()
-        
-        # Separator
-        separator = doc.add_paragraph("─" * 60)
-        separator.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        
-        # Translated text section
-        translated_header = doc.add_heading(f"Translation ({target_lang})", level=2)
-        for run in translated_header.runs:
-            run.font.color.rgb = RGBColor(0, 102, 153)
-        
-        for para in translated.split("\n"):
-            if para.strip():
-                p = doc.add_paragraph(para.strip())
-                p.paragraph_format.space_after = Pt(6)
-            else:
-                doc.add_paragraph()
-        
-        # Page break after each page
-        doc.add_page_break()
+        # Build the page in place, then save the new elements as its fragment
+        start = len(body) - 1  # before sectPr
+        _add_page(doc, page_data, source_lang, target_lang)
+        store.put(key, lambda path, new=body[start:len(body) - 1]: _write_fragment(path, new))
     
     # Ensure output directory exists
     output_dir = os.path.dirname(output_path)
@@ -73,4 +59,65 @@ def create_bilingual_docx(
         os.makedirs(output_dir, exist_ok=True)
     
     doc.save(output_path)
-    print(f"Bilingual document saved to: {output_path}")
+    summary = f" ({store.summary()})" if store else ""
+    print(f"Bilingual document saved to: {output_path}{summary}")
+
+
+def _new_document() -> Document:
+    doc = Document()
+    
+    # Set default style
+    style = doc.styles["Normal"]
+    style.font.name = "Calibri"
+    style.font.size = Pt(11)
+    return doc
+
+
+def _write_fragment(path: str, elements: list):
+    """Save body elements as a fragment: a w:body element holding copies of them."""
+    fragment = OxmlElement("w:body")
+    for element in elements:
+        fragment.append(copy.deepcopy(element))
+    with open(path, "wb") as f:
+        f.write(etree.tostring(fragment))
+
+
+def _add_page(doc: Document, page_data: dict, source_lang: str, target_lang: str):
+    page_num = page_data["page_num"]
+    original = page_data.get("original", "")
+    translated = page_data.get("translated", "")
+    
+    # Page header
+    header = doc.add_heading(f"Page {page_num}", level=1)
+    header.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    
+    # Original text section
+    original_header = doc.add_heading(f"Original ({source_lang})", level=2)
+    for run in original_header.runs:
+        run.font.color.rgb = RGBColor(70, 70, 70)
+    
+    for para in original.split("\n"):
+        if para.strip():
+            p = doc.add_paragraph(para.strip())
+            p.paragraph_format.space_after = Pt(6)
+        else:
+            doc.add_paragraph()
+    
+    # Separator
+    separator = doc.add_paragraph("─" * 60)
+    separator.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    
+    # Translated text section
+    translated_header = doc.add_heading(f"Translation ({target_lang})", level=2)
+    for run in translated_header.runs:
+        run.font.color.rgb = RGBColor(0, 102, 153)
+    
+    for para in translated.split("\n"):
+        if para.strip():
+            p = doc.add_paragraph(para.strip())
+            p.paragraph_format.space_after = Pt(6)
+        else:
+            doc.add_paragraph()
+    
+    # Page break after each page
+    doc.add_page_break()
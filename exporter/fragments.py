@@ -0,0 +1,81 @@
+import os
+import json
+import hashlib
+from typing import Callable, Optional
+
+from utils.cache_manager import touch
+
+# Bump when the page layout of an exporter changes, so old fragments are not reused
+FRAGMENT_VERSION = 1
+
+
+def fragment_key(page_data: dict, fmt: str, **layout) -> str:
+    """
+    Content hash of one exported page.
+
+    Covers everything that changes the rendered page: its number and text,
+    the exporter format and the layout settings (languages, fonts, sizes).
+    """
+    payload = json.dumps(
+        {
+            "version": FRAGMENT_VERSION,
+            "format": fmt,
+            "page_num": page_data["page_num"],
+            "original": page_data.get("original", ""),
+            "translated": page_data.get("translated", ""),
+            "layout": layout,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FragmentStore:
+    """
+    Per-page export fragments of one format, stored as <fragment_dir>/<format>/<key>.<ext>.
+
+    Fragments are content-addressed, so several documents and concurrent
+    runs can share the directory; files are written atomically. Readers
+    touch() fragments they reuse, so the cache manager evicts unused ones
+    first.
+    """
+
+    def __init__(self, fragment_dir: str, fmt: str, ext: Optional[str] = None):
+        self.dir = os.path.join(fragment_dir, fmt)
+        self.ext = ext or fmt
+        self.reused = 0
+        self.rendered = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.{self.ext}")
+
+    def has(self, key: str) -> bool:
+        """True if the fragment is cached; counts it as reused and marks the access."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return False
+        touch(path)
+        self.reused += 1
+        return True
+
+    def put(self, key: str, write: Callable[[str], None]):
+        """Create a fragment by calling write(path) on a temporary path."""
+        os.makedirs(self.dir, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp.{self.ext}"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+        self.rendered += 1
+
+    def get_or_render(self, key: str, render: Callable[[str], None]) -> str:
+        """
+        Path of the fragment for key, calling render(path) to create it if
+        it is not cached.
+        """
+        if not self.has(key):
+            self.put(key, render)
+        return self.path(key)
+
+    def summary(self) -> str:
+        return f"{self.rendered} pages rendered, {self.reused} reused"
@@ -1,4 +1,6 @@
 import os
+from typing import Optional
+import fitz  # PyMuPDF
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.lib.utils import simpleSplit
@@ -6,6 +8,8 @@ from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+from .fragments import FragmentStore, fragment_key
+
 
 def create_bilingual_pdf(
     pages: list,
@@ -15,7 +19,8 @@ def create_bilingual_pdf(
     font_path: str = None,
     font_name: str = "DejaVuSans",
     font_size: int = 11,
-    margin_cm: float = 2.5
+    margin_cm: float = 2.5,
+    fragment_dir: Optional[str] = None
 ):
     """
     Create a PDF document with original and translated text for each page.
@@ -30,7 +35,64 @@ def create_bilingual_pdf(
         font_name: Name to register the font as
         font_size: Base font size
         margin_cm: Page margin in centimeters
+        fragment_dir: Optional directory of cached per-page fragments. Each
+            page is rendered to its own small PDF keyed by its content, and
+            the document is assembled from them, so re-exports only render
+            pages that changed.
     """
+    font_path, font_name = _resolve_font(font_path, font_name)
+    
+    # Ensure output directory exists
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    if fragment_dir is None:
+        _render_pages(pages, output_path, source_lang, target_lang, font_name, font_size, margin_cm)
+        print(f"Bilingual PDF saved to: {output_path}")
+        return
+    
+    store = FragmentStore(fragment_dir, "pdf")
+    layout = {
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "font": font_path and os.path.abspath(font_path),
+        "font_name": font_name,
+        "font_size": font_size,
+        "margin_cm": margin_cm,
+    }
+    
+    keys = [fragment_key(page_data, "pdf", **layout) for page_data in pages]
+    missing = [(key, page_data) for key, page_data in zip(keys, pages) if not store.has(key)]
+    
+    if missing:
+        # Render the missing pages in one pass and split it into fragments;
+        # fragments from one pass share their embedded font subsets
+        os.makedirs(store.dir, exist_ok=True)
+        tmp_path = os.path.join(store.dir, f"render.{os.getpid()}.tmp.pdf")
+        ranges = _render_pages([page_data for _, page_data in missing], tmp_path,
+                               source_lang, target_lang, font_name, font_size, margin_cm)
+        with fitz.open(tmp_path) as rendered:
+            for (key, _), (first, last) in zip(missing, ranges):
+                fragment = fitz.open()
+                fragment.insert_pdf(rendered, from_page=first, to_page=last)
+                store.put(key, lambda path: fragment.save(path, garbage=3, deflate=True))
+                fragment.close()
+        os.remove(tmp_path)
+    
+    doc = fitz.open()
+    for key in keys:
+        with fitz.open(store.path(key)) as fragment:
+            doc.insert_pdf(fragment)
+    
+    # Identical objects of the fragments (fonts of unchanged subsets) are merged
+    doc.save(output_path, garbage=4, deflate=True)
+    doc.close()
+    print(f"Bilingual PDF saved to: {output_path} ({store.summary()})")
+
+
+def _resolve_font(font_path: Optional[str], font_name: str) -> tuple:
+    """Find and register the Unicode font; returns (font_path, font_name)."""
     # Find font file
     if font_path is None:
         # Look for font in common locations
@@ -48,16 +110,21 @@ def create_bilingual_pdf(
     if font_path and os.path.exists(font_path):
         if font_name not in pdfmetrics.getRegisteredFontNames():
             pdfmetrics.registerFont(TTFont(font_name, font_path))
-    else:
-        # Fallback to Helvetica (no Unicode support)
-        font_name = "Helvetica"
+        return font_path, font_name
     
-    # Ensure output directory exists
-    output_dir = os.path.dirname(output_path)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+    # Fallback to Helvetica (no Unicode support)
+    return None, "Helvetica"
+
+
+def _render_pages(pages, output_path, source_lang, target_lang, font_name, font_size, margin_cm) -> list:
+    """
+    Draw pages into a new PDF file with reportlab.
     
-    # Create PDF
+    Returns:
+        List of (first, last) 0-based PDF page indexes of every page, which
+        can span several PDF pages
+    """
+    ranges = []
     c = canvas.Canvas(output_path, pagesize=A4)
     width, height = A4
     margin = margin_cm * cm
@@ -66,6 +133,7 @@ def create_bilingual_pdf(
     header_size = font_size + 4
     
     for page_data in pages:
+        first = c.getPageNumber() - 1
         page_num = page_data["page_num"]
         original = page_data.get("original", "")
         translated = page_data.get("translated", "")
@@ -114,9 +182,10 @@ def create_bilingual_pdf(
         
         # Page break
         c.showPage()
+        ranges.append((first, c.getPageNumber() - 2))
     
     c.save()
-    print(f"Bilingual PDF saved to: {output_path}")
+    return ranges
 
 
 def _draw_text_block(canvas_obj, text, x, y, max_width, line_height, 
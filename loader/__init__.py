@@ -1,4 +1,3 @@
-from .image_loader import load_pdf
-
-__all__ = ["load_pdf"]
+from .image_loader import load_pdf, load_page
 
+__all__ = ["load_pdf", "load_page"]
@@ -1,8 +1,16 @@
 import os
-from typing import List, Union
+import math
+from typing import List, Optional, Union
 from PIL import Image
 import fitz  # PyMuPDF
 
+from utils.tokens import VISION_MAX_PIXELS, page_image_stats
+from .render_cache import get_render_cache, render_key, document_hash
+from .text_layer import is_clean_text_layer
+
+# Height in pixels that a line of text should have in an adaptive-DPI render
+TARGET_TEXT_HEIGHT_PX = 24
+
 
 def analyze_pdf_page(page: fitz.Page, min_text_coverage: float = 0.8) -> bool:
     """
@@ -46,21 +54,266 @@ def extract_text_from_page(page: fitz.Page) -> str:
     return page.get_text().strip()
 
 
-def render_page_to_image(page: fitz.Page, dpi: int = 200) -> Image.Image:
-    """Render a PDF page to a PIL Image."""
+def _content_span(profile: List[int], min_ink: int, max_ink: int) -> Optional[tuple]:
+    """Return (first, last) index whose ink level is content-like, or None."""
+    hits = [i for i, v in enumerate(profile) if min_ink <= v <= max_ink]
+    if not hits:
+        return None
+    return hits[0], hits[-1]
+
+
+def _render_ink(
+    page: fitz.Page,
+    preview_dpi: int,
+    threshold: int,
+    clip: Optional[fitz.Rect] = None
+) -> tuple:
+    """Low-resolution grayscale pre-render as an ink mask: (image, zoom)."""
+    zoom = preview_dpi / 72
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False, clip=clip
+    )
+    gray = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    
+    # 255 where there is ink; averaging rows/columns gives the ink level per line
+    return gray.point(lambda p: 255 if p < threshold else 0), zoom
+
+
+def _ink_profile(img: Image.Image, axis: str) -> List[int]:
+    """Average ink level (0-255) of every column or row of an ink mask."""
+    size = (img.width, 1) if axis == "columns" else (1, img.height)
+    return list(img.resize(size, Image.BOX).tobytes())
+
+
+def detect_content_bbox(
+    page: fitz.Page,
+    preview_dpi: int = 36,
+    threshold: int = 200,
+    padding: float = 8.0,
+    min_saving: float = 0.05
+) -> Optional[fitz.Rect]:
+    """
+    Find the area of a page that contains content, ignoring blank margins
+    and dark scanner borders.
+    
+    The page is pre-rendered in grayscale at a low resolution, and the ink
+    level of every row and column is measured. Rows/columns that are almost
+    white (margins) or almost solid dark (scanner edges) are trimmed.
+    
+    Args:
+        page: PyMuPDF page object
+        preview_dpi: Resolution of the low-resolution pre-render
+        threshold: Gray level below which a pixel counts as ink
+        padding: Extra space kept around the content (PDF points)
+        min_saving: Minimum fraction of the page area that must be trimmed
+        
+    Returns:
+        fitz.Rect clip in page coordinates, or None if cropping is not worthwhile
+    """
+    ink, zoom = _render_ink(page, preview_dpi, threshold)
+    
+    # Ignore specks (< ~1% ink) and solid borders (> ~90% ink). Columns are
+    # trimmed first so a dark vertical border doesn't count as ink in every row.
+    col_span = _content_span(_ink_profile(ink, "columns"), 2, 230)
+    if col_span is None:
+        return None
+    x0, x1 = col_span[0], col_span[1] + 1
+    
+    row_span = _content_span(_ink_profile(ink.crop((x0, 0, x1, ink.height)), "rows"), 2, 230)
+    if row_span is None:
+        return None
+    y0, y1 = row_span[0], row_span[1] + 1
+    
+    # Re-measure columns without horizontal borders above/below the content
+    col_span = _content_span(_ink_profile(ink.crop((x0, y0, x1, y1)), "columns"), 2, 230)
+    if col_span is not None:
+        x0, x1 = x0 + col_span[0], x0 + col_span[1] + 1
+    
+    rect = page.rect
+    clip = fitz.Rect(
+        rect.x0 + x0 / zoom - padding,
+        rect.y0 + y0 / zoom - padding,
+        rect.x0 + x1 / zoom + padding,
+        rect.y0 + y1 / zoom + padding,
+    ) & rect
+    
+    if clip.is_empty or clip.get_area() > rect.get_area() * (1 - min_saving):
+        return None
+    
+    return clip
+
+
+def estimate_text_height(
+    page: fitz.Page,
+    clip: Optional[fitz.Rect] = None,
+    preview_dpi: int = 72,
+    threshold: int = 200
+) -> Optional[float]:
+    """
+    Estimate the typical height of a line of text on a scanned page.
+    
+    Rows of a low-resolution pre-render that contain ink form runs, one
+    per line of text; the median run length is the line height.
+    
+    Returns:
+        Line height in PDF points, or None if there are too few lines to tell
+    """
+    ink, zoom = _render_ink(page, preview_dpi, threshold, clip)
+    
+    # Measure rows only within the content columns, so a dark border
+    # down the side of the scan doesn't join every row into one run
+    col_span = _content_span(_ink_profile(ink, "columns"), 2, 230)
+    if col_span is None:
+        return None
+    ink = ink.crop((col_span[0], 0, col_span[1] + 1, ink.height))
+    
+    runs = []
+    length = 0
+    for level in _ink_profile(ink, "rows") + [0]:
+        if level >= 3:
+            length += 1
+        elif length:
+            runs.append(length)
+            length = 0
+    
+    runs = sorted(r for r in runs if r >= 2)  # ignore specks and rules
+    if len(runs) < 3:
+        return None
+    return runs[len(runs) // 2] / zoom
+
+
+def choose_render_dpi(
+    page: fitz.Page,
+    clip: Optional[fitz.Rect] = None,
+    min_dpi: int = 100,
+    max_dpi: int = 300,
+    pixel_budget: int = VISION_MAX_PIXELS,
+    text_height: Optional[float] = None
+) -> int:
+    """
+    Choose the render resolution of a scanned page.
+    
+    The DPI that fills the pixel budget is the upper target: the vision
+    model downscales anything larger. Pages with large print go lower,
+    to the DPI that still renders a line of text TARGET_TEXT_HEIGHT_PX high.
+    
+    Args:
+        page: PyMuPDF page object
+        clip: Area that will be rendered (default: the whole page)
+        min_dpi: Lowest allowed resolution
+        max_dpi: Highest allowed resolution
+        pixel_budget: Target number of pixels for the rendered image
+        text_height: Line height in PDF points, from estimate_text_height
+        
+    Returns:
+        Resolution in DPI
+    """
+    rect = clip or page.rect
+    dpi = 72 * math.sqrt(pixel_budget / max(1.0, rect.width * rect.height))
+    if text_height:
+        dpi = min(dpi, 72 * TARGET_TEXT_HEIGHT_PX / text_height)
+    return int(min(max(dpi, min_dpi), max_dpi))
+
+
+def render_page_to_image(
+    page: fitz.Page,
+    dpi: int = 200,
+    clip: Optional[fitz.Rect] = None
+) -> Image.Image:
+    """Render a PDF page (or only the clip area of it) to a PIL Image."""
     zoom = dpi / 72  # 72 is the default PDF DPI
     matrix = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=matrix)
+    pix = page.get_pixmap(matrix=matrix, clip=clip)
     
     # Convert to PIL Image
     img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
     return img
 
 
+def load_page(
+    page: fitz.Page,
+    cache_dir: str = "translation_cache/images",
+    dpi: int = 200,
+    crop_margins: bool = False,
+    adaptive_dpi: bool = False,
+    min_dpi: int = 100,
+    max_dpi: int = 300,
+    pixel_budget: int = VISION_MAX_PIXELS
+) -> dict:
+    """
+    Extract the content of one PDF page: its text, or a rendered image
+    for scanned pages (cached in cache_dir, see RenderCache).
+    
+    See load_pdf for the arguments and the returned dict.
+    """
+    page_data = {"page_num": page.number + 1}
+    
+    if analyze_pdf_page(page):
+        # Text-based page - extract text directly
+        page_data["content"] = extract_text_from_page(page)
+        page_data["type"] = "text"
+        page_data["clean_text"] = is_clean_text_layer(page_data["content"])
+        return page_data
+    
+    # Scanned/image page - render to image, or load the cached render
+    cache = get_render_cache(cache_dir)
+    key = render_key(
+        document_hash(page.parent),
+        page.number,
+        dpi=dpi,
+        crop_margins=crop_margins,
+        adaptive_dpi=adaptive_dpi,
+        min_dpi=min_dpi,
+        max_dpi=max_dpi,
+        pixel_budget=pixel_budget
+    )
+    
+    cached = cache.get(key)
+    if cached:
+        img, page_dpi = cached
+    else:
+        clip = detect_content_bbox(page) if crop_margins else None
+        page_dpi = dpi
+        if adaptive_dpi:
+            page_dpi = choose_render_dpi(
+                page,
+                clip=clip,
+                min_dpi=min_dpi,
+                max_dpi=max_dpi,
+                pixel_budget=pixel_budget,
+                text_height=estimate_text_height(page, clip=clip)
+            )
+        img = render_page_to_image(page, dpi=page_dpi, clip=clip)
+        cache.put(key, img, dpi=page_dpi)
+    
+    if adaptive_dpi and page_dpi:
+        page_data["dpi"] = page_dpi
+    page_data["content"] = img
+    page_data["type"] = "image"
+    page_data["image_path"] = os.path.join(cache.cache_dir, key)
+    return page_data
+
+
+def release_page_image(page_data: dict):
+    """
+    Drop the rendered image of a scanned page from memory; it stays in the
+    render cache and utils.images.page_image reads it back when needed.
+    """
+    if page_data["content"] is not None:
+        page_data["image_stats"] = page_image_stats(page_data)
+        page_data["content"] = None
+
+
 def load_pdf(
     pdf_path: str,
     cache_dir: str = "translation_cache/images",
-    dpi: int = 200
+    dpi: int = 200,
+    crop_margins: bool = False,
+    adaptive_dpi: bool = False,
+    min_dpi: int = 100,
+    max_dpi: int = 300,
+    pixel_budget: int = VISION_MAX_PIXELS,
+    memory_budget=None
 ) -> List[dict]:
     """
     Load a PDF and extract content from each page.
@@ -68,15 +321,29 @@ def load_pdf(
     
     Args:
         pdf_path: Path to the PDF file
-        cache_dir: Directory to cache rendered images
+        cache_dir: Directory to cache rendered images; may be shared by
+            several documents and concurrent runs
         dpi: Resolution for rendering scanned pages
+        crop_margins: Render only the detected content area of scanned pages
+        adaptive_dpi: Choose the resolution per page (see choose_render_dpi)
+            instead of using dpi for every page
+        min_dpi: Lowest resolution for adaptive DPI
+        max_dpi: Highest resolution for adaptive DPI
+        pixel_budget: Target pixels per rendered page for adaptive DPI
+        memory_budget: Optional utils.memory.MemoryBudget; once the process
+            is over it, rendered images are kept on disk only (content None,
+            see release_page_image) instead of in memory
         
     Returns:
         List of dicts with structure:
         {
             "page_num": int,
-            "content": str | Image.Image,
-            "type": "text" | "image"
+            "content": str | Image.Image | None,
+            "type": "text" | "image",
+            "clean_text": bool,  # text pages: the text layer needs no cleanup
+            "dpi": int,  # chosen resolution of scanned pages, with adaptive_dpi
+            "image_path": str,  # scanned pages: the cached render
+            "image_stats": tuple  # (width, height, output tokens) of released images
         }
     """
     if not os.path.exists(pdf_path):
@@ -85,34 +352,36 @@ def load_pdf(
     os.makedirs(cache_dir, exist_ok=True)
     
     doc = fitz.open(pdf_path)
-    pages = []
     
     print(f"Analyzing {len(doc)} pages...")
     
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        page_data = {"page_num": page_num + 1}
-        
-        if analyze_pdf_page(page):
-            # Text-based page - extract text directly
-            page_data["content"] = extract_text_from_page(page)
-            page_data["type"] = "text"
-        else:
-            # Scanned/image page - render to image
-            cache_path = os.path.join(cache_dir, f"page_{page_num + 1:03d}.png")
-            
-            if os.path.exists(cache_path):
-                # Load from cache
-                page_data["content"] = Image.open(cache_path)
-            else:
-                # Render and cache
-                img = render_page_to_image(page, dpi=dpi)
-                img.save(cache_path, "PNG")
-                page_data["content"] = img
-            
-            page_data["type"] = "image"
-        
+    pages = []
+    releasing = False
+    for page in doc:
+        page_data = load_page(
+            page,
+            cache_dir=cache_dir,
+            dpi=dpi,
+            crop_margins=crop_margins,
+            adaptive_dpi=adaptive_dpi,
+            min_dpi=min_dpi,
+            max_dpi=max_dpi,
+            pixel_budget=pixel_budget
+        )
         pages.append(page_data)
+        
+        if memory_budget is None or page_data["type"] != "image":
+            continue
+        if releasing:
+            release_page_image(page_data)
+        elif memory_budget.over():
+            # From here on no rendered image is kept in memory
+            releasing = True
+            for loaded in pages:
+                if loaded["type"] == "image":
+                    release_page_image(loaded)
+            print(f"Memory budget reached at page {page_data['page_num']}: "
+                  f"scanned pages are read from the image cache when needed")
     
     doc.close()
     
@@ -121,4 +390,9 @@ def load_pdf(
     image_pages = sum(1 for p in pages if p["type"] == "image")
     print(f"Loaded {len(pages)} pages: {text_pages} text-based, {image_pages} scanned/image")
     
+    rendered_dpis = [p["dpi"] for p in pages if "dpi" in p]
+    if rendered_dpis:
+        print(f"Render DPI: {min(rendered_dpis)}-{max(rendered_dpis)} "
+              f"(avg {sum(rendered_dpis) / len(rendered_dpis):.0f})")
+    
     return pages
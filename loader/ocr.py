@@ -0,0 +1,142 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Tesseract traineddata names for the languages offered in the UI
+TESSERACT_LANGUAGES = {
+    "English": "eng", "Spanish": "spa", "French": "fra", "German": "deu",
+    "Italian": "ita", "Portuguese": "por", "Russian": "rus", "Japanese": "jpn",
+    "Chinese": "chi_sim", "Korean": "kor", "Arabic": "ara", "Hindi": "hin",
+    "Dutch": "nld", "Polish": "pol", "Swedish": "swe", "Turkish": "tur",
+    "Greek": "ell", "Czech": "ces", "Serbian": "srp", "Croatian": "hrv",
+    "Bulgarian": "bul", "Romanian": "ron", "Hungarian": "hun",
+}
+
+
+def tesseract_language(language: str) -> str:
+    """Map a language name to a Tesseract language code (falls back to English)."""
+    return TESSERACT_LANGUAGES.get(language, "eng")
+
+
+def ocr_image(image: Image.Image, lang: str = "eng") -> Tuple[str, float]:
+    """
+    Run Tesseract OCR on a page image.
+
+    Args:
+        image: PIL Image of the page
+        lang: Tesseract language code
+
+    Returns:
+        Tuple of (text, confidence), where confidence is the mean word
+        confidence in the range 0-100, weighted by word length
+    """
+    import pytesseract
+
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    lines = {}
+    weighted_conf = 0.0
+    total_chars = 0
+
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        conf = float(data["conf"][i])
+        if not word or conf < 0:
+            continue
+
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        weighted_conf += conf * len(word)
+        total_chars += len(word)
+
+    # Rebuild text with a blank line between blocks/paragraphs
+    text_parts = []
+    previous_par = None
+    for key in sorted(lines):
+        if previous_par is not None and key[:2] != previous_par:
+            text_parts.append("")
+        text_parts.append(" ".join(lines[key]))
+        previous_par = key[:2]
+
+    confidence = weighted_conf / total_chars if total_chars else 0.0
+    return "\n".join(text_parts), confidence
+
+
+def _ocr_worker(job: tuple) -> tuple:
+    page_num, image, lang = job
+    try:
+        if isinstance(image, str):
+            image = Image.open(image)  # released by the loader, see release_page_image
+        text, confidence = ocr_image(image, lang)
+        return page_num, text, confidence, None
+    except Exception as e:
+        return page_num, "", 0.0, str(e)
+
+
+def apply_ocr(
+    pages: List[dict],
+    source_lang: str,
+    min_confidence: float = 80.0,
+    min_chars: int = 50,
+    max_workers: int = None
+) -> int:
+    """
+    OCR scanned pages locally and switch confident ones to the text path.
+
+    Image pages are OCR'd in a process pool. Pages whose OCR confidence is at
+    least min_confidence are converted in place to {"type": "text"} with the
+    OCR text as content, so they go through translate_text instead of the
+    vision model. Other pages are left untouched and fall back to vision.
+
+    Args:
+        pages: List of page dicts from load_pdf (modified in place)
+        source_lang: Source language name (used to pick the Tesseract model)
+        min_confidence: Minimum mean word confidence (0-100) to accept OCR text
+        min_chars: Minimum amount of recognized text to accept OCR text
+        max_workers: Number of OCR processes (default: CPU count)
+
+    Returns:
+        int: Number of pages switched to the text path
+    """
+    try:
+        import pytesseract  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "OCR requires pytesseract and the Tesseract binary. "
+            "Install with: pip install pytesseract"
+        )
+
+    image_pages = {p["page_num"]: p for p in pages if p["type"] == "image"}
+    if not image_pages:
+        return 0
+
+    lang = tesseract_language(source_lang)
+    jobs = [
+        (num, page["content"] if page["content"] is not None else page["image_path"], lang)
+        for num, page in image_pages.items()
+    ]
+    converted = 0
+
+    print(f"Running local OCR on {len(jobs)} scanned pages...")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for page_num, text, confidence, error in executor.map(_ocr_worker, jobs):
+            page = image_pages[page_num]
+
+            if error:
+                logger.warning(f"OCR failed for page {page_num}: {error}")
+                continue
+
+            page["ocr_confidence"] = round(confidence, 1)
+            if confidence >= min_confidence and len(text) >= min_chars:
+                page["content"] = text
+                page["type"] = "text"
+                converted += 1
+
+    print(f"OCR: {converted}/{len(jobs)} scanned pages use the text path, "
+          f"{len(jobs) - converted} fall back to vision")
+
+    return converted
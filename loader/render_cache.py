@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Optional, Tuple
+from PIL import Image
+import fitz  # PyMuPDF
+
+from utils.cache_manager import touch
+from utils.filelock import file_lock
+
+# Dotfiles in the cache directory are never evicted by the cache manager
+INDEX_FILE = ".index.jsonl"
+INDEX_LOCK = ".index.lock"
+
+_hash_lock = threading.Lock()
+_hashes = {}
+
+
+def document_hash(doc: fitz.Document) -> str:
+    """
+    Content hash of an open PDF (SHA-256, first 16 hex digits).
+
+    File hashes are remembered per (path, size, mtime), so loading the
+    pages of one document hashes the file only once.
+    """
+    path = doc.name
+    if not path or not os.path.exists(path):
+        return hashlib.sha256(doc.tobytes()).hexdigest()[:16]
+    return file_hash(path)
+
+
+def file_hash(path: str) -> str:
+    """Content hash of a file, as in document_hash()."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        if key not in _hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            _hashes[key] = digest.hexdigest()[:16]
+        return _hashes[key]
+
+
+def render_key(
+    doc_hash: str,
+    page_index: int,
+    dpi: int = 200,
+    crop_margins: bool = False,
+    adaptive_dpi: bool = False,
+    min_dpi: int = 100,
+    max_dpi: int = 300,
+    pixel_budget: int = 0,
+    encoding: str = "png"
+) -> str:
+    """
+    Cache key of a page render.
+
+    Adaptive renders are keyed by the settings that choose the DPI rather
+    than the DPI itself, which is only known after measuring the page.
+    """
+    resolution = f"auto{min_dpi}-{max_dpi}-{pixel_budget}" if adaptive_dpi else f"dpi{dpi}"
+    clip = "_crop" if crop_margins else ""
+    return f"{doc_hash}/{page_index:05d}_{resolution}{clip}.{encoding}"
+
+
+class RenderCache:
+    """
+    Rendered page images keyed by document hash, page index, resolution
+    and encoding.
+
+    Images are stored as <cache_dir>/<doc hash>/<page>_<settings>.<encoding>.
+    An append-only index (.index.jsonl) lists the cached renders with their
+    DPI, so lookups read one file instead of stating every image. Runs and
+    documents can share the directory: images are written atomically and
+    index lines are appended under an inter-process lock. A render evicted
+    by the cache manager is detected when it is opened, and rendered again.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._entries = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Read index lines appended since the last refresh (by any process)."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Ignore a trailing line that is still being written
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                self._entries[entry["key"]] = entry
+            except (ValueError, KeyError):
+                continue
+        self._offset += end
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Index entry ({"key", "dpi"}) of a cached render, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self._refresh()
+            return self._entries.get(key)
+
+    def get(self, key: str) -> Optional[Tuple[Image.Image, Optional[int]]]:
+        """
+        Load a cached render.
+
+        Returns:
+            (image, dpi), or None if the render is not cached
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+
+        path = os.path.join(self.cache_dir, key)
+        try:
+            img = Image.open(path)
+            img.load()
+        except FileNotFoundError:
+            # Evicted by a cache gc; forget it so the caller renders again
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        touch(path)
+        return img, entry.get("dpi")
+
+    def put(self, key: str, img: Image.Image, dpi: Optional[int] = None):
+        """Store a render and add it to the index."""
+        path = os.path.join(self.cache_dir, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, os.path.splitext(key)[1][1:].upper())
+        os.replace(tmp_path, path)
+
+        entry = {"key": key, "dpi": dpi}
+        with file_lock(os.path.join(self.cache_dir, INDEX_LOCK)):
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        with self._lock:
+            self._entries[key] = entry
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_render_cache(cache_dir: str) -> RenderCache:
+    """Shared RenderCache instance for a cache directory."""
+    cache_dir = os.path.abspath(cache_dir)
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = RenderCache(cache_dir)
+        return _caches[cache_dir]
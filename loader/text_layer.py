@@ -0,0 +1,81 @@
+import re
+import unicodedata
+from typing import Tuple
+
+# Typographic ligatures that PDF text layers often keep as single characters
+_LIGATURES = {"ﬀ": "ff", "ﬁ": "fi", "ﬂ": "fl", "ﬃ": "ffi", "ﬄ": "ffl", "ﬅ": "st", "ﬆ": "st"}
+
+# Word broken over a line end: "transla-\ntion" (only before a lowercase letter)
+_HYPHENATED = re.compile(r"(\w)-\n[ \t]*(?=[^\W\d_])")
+
+# UTF-8 read as Latin-1/cp1252, e.g. "Ã¤" for "ä"
+_MOJIBAKE = re.compile(r"Ã[\x80-\xbf¡-¿]|â€")
+
+TEXT_MODES = ("auto", "translate", "clean")
+
+
+def is_clean_text_layer(text: str, max_bad_ratio: float = 0.005) -> bool:
+    """
+    Check whether an extracted text layer can be used as the original as is.
+
+    A clean layer has (almost) no replacement, private-use or control
+    characters, unmapped glyphs ("(cid:123)"), mojibake, or letters
+    spaced out one per word ("T h e  e n d").
+    """
+    chars = "".join(text.split())
+    if not chars:
+        return False
+
+    bad = sum(
+        1 for ch in chars
+        if ch == "\ufffd" or unicodedata.category(ch) in ("Co", "Cc", "Cs")
+    )
+    bad += 5 * (text.count("(cid:") + len(_MOJIBAKE.findall(text)))
+    if bad > max_bad_ratio * len(chars):
+        return False
+
+    # Spaced-out letters; scripts without spaces (CJK) form long tokens and pass
+    words = [w for w in text.split() if w.isalpha()]
+    if len(words) >= 20 and sum(1 for w in words if len(w) == 1) > 0.4 * len(words):
+        return False
+
+    return True
+
+
+def clean_extracted_text(text: str) -> str:
+    """
+    Local cleanup of an extracted text layer: expand ligatures, drop soft
+    hyphens, join words hyphenated over line ends, and normalize spaces
+    and blank lines.
+    """
+    for ligature, letters in _LIGATURES.items():
+        text = text.replace(ligature, letters)
+    text = text.replace("\u00ad", "")
+
+    def join(match: re.Match) -> str:
+        return match.group(1) if text[match.end()].islower() else match.group(0)
+
+    text = _HYPHENATED.sub(join, text)
+    lines = [re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def prepare_text_page(page: dict, text_mode: str = "auto", cleanup: bool = True) -> Tuple[str, bool]:
+    """
+    Choose how a text page is translated.
+
+    Args:
+        page: Text page from the loader
+        text_mode: "translate" requests only the translation and uses the
+            extracted text as the original; "clean" also asks the model for
+            a cleaned copy of the original; "auto" translates only pages
+            whose text layer is clean (see is_clean_text_layer)
+        cleanup: Apply clean_extracted_text to the original in translation-only mode
+
+    Returns:
+        (text to send, True for translation-only)
+    """
+    translation_only = text_mode == "translate" or (text_mode == "auto" and page.get("clean_text", False))
+    if translation_only and cleanup:
+        return clean_extracted_text(page["content"]), True
+    return page["content"], translation_only
@@ -1,10 +1,72 @@
-from cli import build_cli_parser
+import sys
+
+from cli import build_cli_parser, build_cache_parser, build_queue_parser
+
+
+def run_cache_command(argv):
+    from utils.cache_manager import CacheManager, parse_size, format_size
+    
+    args = build_cache_parser().parse_args(argv)
+    
+    if args.command == "stats":
+        stats = CacheManager(args.output_dir).stats()
+        print(f"Cache directory: {stats['cache_dir']}")
+        for name, bucket in sorted(stats["categories"].items()):
+            print(f"  {name:<13} {bucket['files']:>6} files  {format_size(bucket['bytes']):>10}")
+        print(f"  {'total':<13} {'':>6}        {format_size(stats['total_bytes']):>10}")
+    
+    elif args.command == "gc":
+        manager = CacheManager(args.output_dir, grace_seconds=args.grace)
+        removed = manager.gc(parse_size(args.max_size), dry_run=args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        for path in removed:
+            print(f"{action}: {path}")
+        print(f"{action} {len(removed)} files")
+
+
+def run_queue_command(argv):
+    args = build_queue_parser().parse_args(argv)
+    
+    from distributed import init_queue, run_queue_workers, export_queue, print_queue_status
+    from utils.work_queue import WorkQueue
+    
+    if args.command == "init":
+        init_queue(args)
+    
+    elif args.command == "work":
+        run_queue_workers(
+            args.queue,
+            processes=args.processes,
+            threads=args.threads,
+            lease_seconds=args.lease,
+            poll_interval=args.poll_interval,
+            max_attempts=args.max_attempts
+        )
+    
+    elif args.command == "export":
+        export_queue(args.queue, wait=args.wait, poll_interval=args.poll_interval)
+    
+    elif args.command == "status":
+        print_queue_status(WorkQueue(args.queue))
 
 
 def main():
+    if sys.argv[1:2] == ["cache"]:
+        run_cache_command(sys.argv[2:])
+        return
+    
+    if sys.argv[1:2] == ["queue"]:
+        run_queue_command(sys.argv[2:])
+        return
+    
     parser = build_cli_parser()
     args = parser.parse_args()
     
+    if args.plan:
+        from planner import run_plan
+        run_plan(args)
+        return
+    
     from pipeline import run_translation_pipeline
     run_translation_pipeline(args)
 
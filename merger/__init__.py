@@ -0,0 +1,3 @@
+from .text_merger import iter_cached_pages, export_cache, export_txt, export_jsonl, export_markdown
+
+__all__ = ["iter_cached_pages", "export_cache", "export_txt", "export_jsonl", "export_markdown"]
@@ -1,54 +1,219 @@
 import os
 import re
+import json
+import heapq
+from typing import Iterator, List, Optional
 
-def merge_english_and_serbian(
-    input_dir: str = "translated_pages",
-    english_output: str = "merged_english.txt",
-    serbian_output: str = "merged_serbian.txt"
+
+def _scan_jsonl_offsets(cache_file: str) -> dict:
+    """Map page_num -> byte offset of its latest line in a JSONL cache."""
+    offsets = {}
+    with open(cache_file, "rb") as f:
+        offset = f.tell()
+        line = f.readline()
+        while line:
+            if line.strip():
+                try:
+                    page_num = int(json.loads(line)["page_num"])
+                    offsets[page_num] = offset
+                except (ValueError, KeyError):
+                    pass  # torn last line after a crash
+            offset = f.tell()
+            line = f.readline()
+    return offsets
+
+
+def iter_cached_pages(cache_file: str) -> Iterator[dict]:
+    """
+    Yield cached page results in page order.
+
+    Reads the pipeline's append-only JSONL translation cache with constant
+    memory: one pass records the byte offset of every page's latest line,
+    then pages are read back one at a time in page order. Legacy JSON
+    caches ({"1": {...}, ...}) are also accepted.
+
+    Args:
+        cache_file: Path to translation_cache.jsonl (or a legacy .json cache)
+
+    Yields:
+        dict: {"page_num": int, "original": str, "translated": str, ...}
+    """
+    if cache_file.endswith(".json"):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            pages = json.load(f)
+        for key in sorted(pages, key=int):
+            yield pages[key]
+        return
+
+    offsets = _scan_jsonl_offsets(cache_file)
+    with open(cache_file, "rb") as f:
+        for page_num in sorted(offsets):
+            f.seek(offsets[page_num])
+            yield json.loads(f.readline())
+
+
+def export_txt(pages: Iterator[dict], output_path: str, source_lang: str, target_lang: str):
+    """Write pages as plain text with original and translation sections."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"=== Page {page['page_num']} ===\n\n")
+            f.write(f"--- Original ({source_lang}) ---\n")
+            f.write(page.get("original", "").strip() + "\n\n")
+            f.write(f"--- Translation ({target_lang}) ---\n")
+            f.write(page.get("translated", "").strip() + "\n\n")
+    print(f"Text file saved to: {output_path}")
+
+
+def export_jsonl(pages: Iterator[dict], output_path: str, source_lang: str, target_lang: str):
+    """Write one JSON object per page, for search indexing and other tools."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for page in pages:
+            record = {
+                "page": page["page_num"],
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "original": page.get("original", ""),
+                "translated": page.get("translated", ""),
+            }
+            if page.get("failed"):
+                record["failed"] = True
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"JSONL file saved to: {output_path}")
+
+
+def export_markdown(pages: Iterator[dict], output_path: str, source_lang: str, target_lang: str):
+    """Write pages as Markdown with a heading per page and per section."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"## Page {page['page_num']}\n\n")
+            f.write(f"### Original ({source_lang})\n\n")
+            f.write(page.get("original", "").strip() + "\n\n")
+            f.write(f"### Translation ({target_lang})\n\n")
+            f.write(page.get("translated", "").strip() + "\n\n")
+    print(f"Markdown file saved to: {output_path}")
+
+
+STREAMING_EXPORTERS = {
+    "txt": export_txt,
+    "jsonl": export_jsonl,
+    "md": export_markdown,
+}
+
+
+def export_cache(
+    cache_file: str,
+    base_output: str,
+    formats: List[str],
+    source_lang: str,
+    target_lang: str,
+    extra_pages: Optional[List[dict]] = None
 ):
     """
-    Merges all #English# and #Serbian# sections from per-page translation files
-    into two separate output files, adding page numbers as headers.
+    Export a translation cache to the requested streaming formats.
+
+    Args:
+        cache_file: Pipeline translation cache
+        base_output: Output path without extension
+        formats: Any of "txt", "jsonl", "md"
+        source_lang: Source language name (for headers)
+        target_lang: Target language name (for headers)
+        extra_pages: Pages that are not in the cache (e.g. placeholders for
+            failed pages), sorted by page number; merged in page order
+    """
+    output_dir = os.path.dirname(base_output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    for fmt in formats:
+        pages = iter_cached_pages(cache_file) if os.path.exists(cache_file) else iter(())
+        if extra_pages:
+            pages = heapq.merge(pages, extra_pages, key=lambda p: p["page_num"])
+        STREAMING_EXPORTERS[fmt](
+            pages,
+            f"{base_output}.{fmt}",
+            source_lang,
+            target_lang
+        )
+
+
+def merge_page_files(
+    input_dir: str,
+    source_marker: str,
+    target_marker: str,
+    source_output: str,
+    target_output: str,
+    page_label: str = "PAGE",
+    target_page_label: str = None
+):
+    """
+    Merge legacy per-page translation files (page_001.txt, ...) into two
+    files, one per language, streaming one page at a time.
+
+    Each input file holds a #<source_marker># section followed by a
+    #<target_marker># section.
 
     Args:
-        input_dir (str): Folder with per-page translation files (e.g., page_001.txt).
-        english_output (str): Output file path for merged English text.
-        serbian_output (str): Output file path for merged Serbian text.
+        input_dir: Folder with per-page translation files
+        source_marker: Marker of the original section (e.g. "English")
+        target_marker: Marker of the translated section (e.g. "Serbian")
+        source_output: Output file name for the merged original text
+        target_output: Output file name for the merged translation
+        page_label: Page header label
+        target_page_label: Page header label in the translation (default: page_label)
     """
-    english_parts = []
-    serbian_parts = []
+    target_page_label = target_page_label or page_label
 
-    files = sorted([
-        f for f in os.listdir(input_dir)
-        if f.startswith("page_") and f.endswith(".txt")
-    ])
+    files = sorted(
+        (f for f in os.listdir(input_dir) if f.startswith("page_") and f.endswith(".txt")),
+        key=lambda name: int(name.split("_")[1].split(".")[0])
+    )
 
-    for filename in files:
-        path = os.path.join(input_dir, filename)
-        page_number = int(filename.split("_")[1].split(".")[0])
+    source_re = re.compile(
+        rf"#{re.escape(source_marker)}#\s*(.*?)\s*(?=#{re.escape(target_marker)}#|$)", re.DOTALL
+    )
+    target_re = re.compile(rf"#{re.escape(target_marker)}#\s*(.*)", re.DOTALL)
 
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+    with open(os.path.join(input_dir, source_output), "w", encoding="utf-8") as source_f, \
+            open(os.path.join(input_dir, target_output), "w", encoding="utf-8") as target_f:
+        separator = {"source": "", "target": ""}
 
-            english_match = re.search(r"#English#\s*(.*?)\s*(?=#Serbian#|$)", content, re.DOTALL)
-            serbian_match = re.search(r"#Serbian#\s*(.*)", content, re.DOTALL)
+        for filename in files:
+            page_number = int(filename.split("_")[1].split(".")[0])
+            with open(os.path.join(input_dir, filename), "r", encoding="utf-8") as f:
+                content = f.read()
 
-            if english_match:
-                english_text = english_match.group(1).strip()
-                english_parts.append(f"--- PAGE {page_number} ---\n{english_text}")
+            source_match = source_re.search(content)
+            if source_match:
+                source_f.write(f"{separator['source']}--- {page_label} {page_number} ---\n"
+                               f"{source_match.group(1).strip()}")
+                separator["source"] = "\n\n"
 
-            if serbian_match:
-                serbian_text = serbian_match.group(1).strip()
-                serbian_parts.append(f"--- STRANA {page_number} ---\n{serbian_text}")
+            target_match = target_re.search(content)
+            if target_match:
+                target_f.write(f"{separator['target']}--- {target_page_label} {page_number} ---\n"
+                               f"{target_match.group(1).strip()}")
+                separator["target"] = "\n\n"
 
-    with open(os.path.join(input_dir, english_output), "w", encoding="utf-8") as f:
-        f.write("\n\n".join(english_parts))
+    print(f"✅ Saved {source_marker} to '{source_output}' and {target_marker} to '{target_output}' "
+          f"with page numbers.")
 
-    with open(os.path.join(input_dir, serbian_output), "w", encoding="utf-8") as f:
-        f.write("\n\n".join(serbian_parts))
 
-    print(f"✅ Saved English to '{english_output}' and Serbian to '{serbian_output}' with page numbers.")
+def merge_english_and_serbian(
+    input_dir: str = "translated_pages",
+    english_output: str = "merged_english.txt",
+    serbian_output: str = "merged_serbian.txt"
+):
+    """
+    Merges all #English# and #Serbian# sections from per-page translation files
+    into two separate output files, adding page numbers as headers.
+
+    Kept for the legacy per-page file layout; see merge_page_files.
+    """
+    merge_page_files(
+        input_dir, "English", "Serbian", english_output, serbian_output,
+        target_page_label="STRANA"
+    )
 
 
 if __name__ == '__main__':
-    merge_english_and_serbian("../translated_pages")
\ No newline at end of file
+    merge_english_and_serbian("../translated_pages")
@@ -1,48 +1,786 @@
 import os
 import json
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
 from tqdm import tqdm
+from openai import Timeout
 
 from loader.image_loader import load_pdf
-from translator.vision_translator import translate_text, translate_image
+from loader.text_layer import prepare_text_page
+from loader.render_cache import file_hash
+from translator.vision_translator import (
+    translate_text,
+    translate_image,
+    translate_images,
+    translate_original,
+    StructuredOutputError,
+)
 from exporter.docx_exporter import create_bilingual_docx
 from exporter.pdf_exporter import create_bilingual_pdf
-from utils.parallel import parallel_translate, sequential_translate
+from merger.text_merger import export_cache, STREAMING_EXPORTERS
+from utils.parallel import parallel_translate, sequential_translate, group_image_pages
+from utils.concurrency import AIMDController, RequestGate, parse_model_limits
+from utils.cache_manager import CacheManager, parse_size
+from utils.tokens import VISION_MAX_PIXELS
+from utils.images import page_image
+from utils.memory import MemoryBudget
+from utils.profiling import StageProfiler
+from utils.cancellation import CancellationToken, Cancelled
+from utils.retry import retry_with_backoff
+from utils.tiling import is_dense_page, split_dense_page, stitch_tiles
+from utils.langdetect import skip_reason
+from events import (
+    PageLoaded,
+    RequestSent,
+    PartialText,
+    PageDone,
+    PageFailed,
+    ExportProgress,
+    JobDone,
+)
 
 # Thread lock for safe cache file writes
 _cache_lock = threading.Lock()
 
 
-def create_translate_function(source_lang: str, target_lang: str, model: str) -> Callable:
+def create_translate_function(
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    on_partial: Optional[Callable[[int, dict], None]] = None,
+    controller=None,
+    timeout: Optional[float] = None,
+    image_model: Optional[str] = None,
+    escalation_model: Optional[str] = None,
+    gates: Optional[dict] = None,
+    split_dense: bool = False,
+    max_tiles: int = 6,
+    dense_threshold: int = 2500,
+    tile_workers: Optional[int] = None,
+    text_mode: str = "auto",
+    text_cleanup: bool = True,
+    cancel: Optional[CancellationToken] = None,
+    structured: bool = False
+) -> Callable:
     """
     Create a translation function configured with language settings.
     
+    Pages are routed to a model by type: text pages use model, scanned
+    pages (and multi-page groups) use image_model. A page whose response
+    has no translation (empty or malformed) is retried once with
+    escalation_model. With structured, a page whose structured response
+    is still invalid after that raises StructuredOutputError, so it fails
+    (and is retried later) instead of being saved without a translation.
+    
+    Args:
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model for text pages
+        on_partial: Optional callback(page_num, partial) that enables streaming
+            and receives partially parsed sections as tokens arrive
+        controller: Optional AIMDController or RequestGate that limits
+            in-flight requests for models without an entry in gates
+        timeout: Optional request timeout, seconds or openai.Timeout (see request_timeout)
+        image_model: Model for scanned pages (default: model)
+        escalation_model: Stronger model for pages with an empty or
+            malformed response (optional)
+        gates: Optional mapping of model name to its RequestGate
+        split_dense: Split dense scanned pages into tiles translated concurrently
+        max_tiles: Upper bound on tiles per page
+        dense_threshold: Estimated output tokens above which a page is split
+        tile_workers: Tile requests in flight across all pages (default: max_tiles)
+        text_mode: "auto", "translate" or "clean": whether text pages request
+            only the translation (see loader.text_layer.prepare_text_page)
+        text_cleanup: Clean up extracted text locally in translation-only mode
+        cancel: Optional CancellationToken; once it is cancelled no new
+            requests are sent, and with abort_in_flight requests are streamed
+            so they are aborted in flight too (raising Cancelled)
+        structured: Request JSON responses validated against a fixed schema
+            (see translator.vision_translator.TRANSLATION_SCHEMA)
+    
     Returns:
         Callable that takes a page dict and returns translation result
+        (a list of results for "image_group" work items). Each result
+        records the "model" that produced it.
     """
-    def translate_page(page: dict) -> dict:
+    image_model = image_model or model
+    gates = gates or {}
+    
+    def gate(model_name: str):
+        return gates.get(model_name, controller)
+    
+    def translate_group(group: dict) -> list:
+        pages = group["pages"]
+        translated = translate_images(
+            images=[(p["page_num"], page_image(p)) for p in pages],
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=image_model,
+            controller=gate(image_model),
+            timeout=timeout,
+            cancel=cancel,
+            structured=structured
+        )
+        
+        results = []
+        for page in pages:
+            result = translated.get(page["page_num"])
+            if result is None:
+                # Malformed or missing section - retry this page on its own
+                result = translate_page(page)
+            else:
+                result["model"] = image_model
+            result["page_num"] = page["page_num"]
+            results.append(result)
+        return results
+    
+    tile_limit = max(1, tile_workers or max_tiles)
+    tile_slots = threading.BoundedSemaphore(tile_limit)
+    
+    def translate_tiled(image, model_name: str) -> Optional[dict]:
+        columns = split_dense_page(image, max_tiles=max_tiles)
+        tiles = [tile for column in columns for tile in column]
+        if len(tiles) < 2:
+            return None
+        
+        def translate_tile(tile):
+            return translate_image(
+                image=tile,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                model=model_name,
+                controller=gate(model_name),
+                timeout=timeout,
+                tile=True,
+                cancel=cancel,
+                structured=structured
+            )
+        
+        def translate_tile_limited(tile):
+            with tile_slots:
+                return translate_tile(tile)
+        
+        # Nested pool: the tiles of one page run concurrently. Without a gate
+        # nothing else bounds them, so tile requests of all pages share
+        # tile_workers slots (on top of the pages' own workers)
+        with ThreadPoolExecutor(max_workers=min(len(tiles), tile_limit)) as pool:
+            tile_results = list(pool.map(translate_tile_limited, tiles))
+        for result in tile_results:
+            if result.get("invalid_response"):
+                raise StructuredOutputError(f"Invalid response for a tile: {result['invalid_response']}")
+        tile_results = iter(tile_results)
+        
+        by_column = [[next(tile_results) for _ in column] for column in columns]
+        return {
+            "original": stitch_tiles([[r["original"] for r in column] for column in by_column]),
+            "translated": stitch_tiles([[r["translated"] for r in column] for column in by_column]),
+            "tiles": len(tiles),
+        }
+    
+    def translate_with(page: dict, model_name: str) -> dict:
+        image = page_image(page) if page["type"] == "image" else None
+        if split_dense and image is not None and is_dense_page(image, dense_threshold):
+            result = translate_tiled(image, model_name)
+            if result is not None:
+                result["model"] = model_name
+                return result
+        
+        page_partial = None
+        if on_partial:
+            def page_partial(partial: dict):
+                on_partial(page["page_num"], partial)
+        
         if page["type"] == "text":
-            return translate_text(
-                text=page["content"],
+            text, translation_only = prepare_text_page(page, text_mode, text_cleanup)
+            result = translate_text(
+                text=text,
                 source_lang=source_lang,
                 target_lang=target_lang,
-                model=model
+                model=model_name,
+                on_partial=page_partial,
+                controller=gate(model_name),
+                timeout=timeout,
+                translation_only=translation_only,
+                cancel=cancel,
+                structured=structured
             )
         else:
-            return translate_image(
-                image=page["content"],
+            result = translate_image(
+                image=image,
                 source_lang=source_lang,
                 target_lang=target_lang,
-                model=model
+                model=model_name,
+                on_partial=page_partial,
+                controller=gate(model_name),
+                timeout=timeout,
+                cancel=cancel,
+                structured=structured
             )
+        result["model"] = model_name
+        return result
+    
+    def translate_page(page: dict):
+        if page["type"] == "image_group":
+            return translate_group(page)
+        
+        page_model = model if page["type"] == "text" else image_model
+        result = translate_with(page, page_model)
+        
+        has_content = page["type"] != "text" or page["content"].strip()
+        if (escalation_model and escalation_model != page_model
+                and has_content and not result["translated"].strip()):
+            result = translate_with(page, escalation_model)
+            result["escalated_from"] = page_model
+        if result.get("invalid_response"):
+            raise StructuredOutputError(f"Invalid structured response: {result['invalid_response']}")
+        return result
     
     return translate_page
 
 
+def request_timeout(args):
+    """
+    Timeout of API requests from the pipeline arguments.
+    
+    --request-timeout applies to every phase of a request; --connect-timeout
+    and --read-timeout override the time to connect and the longest wait for
+    the next bytes of a response, which bounds a stream that stops sending.
+    
+    Returns:
+        Seconds, an openai.Timeout, or None for the client defaults
+    """
+    timeout = getattr(args, "request_timeout", None)
+    phases = {
+        phase: getattr(args, f"{phase}_timeout", None)
+        for phase in ("connect", "read")
+        if getattr(args, f"{phase}_timeout", None)
+    }
+    if not phases:
+        return timeout
+    return Timeout(timeout, **phases)
+
+
+def build_request_gates(args, models: list) -> dict:
+    """
+    Create a RequestGate per model from the concurrency options.
+    
+    --model-limits entries (model=concurrency[:rpm[:tpm]]) cap a model's requests;
+    with --adaptive-workers each model also gets its own AIMD controller,
+    bounded by its concurrency limit (or --max-workers).
+    
+    Returns:
+        dict: {model: RequestGate} for every model that has a limit
+    """
+    limits = parse_model_limits(getattr(args, "model_limits", None))
+    adaptive = getattr(args, "adaptive_workers", False)
+    
+    gates = {}
+    for model in models:
+        concurrency, rpm, _ = limits.get(model, (None, None, None))
+        if adaptive:
+            max_limit = concurrency or getattr(args, "max_workers", 16)
+            controller = AIMDController(
+                initial=min(args.workers, max_limit),
+                min_limit=min(getattr(args, "min_workers", 1), max_limit),
+                max_limit=max_limit
+            )
+        elif concurrency:
+            controller = AIMDController(initial=concurrency, min_limit=concurrency, max_limit=concurrency)
+        else:
+            continue
+        gates[model] = RequestGate(controller, rpm)
+    return gates
+
+
+def _pool_size(args, models: list, gates: dict) -> int:
+    """Threads needed so every model can use its full concurrency."""
+    size = sum(gates[m].max_concurrency for m in models if m in gates)
+    if any(m not in gates for m in models):
+        size += max(1, args.workers)
+    return size
+
+
+def failure_placeholder(page_num: int, error: str) -> dict:
+    """
+    Stand-in result for a page that failed permanently.
+    
+    Placeholders mark the page in every export but are never written to
+    the translation cache, so a --resume run retries the page.
+    """
+    message = f"[Page {page_num} could not be translated: {error}]"
+    return {
+        "page_num": page_num,
+        "original": message,
+        "translated": message,
+        "failed": True,
+        "error": error,
+    }
+
+
+def precheck_pages(pages: list, source_lang: str, target_lang: str) -> list:
+    """
+    Find text pages that need no translation (see utils.langdetect.skip_reason).
+    
+    Returns:
+        Results for the skipped pages, with the text copied unchanged and
+        "skipped" set to the reason
+    """
+    skipped = []
+    for page in pages:
+        if page["type"] != "text":
+            continue
+        reason = skip_reason(page["content"], source_lang, target_lang)
+        if reason:
+            skipped.append({
+                "page_num": page["page_num"],
+                "original": page["content"],
+                "translated": page["content"],
+                "skipped": reason,
+            })
+    return skipped
+
+
+def retry_failed_pages(
+    pages: list,
+    translate_func: Callable,
+    args,
+    progress_callback: Optional[Callable[[int, int, dict], None]] = None,
+    memory_budget: Optional[MemoryBudget] = None,
+    cancel: Optional[CancellationToken] = None
+) -> dict:
+    """
+    End-of-run retry queue for pages that failed during the main pass.
+    
+    Failures late in a run are often caused by sustained rate limiting or
+    an API incident, so the pages are retried gently: with fewer workers
+    (--retry-workers) and a longer backoff between attempts (--retry-delay,
+    doubling up to --retry-attempts), on top of the per-request retries.
+    
+    Returns:
+        dict: Mapping of page_num (str) to translation result for recovered pages
+    """
+    attempts = getattr(args, "retry_attempts", 2)
+    workers = max(1, getattr(args, "retry_workers", 1))
+    retry_func = retry_with_backoff(
+        max_retries=attempts - 1,
+        initial_delay=getattr(args, "retry_delay", 30.0),
+        backoff_factor=2.0,
+        cancel=cancel
+    )(translate_func)
+    
+    print(f"\nRetrying {len(pages)} failed pages ({workers} workers, up to {attempts} attempts)")
+    return parallel_translate(
+        pages=pages,
+        translate_func=retry_func,
+        max_workers=workers,
+        progress_callback=progress_callback,
+        memory_budget=memory_budget,
+        cancel=cancel
+    )
+
+
+def _append_cache(cache_file: str, result: dict):
+    """Append one page result to the JSONL cache (callers hold _cache_lock)."""
+    with open(cache_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def _compact_cache(cache_file: str, pages: dict):
+    """Rewrite the JSONL cache with one line per page, in page order."""
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for key in sorted(pages, key=int):
+            f.write(json.dumps(pages[key], ensure_ascii=False) + "\n")
+    os.replace(tmp_file, cache_file)
+
+
+def _load_cache(cache_file: str) -> dict:
+    """
+    Load a page cache as {page_num (str): result}.
+    
+    Reads the JSONL cache (later lines win), falling back to a legacy
+    JSON cache with the same name and a .json extension.
+    """
+    legacy_file = os.path.splitext(cache_file)[0] + ".json"
+    if not os.path.exists(cache_file):
+        if os.path.exists(legacy_file):
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+    
+    pages = {}
+    with open(cache_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            pages[str(result["page_num"])] = result
+    return pages
+
+
+def _load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _language_suffix(language: str) -> str:
+    """File name suffix for a language, e.g. "Serbian (Latin)" -> "serbian_latin"."""
+    return "_".join("".join(c if c.isalnum() else " " for c in language).lower().split())
+
+
+def _language_cache_file(output_dir: str, language: str) -> str:
+    """Translation cache of a fan-out target language."""
+    return os.path.join(output_dir, f"translation_cache_{_language_suffix(language)}.jsonl")
+
+
+def target_languages(args) -> list:
+    """Return the requested target languages as a list."""
+    targets = args.target_lang
+    if isinstance(targets, str):
+        targets = [t.strip() for t in targets.split(",") if t.strip()]
+    return list(dict.fromkeys(targets))
+
+
+def output_formats(args) -> list:
+    """Return the requested output formats, expanding "both" to docx + pdf."""
+    requested = getattr(args, "format", "docx")
+    if isinstance(requested, str):
+        requested = [requested]
+    
+    formats = []
+    for fmt in requested:
+        formats.extend(["docx", "pdf"] if fmt == "both" else [fmt])
+    return list(dict.fromkeys(formats))
+
+
+def export_documents(
+    pages_list: list,
+    base_output: str,
+    formats: list,
+    source_lang: str,
+    target_lang: str,
+    cache_file: Optional[str] = None,
+    placeholders: Optional[dict] = None,
+    event_callback: Optional[Callable] = None,
+    fragment_dir: Optional[str] = None
+):
+    """
+    Write the output files for one target language.
+    
+    DOCX/PDF are built from pages_list; the streaming TXT/JSONL/Markdown
+    exporters read the translation cache directly with constant memory.
+    Placeholders (see failure_placeholder) for permanently failed pages
+    are merged into every format in page order. event_callback receives
+    an ExportProgress event after each file. With fragment_dir, DOCX/PDF
+    are assembled from cached per-page fragments and only changed pages
+    are rendered again.
+    """
+    extra_pages = sorted((placeholders or {}).values(), key=lambda p: p["page_num"])
+    if extra_pages:
+        pages_list = sorted(pages_list + extra_pages, key=lambda p: p["page_num"])
+    
+    def exported(fmt: str):
+        if event_callback:
+            event_callback(ExportProgress(fmt, f"{base_output}.{fmt}", target_lang))
+    
+    if cache_file:
+        for fmt in formats:
+            if fmt in STREAMING_EXPORTERS:
+                export_cache(cache_file, base_output, [fmt], source_lang, target_lang,
+                             extra_pages=extra_pages)
+                exported(fmt)
+    
+    if "docx" in formats:
+        create_bilingual_docx(
+            pages=pages_list,
+            output_path=f"{base_output}.docx",
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fragment_dir=fragment_dir
+        )
+        exported("docx")
+    
+    if "pdf" in formats:
+        create_bilingual_pdf(
+            pages=pages_list,
+            output_path=f"{base_output}.pdf",
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fragment_dir=fragment_dir
+        )
+        exported("pdf")
+
+
+def fan_out_translations(
+    args,
+    originals: dict,
+    targets: list,
+    output_dir: str,
+    base_output: str,
+    gates: Optional[dict] = None,
+    placeholders: Optional[dict] = None,
+    event_callback: Optional[Callable] = None,
+    memory_budget: Optional[MemoryBudget] = None,
+    cancel: Optional[CancellationToken] = None
+) -> dict:
+    """
+    Translate cached original text into additional target languages.
+    
+    Each page was transcribed once (vision or text cleanup) by the run for
+    the first target language; every further language only needs cheap
+    text-only requests on that original text.
+    
+    Args:
+        args: Pipeline arguments
+        originals: Mapping of page_num (str) to original text
+        targets: Additional target languages
+        output_dir: Cache directory
+        base_output: Output path prefix (the language is appended)
+        gates: Optional mapping of model name to its RequestGate
+        placeholders: Results marking permanently failed pages in the exports
+        event_callback: Optional callback receiving ExportProgress events
+        memory_budget: Optional MemoryBudget applying backpressure to the workers
+        cancel: Optional CancellationToken; once cancelled, the finished pages
+            are cached and no further languages are translated or exported
+        
+    Returns:
+        dict: Mapping of language to its translation results by page number
+    """
+    all_results = {}
+    total_pages = len(originals)
+    model = getattr(args, "text_model", None) or args.model
+    gates = gates or {}
+    
+    for target_lang in targets:
+        cache_file = _language_cache_file(output_dir, target_lang)
+        translated_pages = {}
+        if args.resume:
+            translated_pages = _load_cache(cache_file)
+        elif os.path.exists(cache_file):
+            os.remove(cache_file)
+        
+        pages = [
+            {"page_num": int(num), "type": "text", "content": text}
+            for num, text in originals.items()
+            if num not in translated_pages
+        ]
+        
+        if pages:
+            print(f"\nTranslating {len(pages)} pages ({args.source_lang} -> {target_lang}) from cached originals")
+            pbar = tqdm(total=len(pages), desc=target_lang, unit="page")
+            
+            def translate_page(page: dict, target_lang=target_lang) -> dict:
+                if not page["content"].strip():
+                    return {"original": page["content"], "translated": ""}
+                if getattr(args, "precheck", False):
+                    reason = skip_reason(page["content"], args.source_lang, target_lang)
+                    if reason:
+                        return {"original": page["content"], "translated": page["content"], "skipped": reason}
+                return translate_original(
+                    text=page["content"],
+                    source_lang=args.source_lang,
+                    target_lang=target_lang,
+                    model=model,
+                    controller=gates.get(model),
+                    timeout=request_timeout(args),
+                    cancel=cancel
+                )
+            
+            def save_progress(completed, total, result, translated_pages=translated_pages,
+                              cache_file=cache_file, pbar=pbar):
+                pbar.update(1)
+                if "error" not in result:
+                    with _cache_lock:
+                        translated_pages[str(result["page_num"])] = result
+                        _append_cache(cache_file, result)
+            
+            try:
+                parallel_translate(
+                    pages=pages,
+                    translate_func=translate_page,
+                    max_workers=_pool_size(args, [model], gates),
+                    progress_callback=save_progress,
+                    largest_first=getattr(args, "schedule", "document") == "largest-first",
+                    memory_budget=memory_budget,
+                    cancel=cancel
+                )
+            finally:
+                pbar.close()
+        
+        with _cache_lock:
+            _compact_cache(cache_file, translated_pages)
+        
+        if cancel is not None and cancel.cancelled:
+            all_results[target_lang] = translated_pages
+            break
+        
+        pages_list = [translated_pages[str(n)] for n in sorted(map(int, translated_pages)) if str(n) in originals]
+        export_documents(
+            pages_list,
+            f"{base_output}_{_language_suffix(target_lang)}",
+            output_formats(args),
+            args.source_lang,
+            target_lang,
+            cache_file=cache_file,
+            placeholders=placeholders,
+            event_callback=event_callback,
+            fragment_dir=os.path.join(output_dir, "fragments")
+        )
+        print(f"Pages translated ({target_lang}): {len(pages_list)}/{total_pages}")
+        all_results[target_lang] = translated_pages
+    
+    return all_results
+
+
+def output_paths(args) -> tuple:
+    """
+    Return (base_output, cache_file) for a run.
+    
+    base_output is the output path without extension; cache_file is the
+    translation cache of the first target language (append-only JSONL,
+    compacted into page order at the end of a run). Its name does not
+    depend on the other target languages, so adding a language to a
+    --resume run keeps the pages already translated; the other languages
+    are cached per language by fan_out_translations.
+    """
+    if args.output:
+        base_output = os.path.splitext(args.output)[0]
+    else:
+        pdf_name = os.path.splitext(os.path.basename(args.pdf))[0]
+        base_output = f"{pdf_name}_translated"
+    
+    return base_output, os.path.join(args.output_dir, "translation_cache.jsonl")
+
+
+def model_routing(args) -> tuple:
+    """
+    Return (text_model, image_model, escalation_model, models) for a run,
+    where models lists every model the run may call.
+    """
+    text_model = getattr(args, "text_model", None) or args.model
+    image_model = getattr(args, "image_model", None) or args.model
+    escalation_model = getattr(args, "escalation_model", None)
+    models = list(dict.fromkeys(filter(None, [text_model, image_model, escalation_model])))
+    return text_model, image_model, escalation_model, models
+
+
+def loader_options(args) -> dict:
+    """Keyword arguments for load_pdf/load_page from the pipeline arguments."""
+    return {
+        "cache_dir": os.path.join(args.output_dir, "images"),
+        "dpi": args.dpi,
+        "crop_margins": getattr(args, "crop_margins", False),
+        "adaptive_dpi": getattr(args, "adaptive_dpi", False),
+        "min_dpi": getattr(args, "min_dpi", 100),
+        "max_dpi": getattr(args, "max_dpi", 300),
+        "pixel_budget": getattr(args, "pixel_budget", None) or VISION_MAX_PIXELS,
+    }
+
+
+def write_outputs(
+    args,
+    translated_pages: dict,
+    total_pages: int,
+    base_output: str,
+    cache_file: str,
+    gates: Optional[dict] = None,
+    placeholders: Optional[dict] = None,
+    event_callback: Optional[Callable] = None,
+    memory_budget: Optional[MemoryBudget] = None,
+    cancel: Optional[CancellationToken] = None
+) -> tuple:
+    """
+    Export the translated pages and fan out to further target languages.
+    
+    Args:
+        args: Pipeline arguments
+        translated_pages: Results of the first target language by page number (str)
+        total_pages: Number of pages in the document
+        base_output: Output path without extension
+        cache_file: Translation cache of the first target language
+        gates: Optional mapping of model name to its RequestGate
+        placeholders: Results marking permanently failed pages, by page number (str)
+        event_callback: Optional callback receiving ExportProgress events
+        memory_budget: Optional MemoryBudget for the fan-out translations
+        cancel: Optional CancellationToken for the fan-out translations
+    
+    Returns:
+        tuple: (pages_list of the first target language in page order,
+        results by target language)
+    """
+    output_dir = args.output_dir
+    targets = target_languages(args)
+    target_lang = targets[0]
+    multi_target = len(targets) > 1
+    
+    # Prepare pages list in order
+    pages_list = []
+    for i in range(1, total_pages + 1):
+        page_key = str(i)
+        if page_key in translated_pages:
+            pages_list.append(translated_pages[page_key])
+    
+    # Create output documents
+    print(f"\nCreating output documents...")
+    
+    if translated_pages and not os.path.exists(cache_file):
+        # Nothing new was translated (e.g. resumed from a legacy JSON cache)
+        _compact_cache(cache_file, translated_pages)
+    
+    export_documents(
+        pages_list,
+        f"{base_output}_{_language_suffix(target_lang)}" if multi_target else base_output,
+        output_formats(args),
+        args.source_lang,
+        target_lang,
+        cache_file=cache_file,
+        placeholders=placeholders,
+        event_callback=event_callback,
+        fragment_dir=os.path.join(args.output_dir, "fragments")
+    )
+    
+    # Translate the shared original text into the remaining target languages
+    all_results = {target_lang: translated_pages}
+    if multi_target:
+        originals_file = os.path.join(output_dir, "originals.json")
+        originals = _load_json(originals_file) if args.resume else {}
+        originals.update({num: page["original"] for num, page in translated_pages.items()})
+        # Pages of an earlier, longer document in the same output directory
+        originals = {num: text for num, text in originals.items() if 1 <= int(num) <= total_pages}
+        with open(originals_file, "w", encoding="utf-8") as f:
+            json.dump(originals, f, ensure_ascii=False, indent=2)
+        
+        all_results.update(fan_out_translations(
+            args,
+            originals,
+            targets[1:],
+            output_dir,
+            base_output,
+            gates=gates,
+            placeholders=placeholders,
+            event_callback=event_callback,
+            memory_budget=memory_budget,
+            cancel=cancel
+        ))
+    
+    return pages_list, all_results
+
+
+def _write_run_summary(output_dir: str, summary: dict):
+    """Write statistics about the run next to the translation cache."""
+    with open(os.path.join(output_dir, "run_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
 def run_translation_pipeline(
     args,
-    progress_callback: Optional[Callable[[int, int, dict], None]] = None
+    progress_callback: Optional[Callable[[int, int, dict], None]] = None,
+    event_callback: Optional[Callable] = None,
+    cancel_token: Optional[CancellationToken] = None
 ) -> dict:
     """
     Main translation pipeline.
@@ -54,80 +792,261 @@ def run_translation_pipeline(
         args: CLI arguments or config object with attributes:
             - pdf: Path to PDF file
             - source_lang: Source language
-            - target_lang: Target language
+            - target_lang: Target language, or a list of languages (fan-out)
             - model: OpenAI model
             - output: Output file path (optional)
-            - format: Output format (docx, pdf, both)
+            - format: Output format (docx, pdf, both, txt, jsonl, md) or a list of them
             - resume: Whether to resume from cache
             - output_dir: Cache directory
             - dpi: Image resolution
             - workers: Number of parallel workers
             - sleep: Sleep between API calls
-        progress_callback: Optional callback(completed, total, result) for progress updates
+            - batch_api: Submit pages through the OpenAI Batch API (optional)
+            - batch_poll_interval: Seconds between batch status checks (optional)
+            - stream: Stream completions and report partial text (optional)
+            - multi_page: Maximum scanned pages per vision request (optional)
+            - adaptive_workers: Adjust concurrency at runtime (AIMD) (optional)
+            - min_workers / max_workers: Bounds for adaptive concurrency (optional)
+            - schedule: "largest-first" or "document" submission order (optional)
+            - request_timeout: Per-request timeout in seconds (optional)
+            - connect_timeout / read_timeout: Override the connect and read
+              phases of the request timeout (optional, see request_timeout)
+            - hedge: Duplicate straggler requests near the end of the job (optional)
+            - hedge_factor: Hedge pages running longer than this multiple of p95 (optional)
+            - retry_attempts: End-of-run attempts for failed pages, 0 to disable (optional)
+            - retry_workers: Concurrency of the end-of-run retry pass (optional)
+            - retry_delay: Initial delay between end-of-run attempts in seconds (optional)
+            - text_model / image_model: Models for text and scanned pages (default: model)
+            - escalation_model: Retry empty or malformed responses with this model (optional)
+            - model_limits: Per-model limits, "model=concurrency[:rpm[:tpm]],..." (optional)
+            - crop_margins: Render only the content area of scanned pages (optional)
+            - split_dense: Split dense scanned pages into concurrent tiles (optional)
+            - max_tiles / dense_threshold: Tiling limits (optional)
+            - adaptive_dpi: Choose the render resolution per scanned page (optional)
+            - min_dpi / max_dpi: Bounds for adaptive DPI (optional)
+            - pixel_budget: Target pixels per rendered page for adaptive DPI (optional)
+            - ocr: OCR scanned pages locally before translation (optional)
+            - ocr_min_confidence: Minimum OCR confidence to use the text path (optional)
+            - ocr_workers: Number of OCR processes (optional)
+            - cache_max_size: Cap on the cache directory size, e.g. "2GB" (optional)
+            - profile: Write per-stage CPU and memory profiles to <output_dir>/profile (optional)
+            - max_memory: Soft RSS limit, e.g. "1GB"; loading and scheduling wait
+              or keep images on disk instead of exceeding it (optional)
+        progress_callback: Optional callback(completed, total, result) for progress updates.
+            When streaming, it is also called with partial results that carry
+            "partial": True and have not been saved to the cache yet.
+        event_callback: Optional callback receiving typed events (see events.py).
+            It is called from worker threads; events.iter_pipeline_events wraps
+            it in an iterator.
+        cancel_token: Optional CancellationToken to stop the job from another
+            thread. Queued pages are dropped, requests in flight are aborted
+            (see CancellationToken.abort_in_flight), finished pages are saved
+            to the cache and no outputs are written; a --resume run continues
+            the job. Ctrl-C cancels the same way, but requests in flight are
+            only aborted with --stream.
         
+    With several target languages, each page is transcribed once together
+    with the first language; the shared original text (originals.json) is
+    then translated into the other languages with text-only requests, and
+    one output set is written per language (<output>_<language>.docx/.pdf).
+    
     Returns:
-        dict: Translation results by page number
+        dict: Translation results by page number (for several target
+        languages, a dict of such results keyed by language)
     """
+    profiler = StageProfiler(getattr(args, "profile", False))
+    try:
+        return _run_pipeline(args, profiler, progress_callback, event_callback, cancel_token)
+    finally:
+        # Written on every exit (cancelled or failed runs too), and stops the
+        # RSS sampler and tracemalloc; a no-op once the run has reported
+        profiler.report(args.output_dir)
+
+
+def _run_pipeline(
+    args,
+    profiler: StageProfiler,
+    progress_callback: Optional[Callable[[int, int, dict], None]],
+    event_callback: Optional[Callable],
+    cancel_token: Optional[CancellationToken]
+) -> dict:
+    """Body of run_translation_pipeline, profiled by profiler."""
     output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
+    emit = event_callback or (lambda event: None)
+    # The pipeline's own token (Ctrl-C) stops scheduling but leaves requests
+    # unstreamed unless --stream is set; a caller's token may abort them
+    cancel = cancel_token or CancellationToken(abort_in_flight=False)
+    memory_budget = None
+    if getattr(args, "max_memory", None):
+        memory_budget = MemoryBudget(parse_size(args.max_memory))
     
-    # Determine output filenames
-    pdf_name = os.path.splitext(os.path.basename(args.pdf))[0]
-    
-    if args.output:
-        base_output = os.path.splitext(args.output)[0]
-    else:
-        base_output = f"{pdf_name}_translated"
-    
-    output_docx = f"{base_output}.docx"
-    output_pdf = f"{base_output}.pdf"
-    
-    # Cache file for resume support
-    cache_file = os.path.join(output_dir, "translation_cache.json")
+    targets = target_languages(args)
+    target_lang = targets[0]
+    multi_target = len(targets) > 1
+    base_output, cache_file = output_paths(args)
     translated_pages = {}
     
     # Load cached translations if resuming
-    if args.resume and os.path.exists(cache_file):
-        with open(cache_file, "r", encoding="utf-8") as f:
-            translated_pages = json.load(f)
-        print(f"Resuming: found {len(translated_pages)} cached pages")
+    if args.resume:
+        translated_pages = _load_cache(cache_file)
+        if translated_pages:
+            print(f"Resuming: found {len(translated_pages)} cached pages")
+    else:
+        # A fresh run must not pick up an earlier document's pages
+        stale = [cache_file, os.path.join(output_dir, "originals.json")]
+        stale += [_language_cache_file(output_dir, lang) for lang in targets[1:]]
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
     
     # Load PDF and analyze pages
     print(f"\nLoading PDF: {args.pdf}")
-    pages = load_pdf(
-        args.pdf,
-        cache_dir=os.path.join(output_dir, "images"),
-        dpi=args.dpi
-    )
+    with profiler.stage("load"):
+        pages = load_pdf(args.pdf, memory_budget=memory_budget, **loader_options(args))
     total_pages = len(pages)
+    for page in pages:
+        emit(PageLoaded(page["page_num"], page["type"], total_pages))
+    
+    # Statistics about this run, written to run_summary.json
+    run_summary = {"pdf": args.pdf, "total_pages": total_pages}
+    rendered_dpis = [p["dpi"] for p in pages if "dpi" in p]
+    if rendered_dpis:
+        run_summary["render_dpi"] = {
+            "min": min(rendered_dpis),
+            "max": max(rendered_dpis),
+            "average": round(sum(rendered_dpis) / len(rendered_dpis), 1),
+        }
     
     # Filter out already translated pages
     pages_to_translate = [p for p in pages if str(p["page_num"]) not in translated_pages]
     
+    # Optional local OCR so confident scanned pages can use the cheaper text path
+    if getattr(args, "ocr", False) and pages_to_translate:
+        from loader.ocr import apply_ocr
+        with profiler.stage("ocr"):
+            apply_ocr(
+                pages_to_translate,
+                source_lang=args.source_lang,
+                min_confidence=getattr(args, "ocr_min_confidence", 80.0),
+                max_workers=getattr(args, "ocr_workers", None)
+            )
+    
+    # Local pre-check: text pages already in the target language, or
+    # without translatable text, are copied unchanged without an API call
+    if getattr(args, "precheck", False) and pages_to_translate:
+        with profiler.stage("precheck"):
+            skipped = precheck_pages(pages_to_translate, args.source_lang, target_lang)
+        for result in skipped:
+            translated_pages[str(result["page_num"])] = result
+            _append_cache(cache_file, result)
+            emit(PageDone(result["page_num"], len(translated_pages), total_pages, result))
+        if skipped:
+            pages_to_translate = [p for p in pages_to_translate if str(p["page_num"]) not in translated_pages]
+            reasons = {}
+            for result in skipped:
+                reasons[result["skipped"]] = reasons.get(result["skipped"], 0) + 1
+            print(f"Pre-check: {len(skipped)} pages need no translation "
+                  f"({', '.join(f'{n} {r}' for r, n in sorted(reasons.items()))})")
+    
+    # Per-page estimates of a --plan run order largest-first scheduling
+    if pages_to_translate:
+        # Imported here: the planner imports this module
+        from planner import apply_plan
+        plan = apply_plan(pages_to_translate, args)
+        if plan:
+            run_summary["plan"] = plan
+    
+    # Model routing: text pages, scanned pages, and escalation of failed responses
+    text_model, image_model, escalation_model, models = model_routing(args)
+    gates = build_request_gates(args, models)
+    
+    # Pages that failed permanently, by page number; not cached
+    placeholders = {}
+    
     if not pages_to_translate:
         print("All pages already translated!")
     else:
-        print(f"\nTranslating {len(pages_to_translate)} pages ({args.source_lang} -> {args.target_lang})")
-        print(f"Model: {args.model}, Workers: {args.workers}\n")
+        print(f"\nTranslating {len(pages_to_translate)} pages ({args.source_lang} -> {target_lang})")
+        if text_model == image_model:
+            model_info = f"Model: {text_model}"
+        else:
+            model_info = f"Models: {text_model} (text), {image_model} (scanned)"
+        if escalation_model:
+            model_info += f", escalating to {escalation_model}"
+        
+        if getattr(args, "batch_api", False):
+            print(f"{model_info}, Mode: Batch API\n")
+        elif gates:
+            limits = ", ".join(
+                f"{m} {g.controller.min_limit}-{g.controller.max_limit}"
+                + (f" @ {g.rpm:g} rpm" if g.rpm else "")
+                for m, g in gates.items()
+            )
+            print(f"{model_info}, Workers: per model ({limits})\n")
+        else:
+            print(f"{model_info}, Workers: {args.workers}\n")
+        
+        # Progress bar for CLI
+        pbar = tqdm(total=len(pages_to_translate), desc="Translating", unit="page")
+        
+        def partial_progress(page_num, partial):
+            pbar.set_postfix_str(
+                f"page {page_num}: {len(partial['translated'])} chars translated",
+                refresh=True
+            )
+            emit(PartialText(page_num, partial["original"], partial["translated"]))
+            if progress_callback:
+                progress_callback(
+                    len(translated_pages),
+                    total_pages,
+                    {"page_num": page_num, "partial": True, **partial}
+                )
         
         # Create translation function
         translate_func = create_translate_function(
             args.source_lang, 
-            args.target_lang, 
-            args.model
+            target_lang, 
+            text_model,
+            on_partial=partial_progress if getattr(args, "stream", False) else None,
+            timeout=request_timeout(args),
+            image_model=image_model,
+            escalation_model=escalation_model,
+            gates=gates,
+            split_dense=getattr(args, "split_dense", False),
+            max_tiles=getattr(args, "max_tiles", 6),
+            dense_threshold=getattr(args, "dense_threshold", 2500),
+            tile_workers=args.workers,
+            text_mode=getattr(args, "text_mode", "auto"),
+            text_cleanup=getattr(args, "text_cleanup", True),
+            cancel=cancel,
+            structured=getattr(args, "structured_output", False)
         )
         
-        # Progress bar for CLI
-        pbar = tqdm(total=len(pages_to_translate), desc="Translating", unit="page")
+        def report_request(item: dict):
+            for page in item.get("pages", [item]):
+                emit(RequestSent(page["page_num"], text_model if page["type"] == "text" else image_model))
+        
+        def translate_and_report(item: dict):
+            report_request(item)
+            return translate_func(item)
+        
+        errors = {}
         
         def cli_progress(completed, total, result):
+            if gates:
+                pbar.set_postfix(concurrency=sum(g.controller.limit for g in gates.values()), refresh=False)
             pbar.update(1)
             # Save to cache after each page (thread-safe)
             if "error" not in result:
                 with _cache_lock:
                     translated_pages[str(result["page_num"])] = result
-                    with open(cache_file, "w", encoding="utf-8") as f:
-                        json.dump(translated_pages, f, ensure_ascii=False, indent=2)
+                    _append_cache(cache_file, result)
+                errors.pop(result["page_num"], None)
+                emit(PageDone(result["page_num"], len(translated_pages), total_pages, result))
+            else:
+                errors[result["page_num"]] = result["error"]
+                emit(PageFailed(result["page_num"], result["error"]))
             # Call external progress callback if provided
             if progress_callback:
                 progress_callback(
@@ -136,65 +1055,183 @@ def run_translation_pipeline(
                     result
                 )
         
-        # Run translation (parallel or sequential based on workers)
+        # Pack short scanned pages into multi-page vision requests
+        work_items = pages_to_translate
+        multi_page = getattr(args, "multi_page", 1)
+        if multi_page > 1 and not getattr(args, "batch_api", False):
+            work_items = group_image_pages(pages_to_translate, max_group_size=multi_page)
+            grouped = sum(len(item["pages"]) for item in work_items if item["type"] == "image_group")
+            if grouped:
+                print(f"Packed {grouped} scanned pages into "
+                      f"{sum(1 for item in work_items if item['type'] == 'image_group')} multi-page requests\n")
+        
+        # Run translation (batch, parallel or sequential)
         try:
-            if args.workers > 1:
-                new_results = parallel_translate(
-                    pages=pages_to_translate,
-                    translate_func=translate_func,
-                    max_workers=args.workers,
-                    progress_callback=cli_progress
-                )
-            else:
-                new_results = sequential_translate(
-                    pages=pages_to_translate,
-                    translate_func=translate_func,
-                    progress_callback=cli_progress,
-                    sleep_between=args.sleep
-                )
+            with profiler.stage("translate"):
+                if getattr(args, "batch_api", False):
+                    from translator.batch_api import run_batch_translation
+                    for page in pages_to_translate:
+                        report_request(page)
+                    new_results = run_batch_translation(
+                        pages=pages_to_translate,
+                        source_lang=args.source_lang,
+                        target_lang=target_lang,
+                        model=text_model,
+                        state_dir=output_dir,
+                        poll_interval=getattr(args, "batch_poll_interval", 30.0),
+                        progress_callback=cli_progress,
+                        image_model=image_model,
+                        text_mode=getattr(args, "text_mode", "auto"),
+                        text_cleanup=getattr(args, "text_cleanup", True),
+                        cancel=cancel,
+                        structured=getattr(args, "structured_output", False)
+                    )
+                elif args.workers > 1 or gates:
+                    new_results = parallel_translate(
+                        pages=work_items,
+                        # Worker threads are profiled per call
+                        translate_func=profiler.wrap("translate", translate_and_report),
+                        # The per-model gates limit requests; the pool only needs enough threads
+                        max_workers=_pool_size(args, models, gates),
+                        progress_callback=cli_progress,
+                        largest_first=getattr(args, "schedule", "document") == "largest-first",
+                        hedge_factor=getattr(args, "hedge_factor", 1.5) if getattr(args, "hedge", False) else None,
+                        memory_budget=memory_budget,
+                        cancel=cancel
+                    )
+                else:
+                    new_results = sequential_translate(
+                        pages=work_items,
+                        translate_func=translate_and_report,
+                        progress_callback=cli_progress,
+                        sleep_between=args.sleep,
+                        cancel=cancel
+                    )
             
             # Merge results
             translated_pages.update(new_results)
             
+            # Retry queue: failed pages get another, gentler pass at the end of the run
+            failed = [p for p in pages_to_translate if str(p["page_num"]) not in translated_pages]
+            if failed and getattr(args, "retry_attempts", 2) > 0 and not cancel.cancelled:
+                pbar.reset(total=len(failed))
+                pbar.set_description("Retrying")
+                with profiler.stage("retry"):
+                    translated_pages.update(retry_failed_pages(
+                        failed, profiler.wrap("retry", translate_and_report), args, cli_progress,
+                        memory_budget=memory_budget, cancel=cancel
+                    ))
+            
+            for page in pages_to_translate:
+                if str(page["page_num"]) not in translated_pages and not cancel.cancelled:
+                    placeholders[str(page["page_num"])] = failure_placeholder(
+                        page["page_num"], errors.get(page["page_num"], "no result")
+                    )
+                    emit(PageFailed(page["page_num"], placeholders[str(page["page_num"])]["error"], permanent=True))
+            
         except KeyboardInterrupt:
+            # Stop the workers too: drop queued pages, abort requests in flight
+            cancel.cancel()
             print("\n\nInterrupted! Saving progress...")
+        except Cancelled:
+            pass  # batch polling stopped; finished batches were saved
         finally:
             pbar.close()
             # Always save final state
             with _cache_lock:
-                with open(cache_file, "w", encoding="utf-8") as f:
-                    json.dump(translated_pages, f, ensure_ascii=False, indent=2)
+                _compact_cache(cache_file, translated_pages)
             print(f"Progress saved: {len(translated_pages)} pages cached")
     
-    # Prepare pages list in order
-    pages_list = []
-    for i in range(1, total_pages + 1):
-        page_key = str(i)
-        if page_key in translated_pages:
-            pages_list.append(translated_pages[page_key])
-    
-    # Create output documents
-    output_format = getattr(args, 'format', 'docx')
+    if cancel.cancelled:
+        print(f"Cancelled after {len(translated_pages)}/{total_pages} pages; "
+              f"rerun with --resume to continue.")
+        run_summary["cancelled"] = True
+        run_summary["pages_translated"] = len(translated_pages)
+        profile_report = profiler.report(output_dir)
+        if profile_report:
+            run_summary["profile"] = profile_report
+        _write_run_summary(output_dir, run_summary)
+        emit(JobDone(translated_pages, run_summary))
+        return translated_pages
     
-    print(f"\nCreating output documents...")
-    
-    if output_format in ("docx", "both"):
-        create_bilingual_docx(
-            pages=pages_list,
-            output_path=output_docx,
-            source_lang=args.source_lang,
-            target_lang=args.target_lang
+    # Export, including the translations into further target languages
+    with profiler.stage("export"):
+        pages_list, all_results = write_outputs(
+            args, translated_pages, total_pages, base_output, cache_file,
+            gates=gates, placeholders=placeholders, event_callback=event_callback,
+            memory_budget=memory_budget, cancel=cancel
         )
     
-    if output_format in ("pdf", "both"):
-        create_bilingual_pdf(
-            pages=pages_list,
-            output_path=output_pdf,
-            source_lang=args.source_lang,
-            target_lang=args.target_lang
-        )
+    if gates and getattr(args, "adaptive_workers", False):
+        run_summary["concurrency"] = {m: g.controller.summary() for m, g in gates.items()}
+    
+    pages_by_model = {}
+    for page in pages_list:
+        if page.get("model"):
+            pages_by_model[page["model"]] = pages_by_model.get(page["model"], 0) + 1
+    escalated = sum(1 for page in pages_list if page.get("escalated_from"))
+    tiled = [page for page in pages_list if page.get("tiles")]
+    if tiled:
+        run_summary["tiled_pages"] = {page["page_num"]: page["tiles"] for page in tiled}
+    skipped = [page for page in pages_list if page.get("skipped")]
+    if skipped:
+        run_summary["skipped_pages"] = [
+            {"page_num": page["page_num"], "reason": page["skipped"]} for page in skipped
+        ]
     
     print(f"\nTranslation complete!")
     print(f"Pages translated: {len(pages_list)}/{total_pages}")
     
-    return translated_pages
+    latencies = [
+        p["first_token_latency"] for p in pages_list
+        if p.get("first_token_latency") is not None
+    ]
+    if latencies:
+        print(f"First-token latency: avg {sum(latencies) / len(latencies):.2f}s, "
+              f"max {max(latencies):.2f}s over {len(latencies)} streamed pages")
+    
+    if len(pages_by_model) > 1 or escalated:
+        print("Pages by model: " + ", ".join(f"{m}: {n}" for m, n in pages_by_model.items())
+              + (f" ({escalated} escalated)" if escalated else ""))
+    
+    for model, concurrency in run_summary.get("concurrency", {}).items():
+        print(f"Concurrency ({model}): {concurrency['initial']} -> {concurrency['final']} "
+              f"(range {concurrency['min']}-{concurrency['max']}, avg {concurrency['average']}, "
+              f"{concurrency['throttled_requests']} throttled requests)")
+    
+    if placeholders:
+        print(f"\n{len(placeholders)} pages failed permanently and are marked in the output: "
+              f"{', '.join(sorted(placeholders, key=int))}")
+        print("Rerun with --resume to retry only these pages.")
+    
+    if getattr(args, "cache_max_size", None):
+        removed = CacheManager(output_dir, parse_size(args.cache_max_size)).gc()
+        if removed:
+            print(f"Cache: evicted {len(removed)} least recently used files")
+    
+    run_summary["pages_translated"] = len(pages_list)
+    run_summary["pages_by_model"] = pages_by_model
+    run_summary["escalated_pages"] = escalated
+    run_summary["failed_pages"] = [
+        {"page_num": p["page_num"], "error": p["error"]}
+        for p in sorted(placeholders.values(), key=lambda p: p["page_num"])
+    ]
+    if multi_target:
+        run_summary["pages_translated_by_language"] = {
+            lang: len(results) for lang, results in all_results.items()
+        }
+    if memory_budget:
+        run_summary["memory"] = {
+            "max_mb": round(memory_budget.max_bytes / 2**20, 1),
+            "peak_rss_mb": round(memory_budget.peak_rss / 2**20, 1),
+            "released_images": sum(1 for p in pages if p["type"] == "image" and p["content"] is None),
+            "backpressure_waits": memory_budget.waits,
+        }
+    profile_report = profiler.report(output_dir)
+    if profile_report:
+        run_summary["profile"] = profile_report
+    _write_run_summary(output_dir, run_summary)
+    
+    results = all_results if multi_target else translated_pages
+    emit(JobDone(results, run_summary))
+    return results
@@ -0,0 +1,497 @@
+import os
+import json
+import math
+import heapq
+from typing import List, Optional
+
+from loader.image_loader import load_pdf
+from loader.text_layer import prepare_text_page
+from pipeline import (
+    build_request_gates,
+    model_routing,
+    loader_options,
+    output_paths,
+    precheck_pages,
+    target_languages,
+    _load_cache,
+)
+from utils.cache_manager import parse_size
+from utils.concurrency import parse_model_limits
+from utils.memory import MemoryBudget
+from utils.parallel import group_image_pages
+from utils.tokens import (
+    MAX_OUTPUT_TOKENS,
+    PROMPT_OVERHEAD_TOKENS,
+    estimate_image_input_tokens,
+    estimate_text_tokens,
+    page_image_stats,
+)
+
+PLAN_FILE = "plan.json"
+
+# USD per 1M (input, output) tokens; --prices overrides or adds entries.
+# Dated snapshots (e.g. gpt-4o-2024-08-06) use the longest matching prefix.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# The Batch API bills half the synchronous price
+BATCH_DISCOUNT = 0.5
+
+# gpt-4o-mini bills images at ~33x the gpt-4o token count (2833 base + 5667 per
+# tile instead of 85 + 170), which keeps its image price close to gpt-4o's
+IMAGE_TOKEN_FACTOR = {
+    "gpt-4o-mini": 2833 / 85,
+}
+
+# Generation speed used for the wall-time estimate, in output tokens per second
+OUTPUT_TOKENS_PER_SECOND = {
+    "gpt-4o": 60,
+    "gpt-4o-mini": 80,
+}
+DEFAULT_TOKENS_PER_SECOND = 50
+
+# Fixed cost of a request (connection, queueing, time to first token)
+REQUEST_OVERHEAD_SECONDS = 1.5
+
+# Target output tokens per tile when dense pages are split (see split_dense_page)
+TILE_TOKENS = 2000
+
+
+def _model_value(table: dict, model: str, default=None):
+    """Entry for model, falling back to the longest key that prefixes it."""
+    if model in table:
+        return table[model]
+    prefixes = [key for key in table if model.startswith(key + "-")]
+    return table[max(prefixes, key=len)] if prefixes else default
+
+
+def parse_prices(spec: str) -> dict:
+    """
+    Parse price overrides such as "gpt-4o=2.5:10,my-model=0.3:1.2".
+
+    Each entry is model=input:output in USD per 1M tokens.
+
+    Returns:
+        dict: {model: (input price, output price)}
+    """
+    prices = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        model, _, values = entry.partition("=")
+        input_price, _, output_price = values.partition(":")
+        if not model or not input_price or not output_price:
+            raise ValueError(f"Invalid price '{entry}', expected model=input:output")
+        prices[model.strip()] = (float(input_price), float(output_price))
+    return prices
+
+
+def plan_settings(args) -> dict:
+    """Settings a plan depends on; a run with other settings ignores the plan."""
+    text_model, image_model, _, _ = model_routing(args)
+    return {
+        "pdf": os.path.abspath(args.pdf),
+        "pdf_mtime": int(os.path.getmtime(args.pdf)),
+        "text_model": text_model,
+        "image_model": image_model,
+        "text_mode": getattr(args, "text_mode", "auto"),
+        "split_dense": getattr(args, "split_dense", False),
+        "loader": {k: v for k, v in loader_options(args).items() if k != "cache_dir"},
+    }
+
+
+def _encoded_bytes(page: dict) -> Optional[int]:
+    """Base64 size of a scanned page's PNG, read from the render cache."""
+    path = page.get("image_path")
+    if not path or not os.path.exists(path):
+        return None
+    return 4 * math.ceil(os.path.getsize(path) / 3)
+
+
+def _image_tokens(width: int, height: int, model: str) -> int:
+    return int(estimate_image_input_tokens(width, height) * _model_value(IMAGE_TOKEN_FACTOR, model, 1))
+
+
+def _plan_text_page(page: dict, text_mode: str, text_cleanup: bool) -> dict:
+    text, translation_only = prepare_text_page(page, text_mode, text_cleanup)
+    text_tokens = estimate_text_tokens(text)
+    # Translation-only requests return the translation alone
+    output_tokens = text_tokens if translation_only else 2 * text_tokens
+    entry = {
+        "translation_only": translation_only,
+        "input_tokens": PROMPT_OVERHEAD_TOKENS + text_tokens,
+        "output_tokens": min(MAX_OUTPUT_TOKENS, output_tokens + 20),
+        "requests": 1,
+    }
+    entry["work"] = _work(entry["input_tokens"], entry["output_tokens"])
+    return entry
+
+
+def _plan_image_page(page: dict, model: str, split_dense: bool, max_tiles: int,
+                     dense_threshold: int) -> dict:
+    width, height, output_tokens = page_image_stats(page)
+    entry = {"width": width, "height": height, "encoded_bytes": _encoded_bytes(page)}
+
+    if split_dense and output_tokens >= dense_threshold:
+        # Tiles are roughly horizontal bands of the page; their output is not capped
+        tiles = max(1, min(max_tiles, math.ceil(output_tokens / TILE_TOKENS)))
+        tile_height = math.ceil(height / tiles)
+        entry.update({
+            "tiles": tiles,
+            "input_tokens": tiles * (PROMPT_OVERHEAD_TOKENS + _image_tokens(width, tile_height, model)),
+            "output_tokens": output_tokens,
+            "requests": tiles,
+        })
+        vision_tokens = tiles * (PROMPT_OVERHEAD_TOKENS + estimate_image_input_tokens(width, tile_height))
+    else:
+        entry.update({
+            "input_tokens": PROMPT_OVERHEAD_TOKENS + _image_tokens(width, height, model),
+            "output_tokens": min(MAX_OUTPUT_TOKENS, output_tokens),
+            "requests": 1,
+        })
+        vision_tokens = PROMPT_OVERHEAD_TOKENS + estimate_image_input_tokens(width, height)
+    # Image token multipliers change the bill, not how long the model takes
+    entry["work"] = _work(vision_tokens, entry["output_tokens"])
+    return entry
+
+
+def _work(input_tokens: int, output_tokens: int) -> float:
+    """Relative request duration, in the unit of utils.tokens.estimate_page_work."""
+    return round(output_tokens + input_tokens / 10, 1)
+
+
+def _request_seconds(work: float, model: str) -> float:
+    """Expected duration of one request doing the given work."""
+    tokens_per_second = _model_value(OUTPUT_TOKENS_PER_SECOND, model, DEFAULT_TOKENS_PER_SECOND)
+    return REQUEST_OVERHEAD_SECONDS + work / tokens_per_second
+
+
+def _simulate(durations: List[float], concurrency: int, rpm: Optional[float] = None,
+              sleep: float = 0.0) -> float:
+    """
+    Makespan of requests run in the given order by concurrency workers,
+    with starts spaced 60/rpm seconds apart as RequestGate does.
+    """
+    workers = [0.0] * max(1, concurrency)
+    next_start = 0.0
+    end = 0.0
+    for duration in durations:
+        start = heapq.heappop(workers)
+        if rpm:
+            start = max(start, next_start)
+            next_start = start + 60.0 / rpm
+        finish = start + duration
+        end = max(end, finish)
+        heapq.heappush(workers, finish + sleep)
+    return end
+
+
+def estimate_wall_time(requests: List[dict], args, models: list) -> dict:
+    """
+    Predict the wall time of the translation requests.
+
+    Models with a --model-limits concurrency (or every model, with
+    --adaptive-workers) run in their own pool; the others share --workers.
+    Each pool is bounded by its concurrency, its requests-per-minute limit
+    and its tokens-per-minute limit, whichever is slowest.
+
+    Args:
+        requests: Dicts with "model", "input_tokens", "output_tokens", "seconds",
+            in submission order
+        args: Pipeline arguments
+        models: Every model the run may call
+
+    Returns:
+        dict: {"seconds": float, "pools": {name: {"concurrency", "requests",
+        "concurrency_seconds", "rpm_seconds", "tpm_seconds", "bound"}}}
+    """
+    limits = parse_model_limits(getattr(args, "model_limits", None))
+    gates = build_request_gates(args, models)
+    sequential = args.workers <= 1 and not gates
+
+    pools = {}
+    for request in requests:
+        name = request["model"] if request["model"] in gates else "shared"
+        pools.setdefault(name, []).append(request)
+
+    result = {"seconds": 0.0, "pools": {}}
+    for name, pool in pools.items():
+        if name in gates:
+            concurrency = gates[name].controller.limit
+            rpm = gates[name].rpm
+            tpm = limits.get(name, (None, None, None))[2]
+        else:
+            concurrency = 1 if sequential else args.workers
+            # Limits of a model without its own pool still apply to the API
+            rpm = min(filter(None, (limits.get(r["model"], (None, None, None))[1] for r in pool)), default=None)
+            tpm = min(filter(None, (limits.get(r["model"], (None, None, None))[2] for r in pool)), default=None)
+
+        durations = [r["seconds"] for r in pool]
+        bounds = {
+            "concurrency": _simulate(durations, concurrency, sleep=args.sleep if sequential else 0.0),
+            "rpm": _simulate(durations, concurrency, rpm) if rpm else 0.0,
+            "tpm": 60.0 * sum(r["input_tokens"] + r["output_tokens"] for r in pool) / tpm if tpm else 0.0,
+        }
+        seconds = max(bounds.values())
+        result["pools"][name] = {
+            "concurrency": concurrency,
+            "requests": len(pool),
+            **{f"{bound}_seconds": round(value, 1) for bound, value in bounds.items()},
+            "bound": max(bounds, key=bounds.get),
+        }
+        result["seconds"] = max(result["seconds"], seconds)
+    return result
+
+
+def plan_job(args) -> dict:
+    """
+    Predict tokens, cost and wall time of a translation job without API calls.
+
+    Runs the local part of the pipeline (loading and classifying pages,
+    rendering scanned pages into the render cache, --ocr and --precheck)
+    and estimates each page's input and output tokens with the settings
+    the real run would use (model routing, --text-mode, --multi-page,
+    --split-dense, extra target languages, cached pages with --resume).
+
+    Returns:
+        dict: The plan, as written to <output_dir>/plan.json
+    """
+    memory_budget = None
+    if getattr(args, "max_memory", None):
+        memory_budget = MemoryBudget(parse_size(args.max_memory))
+    targets = target_languages(args)
+    text_model, image_model, _, models = model_routing(args)
+    text_mode = getattr(args, "text_mode", "auto")
+    text_cleanup = getattr(args, "text_cleanup", True)
+    batch_api = getattr(args, "batch_api", False)
+
+    print(f"\nPlanning: {args.pdf}")
+    pages = load_pdf(args.pdf, memory_budget=memory_budget, **loader_options(args))
+
+    cached = set()
+    if args.resume:
+        cached = {int(k) for k in _load_cache(output_paths(args)[1])}
+    pending = [p for p in pages if p["page_num"] not in cached]
+
+    if getattr(args, "ocr", False) and pending:
+        from loader.ocr import apply_ocr
+        apply_ocr(
+            pending,
+            source_lang=args.source_lang,
+            min_confidence=getattr(args, "ocr_min_confidence", 80.0),
+            max_workers=getattr(args, "ocr_workers", None)
+        )
+
+    skipped = {}
+    if getattr(args, "precheck", False):
+        skipped = {r["page_num"]: r["skipped"] for r in precheck_pages(pending, args.source_lang, targets[0])}
+
+    entries = {}
+    for page in pages:
+        page_num = page["page_num"]
+        model = text_model if page["type"] == "text" else image_model
+        entry = {"page": page_num, "type": page["type"], "model": model}
+        if page["type"] == "text":
+            entry.update(_plan_text_page(page, text_mode, text_cleanup))
+        else:
+            entry.update(_plan_image_page(
+                page, model,
+                split_dense=getattr(args, "split_dense", False) and not batch_api,
+                max_tiles=getattr(args, "max_tiles", 6),
+                dense_threshold=getattr(args, "dense_threshold", 2500)
+            ))
+
+        if page_num in cached:
+            entry["status"] = "cached"
+        elif page_num in skipped:
+            entry["status"] = "skipped"
+            entry["skipped"] = skipped[page_num]
+        else:
+            entry["status"] = "translate"
+        entries[page_num] = entry
+
+    # Requests in submission order: packed scanned pages share a request
+    to_translate = [p for p in pending if entries[p["page_num"]]["status"] == "translate"]
+    work_items = to_translate
+    multi_page = getattr(args, "multi_page", 1)
+    if multi_page > 1 and not batch_api:
+        work_items = group_image_pages(to_translate, max_group_size=multi_page)
+
+    requests = []
+    for item in work_items:
+        members = [entries[p["page_num"]] for p in item.get("pages", [item])]
+        if len(members) > 1:
+            # One prompt for the whole group
+            for entry in members[1:]:
+                entry["group"] = members[0]["page"]
+                entry["input_tokens"] -= PROMPT_OVERHEAD_TOKENS
+            members[0]["group"] = members[0]["page"]
+        input_tokens = sum(e["input_tokens"] for e in members)
+        output_tokens = min(MAX_OUTPUT_TOKENS, sum(e["output_tokens"] for e in members)) \
+            if len(members) > 1 else members[0]["output_tokens"]
+        # Tiles of a dense page are separate requests sharing its work
+        count = members[0]["requests"]
+        work = sum(e["work"] for e in members) / count
+        seconds = _request_seconds(work, members[0]["model"])
+        for entry in members:
+            entry["seconds"] = round(seconds, 1)
+        requests.extend({
+            "model": members[0]["model"],
+            "input_tokens": input_tokens / count,
+            "output_tokens": output_tokens / count,
+            "work": work,
+            "seconds": seconds,
+        } for _ in range(count))
+    if getattr(args, "schedule", "document") == "largest-first":
+        requests.sort(key=lambda r: r["work"], reverse=True)
+
+    # Each extra target language translates the shared original text
+    for language in targets[1:]:
+        for page in to_translate:
+            entry = entries[page["page_num"]]
+            original_tokens = entry["output_tokens"] if entry.get("translation_only") else entry["output_tokens"] // 2
+            extra = {"model": text_model, "input_tokens": PROMPT_OVERHEAD_TOKENS + original_tokens,
+                     "output_tokens": original_tokens + 20}
+            extra["seconds"] = _request_seconds(_work(extra["input_tokens"], extra["output_tokens"]), text_model)
+            requests.append(extra)
+            entry.setdefault("languages", {})[language] = {
+                k: extra[k] for k in ("input_tokens", "output_tokens")
+            }
+
+    prices = {**MODEL_PRICES, **parse_prices(getattr(args, "prices", None))}
+    by_model = {}
+    for request in requests:
+        totals = by_model.setdefault(request["model"], {"requests": 0, "input_tokens": 0, "output_tokens": 0})
+        totals["requests"] += 1
+        totals["input_tokens"] += request["input_tokens"]
+        totals["output_tokens"] += request["output_tokens"]
+    cost = 0.0
+    for model, totals in by_model.items():
+        totals["input_tokens"] = int(totals["input_tokens"])
+        totals["output_tokens"] = int(totals["output_tokens"])
+        price = _model_value(prices, model)
+        if price is None:
+            totals["cost_usd"] = None
+            cost = None
+            continue
+        model_cost = (totals["input_tokens"] * price[0] + totals["output_tokens"] * price[1]) / 1e6
+        if batch_api:
+            model_cost *= BATCH_DISCOUNT
+        totals["cost_usd"] = round(model_cost, 4)
+        if cost is not None:
+            cost += model_cost
+
+    wall_time = None if batch_api else estimate_wall_time(requests, args, models)
+
+    return {
+        "settings": plan_settings(args),
+        "target_languages": targets,
+        "batch_api": batch_api,
+        "total_pages": len(pages),
+        "pages_to_translate": len(to_translate),
+        "pages_cached": len(cached),
+        "pages_skipped": len(skipped),
+        "requests": len(requests),
+        "input_tokens": sum(t["input_tokens"] for t in by_model.values()),
+        "output_tokens": sum(t["output_tokens"] for t in by_model.values()),
+        "cost_usd": round(cost, 2) if cost is not None else None,
+        "wall_seconds": round(wall_time["seconds"]) if wall_time else None,
+        "models": by_model,
+        "pools": wall_time["pools"] if wall_time else {},
+        "pages": [entries[num] for num in sorted(entries)],
+    }
+
+
+def _format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return f"{seconds:.0f}s"
+    if minutes < 60:
+        return f"{minutes}m {seconds % 60:02.0f}s"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def _format_tokens(tokens: int) -> str:
+    if tokens >= 1e6:
+        return f"{tokens / 1e6:.2f}M"
+    if tokens >= 1e3:
+        return f"{tokens / 1e3:.1f}k"
+    return str(tokens)
+
+
+def print_plan(plan: dict):
+    pages = plan["pages"]
+    text_pages = sum(1 for p in pages if p["type"] == "text")
+    print(f"Pages: {plan['total_pages']} ({text_pages} text, {plan['total_pages'] - text_pages} scanned), "
+          f"{plan['pages_to_translate']} to translate "
+          f"({plan['pages_cached']} cached, {plan['pages_skipped']} skipped by pre-check)")
+
+    print(f"\n{'Model':<22} {'Requests':>9} {'Input':>9} {'Output':>9} {'Cost':>10}")
+    for model, totals in plan["models"].items():
+        cost = f"${totals['cost_usd']:.2f}" if totals["cost_usd"] is not None else "unknown"
+        print(f"{model:<22} {totals['requests']:>9} {_format_tokens(totals['input_tokens']):>9} "
+              f"{_format_tokens(totals['output_tokens']):>9} {cost:>10}")
+    cost = f"${plan['cost_usd']:.2f}" if plan["cost_usd"] is not None else "unknown (see --prices)"
+    print(f"{'Total':<22} {plan['requests']:>9} {_format_tokens(plan['input_tokens']):>9} "
+          f"{_format_tokens(plan['output_tokens']):>9} {cost:>10}")
+
+    if plan["batch_api"]:
+        print("\nBatch API: billed at half price, results within 24 hours")
+        return
+
+    print(f"\nEstimated wall time: {_format_duration(plan['wall_seconds'])}")
+    for name, pool in plan["pools"].items():
+        limits = [f"{pool['concurrency']} concurrent"]
+        if pool["rpm_seconds"]:
+            limits.append(f"rpm {_format_duration(pool['rpm_seconds'])}")
+        if pool["tpm_seconds"]:
+            limits.append(f"tpm {_format_duration(pool['tpm_seconds'])}")
+        print(f"  {name}: {pool['requests']} requests, {', '.join(limits)}; "
+              f"{pool['bound']}-bound ({_format_duration(pool[pool['bound'] + '_seconds'])})")
+
+
+def run_plan(args) -> dict:
+    """Plan a job (see plan_job), print the estimate and write plan.json."""
+    if not os.path.exists(args.pdf):
+        raise FileNotFoundError(f"PDF not found: {args.pdf}")
+
+    plan = plan_job(args)
+    print_plan(plan)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    plan_file = os.path.join(args.output_dir, PLAN_FILE)
+    with open(plan_file, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, ensure_ascii=False)
+    print(f"\nPlan written to: {plan_file}")
+    return plan
+
+
+def apply_plan(pages: List[dict], args) -> Optional[dict]:
+    """
+    Attach the per-page estimates of a matching plan.json to pages.
+
+    Pages get "planned_work", which utils.tokens.estimate_page_work uses to
+    order largest-first scheduling. A plan made with other settings (or for
+    a changed PDF) is ignored.
+
+    Returns:
+        dict: The plan's predictions ({"requests", "cost_usd", "wall_seconds"}),
+        or None if no matching plan was found
+    """
+    plan_file = os.path.join(args.output_dir, PLAN_FILE)
+    if not os.path.exists(plan_file):
+        return None
+    with open(plan_file, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("settings") != plan_settings(args):
+        print("Ignoring plan.json from a run with different settings")
+        return None
+
+    work = {entry["page"]: entry["work"] for entry in plan["pages"]}
+    for page in pages:
+        if page["page_num"] in work:
+            page["planned_work"] = work[page["page_num"]]
+    return {k: plan[k] for k in ("requests", "cost_usd", "wall_seconds")}
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules import from the repository root, and config.py requires an API key
+# at import time; the tests never reach the API
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,104 @@
+import json
+
+from translator.batch_api import parse_batch_output
+
+
+def _record(page_num, content=None, status_code=200, error=None):
+    record = {"custom_id": f"page-{page_num}", "error": error}
+    if error is None:
+        record["response"] = {
+            "status_code": status_code,
+            "body": {"choices": [{"message": {"content": content}}]},
+        }
+    return json.dumps(record)
+
+
+def test_parses_original_and_translation():
+    output = _record(1, "#ORIGINAL#\nHallo Welt\n#TRANSLATED#\nHello world")
+
+    results = parse_batch_output(output)
+
+    assert results == {"1": {"original": "Hallo Welt", "translated": "Hello world", "page_num": 1}}
+
+
+def test_translation_only_pages_keep_their_original():
+    output = "\n".join([
+        _record(1, "  Hello world\n"),
+        _record(2, "#ORIGINAL#\nZwei\n#TRANSLATED#\nTwo"),
+    ])
+
+    results = parse_batch_output(output, originals={1: "Hallo Welt"})
+
+    assert results["1"] == {"original": "Hallo Welt", "translated": "Hello world", "page_num": 1}
+    assert results["2"] == {"original": "Zwei", "translated": "Two", "page_num": 2}
+
+
+def test_failed_requests_are_reported_as_errors():
+    output = "\n".join([
+        _record(3, error={"code": "server_error"}),
+        json.dumps({"custom_id": "page-4", "error": None, "response": {
+            "status_code": 429, "body": {"error": {"message": "rate limited"}},
+        }}),
+        "",
+    ])
+
+    results = parse_batch_output(output)
+
+    assert set(results) == {"3", "4"}
+    assert results["3"]["page_num"] == 3 and "server_error" in results["3"]["error"]
+    assert "rate limited" in results["4"]["error"]
+
+
+def test_invalid_structured_response_is_an_error():
+    output = _record(5, "not json")
+
+    results = parse_batch_output(output, structured=True)
+
+    assert results["5"]["page_num"] == 5
+    assert results["5"]["error"].startswith("Invalid structured response")
+
+
+
+class _Crash(Exception):
+    pass
+
+
+def _run(tmp_path, monkeypatch, crash=False, **kwargs):
+    """Run a one-page batch job; returns the input files submitted."""
+    from translator import batch_api
+
+    def wait_for_batch(*args):
+        if crash:
+            raise _Crash()
+        return type("Batch", (), {"id": "b", "status": "completed", "output_file_id": None, "error_file_id": None})()
+
+    submitted = []
+    monkeypatch.setattr(batch_api, "write_batch_files", lambda *args: [
+        {"input_file": "in.jsonl", "page_nums": [1], "translation_only": []}
+    ])
+    monkeypatch.setattr(batch_api, "submit_batch", lambda path: submitted.append(path) or "batch-1")
+    monkeypatch.setattr(batch_api, "wait_for_batch", wait_for_batch)
+    page = {"page_num": 1, "type": "image", "content": None}
+    try:
+        batch_api.run_batch_translation([page], "German", "English", "gpt-4o", str(tmp_path), **kwargs)
+    except _Crash:
+        pass
+    return submitted
+
+
+def test_batch_state_is_resumed_for_the_same_document(tmp_path, monkeypatch):
+    assert _run(tmp_path, monkeypatch, crash=True, document="aaa") == ["in.jsonl"]
+
+    assert _run(tmp_path, monkeypatch, document="aaa") == []
+
+
+def test_batch_state_of_another_document_is_ignored(tmp_path, monkeypatch):
+    _run(tmp_path, monkeypatch, crash=True, document="aaa")
+
+    assert _run(tmp_path, monkeypatch, document="bbb") == ["in.jsonl"]
+
+
+def test_batch_state_is_replaced_without_resume(tmp_path, monkeypatch):
+    _run(tmp_path, monkeypatch, crash=True, document="aaa")
+
+    assert _run(tmp_path, monkeypatch, document="aaa", resume=False) == ["in.jsonl"]
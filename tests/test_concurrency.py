@@ -0,0 +1,112 @@
+import time
+import threading
+
+import pytest
+
+from utils.concurrency import AIMDController, RequestGate, parse_model_limits
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_limit_grows_by_about_one_per_round_of_successes():
+    controller = AIMDController(initial=2, max_limit=8)
+
+    for _ in range(3):  # 2 -> 2.5 -> 2.9 -> 3.24
+        with controller.slot():
+            pass
+
+    assert controller.limit == 3
+
+
+def test_limit_never_exceeds_max():
+    controller = AIMDController(initial=2, max_limit=3)
+
+    for _ in range(50):
+        with controller.slot():
+            pass
+
+    assert controller.limit == 3
+
+
+def test_throttling_halves_the_limit_once_per_congestion_event():
+    controller = AIMDController(initial=8, max_limit=16)
+
+    for _ in range(3):
+        with pytest.raises(RateLimitError):
+            with controller.slot():
+                raise RateLimitError()
+
+    assert controller.limit == 4
+    assert controller.throttled == 3
+
+
+def test_limit_never_drops_below_min():
+    controller = AIMDController(initial=2, min_limit=2)
+
+    with pytest.raises(RateLimitError):
+        with controller.slot():
+            raise RateLimitError()
+
+    assert controller.limit == 2
+
+
+def test_other_errors_do_not_change_the_limit():
+    controller = AIMDController(initial=4)
+
+    with pytest.raises(ValueError):
+        with controller.slot():
+            raise ValueError()
+
+    assert controller.limit == 4
+    assert controller.throttled == 0
+
+
+def test_slots_block_at_the_limit():
+    controller = AIMDController(initial=1, max_limit=1)
+    controller.acquire()
+    acquired = threading.Event()
+
+    def second():
+        controller.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    controller.release(latency=0.01)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_gate_spaces_requests_to_the_rpm_limit():
+    gate = RequestGate(AIMDController(initial=4, max_limit=4), rpm=1200)  # one per 50 ms
+
+    start = time.monotonic()
+    for _ in range(3):
+        with gate.slot():
+            pass
+
+    assert time.monotonic() - start >= 0.1
+    assert gate.max_concurrency == 4
+
+
+def test_gate_without_rpm_does_not_wait():
+    gate = RequestGate(AIMDController(initial=2, max_limit=2))
+
+    start = time.monotonic()
+    for _ in range(20):
+        with gate.slot():
+            pass
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_parse_model_limits():
+    limits = parse_model_limits("gpt-4o=2:100, gpt-4o-mini=8:500:2000000")
+
+    assert limits == {"gpt-4o": (2, 100.0, None), "gpt-4o-mini": (8, 500.0, 2000000.0)}
+    with pytest.raises(ValueError):
+        parse_model_limits("gpt-4o")
@@ -0,0 +1,35 @@
+import time
+import threading
+
+import pytest
+
+from utils.cancellation import CancellationToken, Cancelled
+from utils.retry import retry_with_backoff
+
+
+def test_retries_until_success():
+    calls = []
+
+    @retry_with_backoff(max_retries=2, initial_delay=0)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError()
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+
+
+def test_cancel_keyword_ends_the_backoff():
+    token = CancellationToken()
+
+    @retry_with_backoff(max_retries=3, initial_delay=30)
+    def failing(cancel=None):
+        raise ValueError()
+
+    threading.Timer(0.05, token.cancel).start()
+    start = time.monotonic()
+    with pytest.raises(Cancelled):
+        failing(cancel=token)
+    assert time.monotonic() - start < 5
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from utils.tiling import find_columns, split_dense_page, stitch_bands
+
+
+def _dense_page(columns: int, width: int = 1600, height: int = 2000) -> Image.Image:
+    """A page of dense text lines in columns separated by wide gutters."""
+    rng = random.Random(0)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    gutter = 60
+    column_width = (width - 2 * gutter - (columns - 1) * gutter) // columns
+    for c in range(columns):
+        x0 = gutter + c * (column_width + gutter)
+        for y in range(gutter, height - gutter, 14):
+            x = x0
+            while x < x0 + column_width - 20:
+                word = rng.randint(10, 40)
+                draw.rectangle((x, y, min(x + word, x0 + column_width), y + 8), fill=0)
+                x += word + 8
+    return image
+
+
+@pytest.mark.parametrize("max_tiles", [1, 2, 3, 4, 6])
+def test_tile_count_never_exceeds_max_tiles(max_tiles):
+    image = _dense_page(columns=4)
+    assert len(find_columns(image)) == 4
+
+    tiles = split_dense_page(image, tile_tokens=200, max_tiles=max_tiles)
+
+    assert 1 <= sum(len(bands) for bands in tiles) <= max_tiles
+    assert len(tiles) == min(4, max_tiles)
+
+
+def test_merged_columns_cover_the_page():
+    image = _dense_page(columns=4)
+
+    tiles = split_dense_page(image, tile_tokens=10**6, max_tiles=2)
+
+    assert [len(bands) for bands in tiles] == [1, 1]
+    assert sum(bands[0].width for bands in tiles) == image.width
+
+
+def test_stitch_bands_drops_the_overlap():
+    assert stitch_bands(["one\ntwo\nthree", "two\nthree\nfour"]) == "one\ntwo\nthree\nfour"
+
+
+def test_tile_requests_share_tile_workers_slots(monkeypatch):
+    import time
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pipeline
+
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def fake_translate_image(**kwargs):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return {"original": "x", "translated": "y"}
+
+    monkeypatch.setattr(pipeline, "translate_image", fake_translate_image)
+    translate = pipeline.create_translate_function(
+        "German", "English", "gpt-4o", split_dense=True, max_tiles=6, dense_threshold=0, tile_workers=2
+    )
+    page = {"page_num": 1, "type": "image", "content": _dense_page(columns=2)}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(translate, [dict(page, page_num=n) for n in range(1, 4)]))
+
+    assert all(result["tiles"] > 1 for result in results)
+    assert max(peak) <= 2
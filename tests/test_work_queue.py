@@ -0,0 +1,80 @@
+import pytest
+
+from utils.work_queue import WorkQueue, PENDING, LEASED, DONE, FAILED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.init({"pdf": "/docs/a.pdf"}, [1, 2, 3])
+    return queue
+
+
+def test_lease_and_complete(queue):
+    assert queue.lease("a", 60, limit=2) == [1, 2]
+    assert queue.lease("b", 60, limit=2) == [3]
+    assert queue.lease("c", 60) == []
+
+    assert queue.complete(1, "a", {"page_num": 1, "translated": "x"})
+    assert queue.counts() == {PENDING: 0, LEASED: 2, DONE: 1, FAILED: 0}
+    assert list(queue.results()) == [{"page_num": 1, "translated": "x"}]
+
+
+def test_expired_lease_can_be_taken_over(queue):
+    queue.lease("a", -1, limit=3)  # expired at once
+
+    assert queue.lease("b", 60) == [1]
+    # The first committed result wins
+    assert queue.complete(1, "b", {"page_num": 1})
+    assert not queue.complete(1, "a", {"page_num": 1})
+
+
+def test_renew_keeps_the_lease(queue):
+    queue.lease("a", -1, limit=3)
+
+    assert queue.renew("a", 60) == 3
+    assert queue.lease("b", 60) == []
+    assert queue.renew("b", 60) == 0
+
+
+def test_expired_lease_fails_after_max_attempts(queue):
+    for worker in ("a", "b"):
+        assert 1 in queue.lease(worker, -1, limit=3, max_attempts=2)
+
+    queue.lease("c", 60, limit=3, max_attempts=2)
+
+    assert queue.counts()[FAILED] == 3
+    assert queue.failures()[0] == {"page_num": 1, "attempts": 2, "error": "Lease expired"}
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.lease("a", 60)
+    queue.fail(1, "a", "boom", max_attempts=2)
+    assert queue.counts()[PENDING] == 3
+
+    assert queue.lease("a", 60) == [2]  # fewest attempts first
+    queue.lease("a", 60)
+    assert queue.lease("a", 60) == [1]
+    queue.fail(1, "a", "boom again", max_attempts=2)
+    assert queue.failures() == [{"page_num": 1, "attempts": 2, "error": "boom again"}]
+
+    assert queue.release_failed() == 1
+    assert queue.counts()[PENDING] == 1
+
+
+def test_fail_ignores_pages_leased_by_another_worker(queue):
+    queue.lease("a", -1)
+    queue.lease("b", 60)
+
+    queue.fail(1, "a", "late", max_attempts=1)
+
+    assert queue.counts()[LEASED] == 1
+
+
+def test_init_rejects_other_settings(queue):
+    queue.init({"pdf": "/docs/a.pdf"}, [1, 2, 3, 4])
+    assert sum(queue.counts().values()) == 4
+    assert queue.settings() == {"pdf": "/docs/a.pdf"}
+
+    with pytest.raises(ValueError):
+        queue.init({"pdf": "/docs/b.pdf"}, [1])
@@ -1,4 +1,3 @@
-from .vision_translator import translate_text, translate_image
-
-__all__ = ["translate_text", "translate_image"]
+from .vision_translator import translate_text, translate_image, translate_images, translate_original
 
+__all__ = ["translate_text", "translate_image", "translate_images", "translate_original"]
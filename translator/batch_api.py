@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import logging
+from typing import Callable, List, Optional
+
+from .vision_translator import (
+    client,
+    build_text_request,
+    build_translation_request,
+    build_image_request,
+    parse_translation_response,
+    parse_structured_response,
+    StructuredOutputError,
+)
+from loader.text_layer import prepare_text_page
+from utils.images import page_image
+from utils.cancellation import Cancelled
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_STATE_FILE = "batch_state.json"
+
+# The Batch API rejects input files above 200 MB; stay safely below it
+MAX_BATCH_FILE_BYTES = 180 * 1024 * 1024
+MAX_BATCH_REQUESTS = 50000
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def page_model(page: dict, model: str, image_model: Optional[str] = None) -> str:
+    """Model a page is routed to: model for text pages, image_model for scanned pages."""
+    return model if page["type"] == "text" else (image_model or model)
+
+
+def build_page_request(
+    page: dict,
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    image_model: Optional[str] = None,
+    text_mode: str = "auto",
+    text_cleanup: bool = True,
+    structured: bool = False
+) -> dict:
+    """Build the same request body translate_text/translate_image would send for a page."""
+    if page["type"] == "text":
+        text, translation_only = prepare_text_page(page, text_mode, text_cleanup)
+        if translation_only:
+            return build_translation_request(text, source_lang, target_lang, model)
+        return build_text_request(text, source_lang, target_lang, model, structured=structured)
+    return build_image_request(page_image(page), source_lang, target_lang, image_model or model,
+                               structured=structured)
+
+
+def write_batch_files(
+    pages: List[dict],
+    batch_dir: str,
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    image_model: Optional[str] = None,
+    text_mode: str = "auto",
+    text_cleanup: bool = True,
+    structured: bool = False
+) -> List[dict]:
+    """
+    Write pages as one or more JSONL batch input files.
+
+    A new file is started whenever the current one would exceed the Batch API
+    size or request-count limits.
+
+    Returns:
+        List of dicts: {"input_file": str, "page_nums": [int, ...],
+        "translation_only": [int, ...]} (text pages that request only the translation)
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    chunks = []
+    f = None
+    size = 0
+
+    try:
+        for page in pages:
+            line = json.dumps({
+                "custom_id": f"page-{page['page_num']}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": build_page_request(page, source_lang, target_lang, model, image_model,
+                                           text_mode, text_cleanup, structured),
+            }, ensure_ascii=False) + "\n"
+            line_bytes = len(line.encode("utf-8"))
+
+            if f is None or size + line_bytes > MAX_BATCH_FILE_BYTES \
+                    or len(chunks[-1]["page_nums"]) >= MAX_BATCH_REQUESTS:
+                if f is not None:
+                    f.close()
+                path = os.path.join(batch_dir, f"batch_input_{len(chunks) + 1:03d}.jsonl")
+                f = open(path, "w", encoding="utf-8")
+                chunks.append({"input_file": path, "page_nums": [], "translation_only": []})
+                size = 0
+
+            f.write(line)
+            size += line_bytes
+            chunks[-1]["page_nums"].append(page["page_num"])
+            if page["type"] == "text" and prepare_text_page(page, text_mode, text_cleanup)[1]:
+                chunks[-1]["translation_only"].append(page["page_num"])
+    finally:
+        if f is not None:
+            f.close()
+
+    return chunks
+
+
+def submit_batch(input_file: str) -> str:
+    """Upload a JSONL input file and create a batch job. Returns the batch id."""
+    with open(input_file, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, poll_interval: float = 30.0, cancel=None):
+    """
+    Poll a batch job until it reaches a terminal status.
+
+    Raises Cancelled if the cancel token is cancelled while waiting; the
+    batch keeps running and a later run resumes polling it.
+    """
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+
+        counts = getattr(batch, "request_counts", None)
+        if counts is not None:
+            print(f"Batch {batch_id}: {batch.status} "
+                  f"({counts.completed}/{counts.total} done, {counts.failed} failed)")
+        else:
+            print(f"Batch {batch_id}: {batch.status}")
+        if cancel is None:
+            time.sleep(poll_interval)
+        elif cancel.wait(poll_interval):
+            raise Cancelled("Job cancelled")
+
+
+def parse_batch_output(output_text: str, originals: Optional[dict] = None, structured: bool = False) -> dict:
+    """
+    Parse a Batch API output file into translation results.
+
+    Args:
+        output_text: Contents of the output (or error) file
+        originals: Original text of translation-only pages, by page number;
+            their response is the translation alone
+        structured: The other responses are structured (JSON); one that fails
+            validation is reported as an error, so the next run retries the page
+
+    Returns:
+        dict: Mapping of page_num (str) to result, or to {"error": str} for failed requests
+    """
+    results = {}
+
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        page_num = int(record["custom_id"].split("-", 1)[1])
+        response = record.get("response") or {}
+
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or response.get("body", {}).get("error")
+            results[str(page_num)] = {"page_num": page_num, "error": str(error)}
+            continue
+
+        content = response["body"]["choices"][0]["message"]["content"]
+        if originals and page_num in originals:
+            result = {"original": originals[page_num], "translated": content.strip()}
+        elif structured:
+            try:
+                result = parse_structured_response(content)
+            except StructuredOutputError as e:
+                results[str(page_num)] = {"page_num": page_num, "error": f"Invalid structured response: {e}"}
+                continue
+        else:
+            result = parse_translation_response(content)
+        result["page_num"] = page_num
+        results[str(page_num)] = result
+
+    return results
+
+
+def _load_state(state_file: str) -> Optional[dict]:
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(state_file: str, state: dict):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def run_batch_translation(
+    pages: List[dict],
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    state_dir: str,
+    poll_interval: float = 30.0,
+    progress_callback: Optional[Callable[[int, int, dict], None]] = None,
+    image_model: Optional[str] = None,
+    text_mode: str = "auto",
+    text_cleanup: bool = True,
+    cancel=None,
+    structured: bool = False,
+    document: Optional[str] = None,
+    resume: bool = True
+) -> dict:
+    """
+    Translate pages through the OpenAI Batch API.
+
+    Submitted batch ids are recorded in a state file inside state_dir, so a
+    restarted process resumes polling the existing batches instead of
+    submitting (and paying for) the same pages again. The state is only
+    resumed for the same document and settings.
+
+    Args:
+        pages: List of page dicts still needing translation
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model to use (for text pages)
+        state_dir: Directory for batch input files and the state file
+        poll_interval: Seconds between status checks
+        progress_callback: Optional callback(completed, total, result) per page
+        image_model: Model for scanned pages (default: model)
+        text_mode: Translation-only mode for text pages (see prepare_text_page)
+        text_cleanup: Clean up extracted text locally in translation-only mode
+        cancel: Optional CancellationToken that stops polling (raises Cancelled);
+            results of finished batches have been reported by then
+        structured: Request structured (JSON) responses (see parse_batch_output)
+        document: Content hash of the PDF the pages belong to
+        resume: Resume batches from an existing state file; otherwise it is replaced
+
+    Returns:
+        dict: Mapping of page_num (str) to translation result
+    """
+    state_file = os.path.join(state_dir, BATCH_STATE_FILE)
+    state = _load_state(state_file) if resume else None
+    settings = {"source_lang": source_lang, "target_lang": target_lang, "model": model}
+    if document:
+        settings["document"] = document
+    if image_model and image_model != model:
+        settings["image_model"] = image_model
+    if text_mode != "auto":
+        settings["text_mode"] = text_mode
+    if not text_cleanup:
+        settings["text_cleanup"] = False
+    if structured:
+        settings["structured"] = True
+
+    if state and state.get("settings") != settings:
+        print("Ignoring batch state from a run with different settings")
+        state = None
+
+    if state:
+        print(f"Resuming {len(state['batches'])} submitted batch(es)")
+    else:
+        chunks = write_batch_files(
+            pages,
+            os.path.join(state_dir, "batches"),
+            source_lang,
+            target_lang,
+            model,
+            image_model,
+            text_mode,
+            text_cleanup,
+            structured
+        )
+        state = {"settings": settings, "batches": chunks}
+        _save_state(state_file, state)
+
+    # Submit any chunk that does not have a batch id yet (also covers a crash mid-submission)
+    for chunk in state["batches"]:
+        if not chunk.get("batch_id"):
+            chunk["batch_id"] = submit_batch(chunk["input_file"])
+            _save_state(state_file, state)
+            print(f"Submitted batch {chunk['batch_id']} ({len(chunk['page_nums'])} pages)")
+
+    models = {page["page_num"]: page_model(page, model, image_model) for page in pages}
+    texts = {page["page_num"]: page for page in pages if page["type"] == "text"}
+    results = {}
+    # A resumed batch may hold pages cached since it was submitted; only
+    # the pages still pending are reported (the others are not in texts,
+    # so their translation-only responses could not be parsed)
+    total = sum(1 for chunk in state["batches"] for page_num in chunk["page_nums"] if page_num in models)
+    completed = 0
+
+    for chunk in state["batches"]:
+        batch = wait_for_batch(chunk["batch_id"], poll_interval, cancel)
+
+        # Batches submitted before translation-only mode have no such pages
+        originals = {
+            page_num: prepare_text_page(texts[page_num], text_mode, text_cleanup)[0]
+            for page_num in chunk.get("translation_only", [])
+            if page_num in texts
+        }
+        chunk_results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                chunk_results.update(parse_batch_output(client.files.content(file_id).text, originals, structured))
+
+        if batch.status != "completed":
+            logger.warning(f"Batch {batch.id} ended with status '{batch.status}'")
+
+        for page_num in chunk["page_nums"]:
+            if page_num not in models:
+                continue
+            result = chunk_results.get(str(page_num)) or {
+                "page_num": page_num,
+                "error": f"No result returned (batch {batch.status})"
+            }
+            completed += 1
+            if "error" not in result:
+                result["model"] = models.get(page_num, model)
+                results[str(page_num)] = result
+            else:
+                logger.warning(f"Page {page_num} failed: {result['error']}")
+            if progress_callback:
+                progress_callback(completed, total, result)
+
+    # All batches are finished; failed pages are picked up by the next run
+    os.remove(state_file)
+
+    return results
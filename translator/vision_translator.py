@@ -1,19 +1,51 @@
-import base64
 import re
-from io import BytesIO
+import json
+import time
+import logging
+from contextlib import nullcontext
+from typing import Callable, Iterator, List, Optional, Tuple
 from PIL import Image
 from openai import OpenAI
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, OPENAI_BASE_URL
 from utils.retry import retry_with_backoff
+from utils.images import encode_image_to_base64
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
 
+client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
-def encode_image_to_base64(image: Image.Image) -> str:
-    """Convert a PIL image to base64-encoded PNG string."""
-    buffered = BytesIO()
-    image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+# Schema of structured (JSON) responses. A multi-page response has entries
+# for every page; a long page may come back as several consecutive entries
+# (segments) with the same page number.
+TRANSLATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "pages": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "page": {"type": "integer"},
+                    "original": {"type": "string"},
+                    "translated": {"type": "string"},
+                },
+                "required": ["page", "original", "translated"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["pages"],
+    "additionalProperties": False,
+}
+
+STRUCTURED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "page_translations", "strict": True, "schema": TRANSLATION_SCHEMA},
+}
+
+
+class StructuredOutputError(ValueError):
+    """A structured response does not match TRANSLATION_SCHEMA."""
 
 
 def parse_translation_response(response_text: str) -> dict:
@@ -40,37 +72,126 @@ def parse_translation_response(response_text: str) -> dict:
     }
 
 
-@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
-def translate_text(
+def _structured_entries(response_text: str) -> List[dict]:
+    """Validate a structured response against TRANSLATION_SCHEMA and return its entries."""
+    try:
+        data = json.loads(response_text)
+    except ValueError as e:
+        raise StructuredOutputError(f"Response is not valid JSON: {e}")
+    
+    entries = data.get("pages") if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise StructuredOutputError('Response has no "pages" entries')
+    for entry in entries:
+        if not (isinstance(entry, dict)
+                and isinstance(entry.get("page"), int)
+                and isinstance(entry.get("original"), str)
+                and isinstance(entry.get("translated"), str)):
+            raise StructuredOutputError(f"Malformed page entry: {str(entry)[:100]}")
+    return entries
+
+
+def _merge_segments(entries: List[dict]) -> dict:
+    return {
+        "original": "\n\n".join(e["original"].strip() for e in entries if e["original"].strip()),
+        "translated": "\n\n".join(e["translated"].strip() for e in entries if e["translated"].strip()),
+    }
+
+
+def parse_structured_response(response_text: str) -> dict:
+    """
+    Parse a structured response for a single page (all entries are its segments).
+    
+    Raises:
+        StructuredOutputError: The response does not match the schema, or
+            it has original text but no translation
+    
+    Returns:
+        dict: {"original": str, "translated": str}
+    """
+    result = _merge_segments(_structured_entries(response_text))
+    if result["original"] and not result["translated"]:
+        raise StructuredOutputError("Response has no translation")
+    return result
+
+
+def parse_structured_pages(response_text: str, page_nums: List[int]) -> dict:
+    """
+    Split a structured multi-page response into per-page sections.
+    
+    Like parse_multi_page_response, pages that are missing, or have
+    original text but no translation, are left out so the caller can retry
+    them on their own; so are all pages of a response that does not match
+    the schema.
+    
+    Returns:
+        dict: Mapping of page_num (int) to {"original": str, "translated": str}
+    """
+    try:
+        entries = _structured_entries(response_text)
+    except StructuredOutputError as e:
+        logger.warning(f"Invalid structured response for pages {page_nums}: {e}")
+        return {}
+    
+    results = {}
+    for page_num in page_nums:
+        segments = [e for e in entries if e["page"] == page_num]
+        if not segments:
+            continue
+        result = _merge_segments(segments)
+        if result["original"] and not result["translated"]:
+            continue
+        results[page_num] = result
+    return results
+
+
+def _json_output_format(original: str, target_lang: str, multi_page: bool = False) -> str:
+    """Output format section of a prompt for structured (JSON) responses."""
+    pages = "one entry per page, in the given order" if multi_page else 'one entry with "page": 1'
+    return f"""Output format: a JSON object {{"pages": [{{"page": <number>, "original": "...", "translated": "..."}}]}}
+- "original": the {original}
+- "translated": the translation into {target_lang}
+- {pages}; a very long page may be split into several consecutive entries with the same page number"""
+
+
+def _with_format(request: dict, structured: bool) -> dict:
+    if structured:
+        request["response_format"] = STRUCTURED_RESPONSE_FORMAT
+    return request
+
+
+def build_text_request(
     text: str,
     source_lang: str,
     target_lang: str,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    structured: bool = False
 ) -> dict:
     """
-    Translate extracted text from a text-based PDF page.
+    Build the chat completion request body used to translate a text page.
+    
+    With structured=True the response is JSON matching TRANSLATION_SCHEMA
+    (see parse_structured_response) instead of marker-delimited text.
     
-    Args:
-        text: The extracted text to translate
-        source_lang: Source language name
-        target_lang: Target language name
-        model: OpenAI model to use
-        
     Returns:
-        dict: {"original": str, "translated": str}
+        dict: Keyword arguments for client.chat.completions.create
     """
+    output_format = f"""Output format (use these EXACT markers):
+#ORIGINAL#
+[cleaned text in {source_lang}]
+
+#TRANSLATED#
+[translated text in {target_lang}]"""
+    if structured:
+        output_format = _json_output_format(f"cleaned text in {source_lang}", target_lang)
+    
     system_prompt = f"""You are a professional translator.
 
 Your task:
 1. Clean up and format the provided {source_lang} text (fix OCR errors, formatting issues)
 2. Translate it into {target_lang}
 
-Output format (use these EXACT markers):
-#ORIGINAL#
-[cleaned text in {source_lang}]
-
-#TRANSLATED#
-[translated text in {target_lang}]
+{output_format}
 
 Rules:
 - Preserve the original structure, paragraphs, and meaning
@@ -78,52 +199,85 @@ Rules:
 - Do not use markdown formatting
 - Fix obvious OCR or extraction errors in the original"""
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return _with_format({
+        "model": model,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": text}
         ],
-        max_tokens=4096,
-        temperature=0.2,
-    )
+        "max_tokens": 4096,
+        "temperature": 0.2,
+    }, structured)
+
+
+def build_translation_request(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini"
+) -> dict:
+    """
+    Build the chat completion request body that only translates text
+    (no cleaned copy of the original is requested back).
     
-    return parse_translation_response(response.choices[0].message.content)
+    Returns:
+        dict: Keyword arguments for client.chat.completions.create
+    """
+    system_prompt = f"""You are a professional translator.
 
+Translate the provided {source_lang} text into {target_lang}.
 
-@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
-def translate_image(
+Rules:
+- Output ONLY the {target_lang} translation
+- Preserve the original structure, paragraphs, and meaning
+- Do not summarize, explain, or add commentary
+- Do not use markdown formatting"""
+
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ],
+        "max_tokens": 4096,
+        "temperature": 0.2,
+    }
+
+
+def build_image_request(
     image: Image.Image,
     source_lang: str,
     target_lang: str,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    tile: bool = False,
+    structured: bool = False
 ) -> dict:
     """
-    Extract text from a scanned page image using vision and translate it.
+    Build the chat completion request body used to translate a scanned page
+    (or, with tile=True, one tile of a page split into several requests).
+    structured=True requests JSON as in build_text_request.
     
-    Args:
-        image: PIL Image of the scanned page
-        source_lang: Source language name
-        target_lang: Target language name
-        model: OpenAI model to use
-        
     Returns:
-        dict: {"original": str, "translated": str}
+        dict: Keyword arguments for client.chat.completions.create
     """
     base64_image = encode_image_to_base64(image)
     
+    output_format = f"""Output format (use these EXACT markers):
+#ORIGINAL#
+[extracted text in {source_lang}]
+
+#TRANSLATED#
+[translated text in {target_lang}]"""
+    if structured:
+        output_format = _json_output_format(f"extracted text in {source_lang}", target_lang)
+    
     system_prompt = f"""You are a professional translator and OCR expert.
 
 Your task:
 1. Extract ALL text from this scanned page image in its original {source_lang} language
 2. Translate the extracted text into {target_lang}
 
-Output format (use these EXACT markers):
-#ORIGINAL#
-[extracted text in {source_lang}]
-
-#TRANSLATED#
-[translated text in {target_lang}]
+{output_format}
 
 Rules:
 - Preserve the original structure, paragraphs, and line breaks
@@ -131,9 +285,14 @@ Rules:
 - Do not use markdown formatting or styled text
 - If text is unclear, make your best effort to transcribe it"""
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    if tile:
+        system_prompt += """
+- The image is one part of a larger page: it may start or end mid-sentence.
+  Transcribe and translate exactly what is visible; do not complete or comment on cut-off text"""
+
+    return _with_format({
+        "model": model,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {
                 "role": "user",
@@ -145,8 +304,420 @@ Rules:
                 ]
             }
         ],
-        max_tokens=4096,
-        temperature=0.2,
+        "max_tokens": 4096,
+        "temperature": 0.2,
+    }, structured)
+
+
+def parse_partial_response(response_text: str) -> dict:
+    """
+    Parse an incomplete (still streaming) response into original and translated sections.
+    
+    A marker that has only partially arrived is dropped so it never shows up
+    in the preview text.
+    
+    Returns:
+        dict: {"original": str, "translated": str}
+    """
+    for marker in ("#TRANSLATED#", "#ORIGINAL#"):
+        for i in range(len(marker) - 1, 0, -1):
+            if response_text.endswith(marker[:i]):
+                response_text = response_text[:-i]
+                break
+    
+    if "#ORIGINAL#" not in response_text:
+        return {"original": "", "translated": ""}
+    
+    return parse_translation_response(response_text)
+
+
+def _json_string_prefix(value: str) -> str:
+    """Decode the received part of a JSON string, dropping a cut-off escape."""
+    value = re.sub(r"\\u[0-9a-fA-F]{0,3}$", "", value)
+    try:
+        return json.loads(f'"{value}"')
+    except ValueError:
+        return ""
+
+
+def parse_partial_structured_response(response_text: str) -> dict:
+    """
+    Parse an incomplete (still streaming) structured response into original
+    and translated sections, joining the segments received so far.
+    
+    Returns:
+        dict: {"original": str, "translated": str}
+    """
+    sections = {"original": [], "translated": []}
+    for key, value in re.findall(r'"(original|translated)"\s*:\s*"((?:[^"\\]|\\.)*)', response_text):
+        sections[key].append(_json_string_prefix(value))
+    return {key: "\n\n".join(filter(None, values)) for key, values in sections.items()}
+
+
+def _request_options(timeout) -> dict:
+    """
+    Per-request client options (omitted entirely to keep the client defaults).
+    
+    timeout is in seconds, or an openai.Timeout with separate connect and
+    read timeouts.
+    """
+    return {"timeout": timeout} if timeout else {}
+
+
+def _stream_chunks(request: dict, timeout=None, cancel=None) -> Iterator[str]:
+    """
+    Stream a completion and yield its text deltas.
+    
+    The cancel token is checked between chunks; leaving the loop closes
+    the stream, and with it the connection, so the server stops generating.
+    """
+    with client.chat.completions.create(**request, stream=True, **_request_options(timeout)) as stream:
+        for chunk in stream:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def _create(request: dict, timeout=None, cancel=None) -> str:
+    """
+    Send a chat completion request and return the response text.
+    
+    With a cancel token that has abort_in_flight set, the response is
+    streamed, so cancelling the job aborts the request in flight instead of
+    waiting for the whole response.
+    """
+    if cancel is None or not cancel.abort_in_flight:
+        response = client.chat.completions.create(**request, **_request_options(timeout))
+        return response.choices[0].message.content
+    return "".join(_stream_chunks(request, timeout, cancel))
+
+
+def _stream_completion(
+    request: dict,
+    on_partial: Callable[[dict], None],
+    partial_interval: float = 0.25,
+    timeout=None,
+    parse: Callable[[str], dict] = parse_translation_response,
+    parse_partial: Callable[[str], dict] = parse_partial_response,
+    cancel=None
+) -> dict:
+    """Stream a completion, reporting partially parsed sections as tokens arrive."""
+    start = time.monotonic()
+    first_token_latency = None
+    last_partial = 0.0
+    chunks = []
+    
+    for delta in _stream_chunks(request, timeout, cancel):
+        now = time.monotonic()
+        if first_token_latency is None:
+            first_token_latency = now - start
+        chunks.append(delta)
+        
+        if now - last_partial >= partial_interval:
+            last_partial = now
+            on_partial(parse_partial("".join(chunks)))
+    
+    result = parse("".join(chunks))
+    result["first_token_latency"] = first_token_latency
+    return result
+
+
+def _parsers(structured: bool) -> dict:
+    """parse/parse_partial arguments of _complete for the response format."""
+    if structured:
+        return {"parse": parse_structured_response, "parse_partial": parse_partial_structured_response}
+    return {}
+
+
+def _complete(
+    request: dict,
+    on_partial: Optional[Callable[[dict], None]] = None,
+    controller=None,
+    timeout=None,
+    parse: Callable[[str], dict] = parse_translation_response,
+    parse_partial: Callable[[str], dict] = parse_partial_response,
+    cancel=None
+) -> dict:
+    """
+    Send a chat completion request and parse the translation sections.
+    
+    If on_partial is given the completion is streamed, and on_partial is called
+    with the partially parsed sections as tokens arrive. If controller (an
+    AIMDController) is given, the request waits for a concurrency slot and
+    reports its latency or throttling back. timeout is the request timeout
+    (see _request_options). parse and parse_partial turn the (partial)
+    response text into sections. With a CancellationToken in cancel, the
+    request is not sent once the job is cancelled, and is aborted between
+    streamed chunks if it is cancelled in flight (see utils.cancellation).
+    
+    A response that parse rejects with StructuredOutputError is requested
+    once more; if that one is invalid too, the result has empty sections and
+    "invalid_response" set to the reason.
+    
+    Returns:
+        dict: {"original": str, "translated": str}, plus "first_token_latency"
+        (seconds) when streaming
+    """
+    for attempt in range(2):
+        if cancel is not None:
+            cancel.raise_if_cancelled()  # before waiting for a slot
+        try:
+            with controller.slot() if controller else nullcontext():
+                if on_partial is not None:
+                    return _stream_completion(request, on_partial, timeout=timeout,
+                                              parse=parse, parse_partial=parse_partial, cancel=cancel)
+                return parse(_create(request, timeout, cancel))
+        except StructuredOutputError as e:
+            if attempt:
+                return {"original": "", "translated": "", "invalid_response": str(e)}
+            logger.warning(f"Invalid structured response ({e}), requesting it again")
+
+
+def build_images_request(
+    images: List[Tuple[int, Image.Image]],
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini",
+    structured: bool = False
+) -> dict:
+    """
+    Build a chat completion request that translates several scanned pages at once.
+    
+    Args:
+        images: List of (page_num, image) tuples
+        structured: Request JSON with one entry per page (see parse_structured_pages)
+    
+    Returns:
+        dict: Keyword arguments for client.chat.completions.create
+    """
+    output_format = f"""Output format (use these EXACT markers, one block per page, in the given order):
+#PAGE <number>#
+#ORIGINAL#
+[extracted text in {source_lang}]
+
+#TRANSLATED#
+[translated text in {target_lang}]"""
+    block = "#PAGE# block"
+    if structured:
+        output_format = _json_output_format(f"extracted text in {source_lang}", target_lang, multi_page=True)
+        block = "entry"
+    
+    system_prompt = f"""You are a professional translator and OCR expert.
+
+You will receive several scanned page images, each introduced by its page number.
+
+Your task, for EVERY page:
+1. Extract ALL text from the page image in its original {source_lang} language
+2. Translate the extracted text into {target_lang}
+
+{output_format}
+
+Rules:
+- Never merge pages; text from one image belongs only to its own {block}
+- Preserve the original structure, paragraphs, and line breaks
+- Do not summarize, explain, or add commentary
+- Do not use markdown formatting or styled text
+- If text is unclear, make your best effort to transcribe it"""
+
+    content = []
+    for page_num, image in images:
+        content.append({"type": "text", "text": f"Page {page_num}:"})
+        content.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:image/png;base64,{encode_image_to_base64(image)}"}
+        })
+
+    return _with_format({
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content}
+        ],
+        "max_tokens": 4096,
+        "temperature": 0.2,
+    }, structured)
+
+
+def parse_multi_page_response(response_text: str) -> dict:
+    """
+    Split a multi-page response into per-page translation sections.
+    
+    Blocks without both #ORIGINAL# and #TRANSLATED# markers are treated as
+    malformed and left out, so the caller can retry those pages on their own.
+    
+    Returns:
+        dict: Mapping of page_num (int) to {"original": str, "translated": str}
+    """
+    results = {}
+    parts = re.split(r"#PAGE\s*(\d+)\s*#", response_text)
+    
+    # parts = [preamble, num, block, num, block, ...]
+    for num, block in zip(parts[1::2], parts[2::2]):
+        if "#ORIGINAL#" not in block or "#TRANSLATED#" not in block:
+            continue
+        results[int(num)] = parse_translation_response(block)
+    
+    return results
+
+
+@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
+def translate_text(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini",
+    on_partial: Optional[Callable[[dict], None]] = None,
+    controller=None,
+    timeout=None,
+    translation_only: bool = False,
+    cancel=None,
+    structured: bool = False
+) -> dict:
+    """
+    Translate extracted text from a text-based PDF page.
+    
+    Args:
+        text: The extracted text to translate
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model to use
+        on_partial: Optional callback receiving partial sections; enables streaming
+        controller: Optional AIMDController limiting concurrent requests
+        timeout: Optional request timeout (seconds or openai.Timeout)
+        translation_only: Request only the translation and return text as
+            the original, instead of asking for a cleaned copy of it
+            (about half the output tokens)
+        cancel: Optional CancellationToken that aborts the request
+        structured: Request a JSON response validated against
+            TRANSLATION_SCHEMA (translation-only requests stay plain text)
+        
+    Returns:
+        dict: {"original": str, "translated": str}, plus "invalid_response"
+        if a structured response failed validation twice (see _complete)
+    """
+    if not translation_only:
+        request = build_text_request(text, source_lang, target_lang, model, structured=structured)
+        return _complete(request, on_partial=on_partial, controller=controller, timeout=timeout,
+                         cancel=cancel, **_parsers(structured))
+    
+    request = build_translation_request(text, source_lang, target_lang, model)
+    return _complete(
+        request,
+        on_partial=on_partial,
+        controller=controller,
+        timeout=timeout,
+        cancel=cancel,
+        parse=lambda response: {"original": text, "translated": response.strip()},
+        parse_partial=lambda response: {"original": text, "translated": response}
     )
+
+
+@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
+def translate_original(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini",
+    controller=None,
+    timeout=None,
+    cancel=None
+) -> dict:
+    """
+    Translate already transcribed text, keeping it as the original unchanged.
+    
+    Args:
+        text: The original text (e.g. cached from an earlier transcription)
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model to use
+        controller: Optional AIMDController limiting concurrent requests
+        timeout: Optional request timeout (seconds or openai.Timeout)
+        cancel: Optional CancellationToken that aborts the request
+        
+    Returns:
+        dict: {"original": str, "translated": str}
+    """
+    request = build_translation_request(text, source_lang, target_lang, model)
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    with controller.slot() if controller else nullcontext():
+        translated = _create(request, timeout, cancel)
+    
+    return {"original": text, "translated": translated.strip()}
+
+
+@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
+def translate_image(
+    image: Image.Image,
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini",
+    on_partial: Optional[Callable[[dict], None]] = None,
+    controller=None,
+    timeout=None,
+    tile: bool = False,
+    cancel=None,
+    structured: bool = False
+) -> dict:
+    """
+    Extract text from a scanned page image using vision and translate it.
+    
+    Args:
+        image: PIL Image of the scanned page
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model to use
+        on_partial: Optional callback receiving partial sections; enables streaming
+        controller: Optional AIMDController limiting concurrent requests
+        timeout: Optional request timeout (seconds or openai.Timeout)
+        tile: The image is a tile of a larger page (see build_image_request)
+        cancel: Optional CancellationToken that aborts the request
+        structured: Request a JSON response validated against TRANSLATION_SCHEMA
+        
+    Returns:
+        dict: {"original": str, "translated": str}, plus "invalid_response"
+        if a structured response failed validation twice (see _complete)
+    """
+    request = build_image_request(image, source_lang, target_lang, model, tile=tile, structured=structured)
+    return _complete(request, on_partial=on_partial, controller=controller, timeout=timeout,
+                     cancel=cancel, **_parsers(structured))
+
+
+@retry_with_backoff(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
+def translate_images(
+    images: List[Tuple[int, Image.Image]],
+    source_lang: str,
+    target_lang: str,
+    model: str = "gpt-4o-mini",
+    controller=None,
+    timeout=None,
+    cancel=None,
+    structured: bool = False
+) -> dict:
+    """
+    Extract and translate several scanned pages in a single vision request.
+    
+    Args:
+        images: List of (page_num, image) tuples
+        source_lang: Source language name
+        target_lang: Target language name
+        model: OpenAI model to use
+        controller: Optional AIMDController limiting concurrent requests
+        timeout: Optional request timeout (seconds or openai.Timeout)
+        cancel: Optional CancellationToken that aborts the request
+        structured: Request a JSON response with one entry per page
+        
+    Returns:
+        dict: Mapping of page_num (int) to {"original": str, "translated": str}
+        for every page whose section was well-formed
+    """
+    request = build_images_request(images, source_lang, target_lang, model, structured=structured)
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    with controller.slot() if controller else nullcontext():
+        response_text = _create(request, timeout, cancel)
     
-    return parse_translation_response(response.choices[0].message.content)
+    if structured:
+        return parse_structured_pages(response_text, [page_num for page_num, _ in images])
+    return parse_multi_page_response(response_text)
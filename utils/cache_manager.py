@@ -0,0 +1,169 @@
+import os
+import re
+import time
+import logging
+from typing import List, Optional
+
+from .filelock import file_lock, LockUnavailable
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = ".cache.lock"
+
+# Eviction order: cheap-to-recreate renders go before paid-for translations
+CATEGORIES = ("images", "translations")
+
+# Files modified this recently may belong to a run in progress and are never evicted
+DEFAULT_GRACE_SECONDS = 300
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a human-readable size such as "500MB", "2G" or "1048576" into bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)(?:I?B)?\s*", str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count as a short human-readable string."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def touch(path: str):
+    """Record an access to a cache file, for LRU eviction."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class CacheManager:
+    """
+    Size-capped cache directory with least-recently-used eviction.
+
+    Files are grouped by category: rendered images and export fragments
+    (images/, batches/, fragments/) are evicted before translation caches
+    (translation_cache*, originals.json).
+    Within a category, the file accessed longest ago goes first. Readers
+    mark access with touch(), which updates the file's timestamps.
+
+    Several pipeline processes may share the directory: garbage collection
+    runs under an inter-process lock, skips files touched within the grace
+    period, and writers replace files atomically.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None,
+                 grace_seconds: float = DEFAULT_GRACE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+
+    def _category(self, rel_path: str) -> Optional[str]:
+        # Dotfiles are indexes and lock files, which are never evicted
+        if os.path.basename(rel_path).startswith("."):
+            return None
+        top = rel_path.split(os.sep, 1)[0]
+        if os.sep in rel_path:
+            return "images" if top in ("images", "batches", "fragments") else None
+        if rel_path.startswith("translation_cache") or rel_path == "originals.json":
+            return "translations"
+        return None
+
+    def _scan(self) -> List[dict]:
+        entries = []
+        batch_active = os.path.exists(os.path.join(self.cache_dir, "batch_state.json"))
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, self.cache_dir)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # removed by another process
+
+                category = self._category(rel_path)
+                # Batch input files are needed until the batch has been submitted and collected
+                if batch_active and rel_path.startswith("batches" + os.sep):
+                    category = None
+
+                entries.append({
+                    "path": path,
+                    "size": st.st_size,
+                    "last_access": max(st.st_atime, st.st_mtime),
+                    "category": category,
+                })
+        return entries
+
+    def stats(self) -> dict:
+        """Return file counts and sizes per category."""
+        entries = self._scan()
+        by_category = {}
+        for entry in entries:
+            name = entry["category"] or "other"
+            bucket = by_category.setdefault(name, {"files": 0, "bytes": 0})
+            bucket["files"] += 1
+            bucket["bytes"] += entry["size"]
+
+        return {
+            "cache_dir": self.cache_dir,
+            "total_bytes": sum(e["size"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "categories": by_category,
+        }
+
+    def gc(self, max_bytes: Optional[int] = None, dry_run: bool = False) -> List[str]:
+        """
+        Evict files until the cache fits in max_bytes.
+
+        Returns:
+            List of removed (or, with dry_run, removable) file paths
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is None or not os.path.isdir(self.cache_dir):
+            return []
+
+        try:
+            with file_lock(os.path.join(self.cache_dir, LOCK_FILE), blocking=False):
+                return self._evict(max_bytes, dry_run)
+        except LockUnavailable:
+            logger.info("Cache garbage collection already running in another process")
+            return []
+
+    def _evict(self, max_bytes: int, dry_run: bool) -> List[str]:
+        entries = self._scan()
+        total = sum(e["size"] for e in entries)
+        cutoff = time.time() - self.grace_seconds
+
+        candidates = sorted(
+            (e for e in entries if e["category"] and e["last_access"] < cutoff),
+            key=lambda e: (CATEGORIES.index(e["category"]), e["last_access"])
+        )
+
+        removed = []
+        for entry in candidates:
+            if total <= max_bytes:
+                break
+            if not dry_run:
+                try:
+                    os.remove(entry["path"])
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # e.g. file still open by another process on Windows
+                    logger.warning(f"Could not evict {entry['path']}: {e}")
+                    continue
+            total -= entry["size"]
+            removed.append(entry["path"])
+
+        if total > max_bytes:
+            logger.warning(f"Cache is still {format_size(total)} after eviction "
+                           f"(limit {format_size(max_bytes)}); remaining files are in use")
+        return removed
@@ -0,0 +1,40 @@
+import threading
+from typing import Optional
+
+
+class Cancelled(Exception):
+    """Raised by work that notices its job was cancelled."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation of a translation job.
+
+    cancel() can be called from any thread (a signal handler, a UI
+    callback). The scheduler stops starting pages, streamed requests
+    check the token between chunks, and waits (retry backoff, batch
+    polling) wake up early.
+
+    With abort_in_flight, requests that would not be streamed otherwise
+    are streamed too, so they can be aborted mid-response; without it they
+    run to completion (bounded by the request timeout).
+    """
+
+    def __init__(self, abort_in_flight: bool = True):
+        self._event = threading.Event()
+        self.abort_in_flight = abort_in_flight
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled("Job cancelled")
+
+    def wait(self, seconds: Optional[float]) -> bool:
+        """Sleep for seconds, or less if cancelled; True if cancelled."""
+        return self._event.wait(seconds)
@@ -0,0 +1,186 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Return True for errors that signal overload: HTTP 429s and timeouts."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    name = type(error).__name__
+    return name in ("RateLimitError", "APITimeoutError") or "Timeout" in name
+
+
+class AIMDController:
+    """
+    Adaptive limit on the number of in-flight API requests.
+
+    Additive increase / multiplicative decrease, as in TCP congestion control:
+    every successful request grows the limit by increase / limit (about
+    +increase per round of requests), while a 429 or timeout multiplies it by
+    decrease. Growth pauses while latency is well above the best latency seen,
+    since that means requests are already queueing on the server.
+
+    Use it around each individual request attempt:
+
+        with controller.slot():
+            response = client.chat.completions.create(...)
+    """
+
+    def __init__(
+        self,
+        initial: int = 3,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._min_latency = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._start = time.monotonic()
+        self.history: List[Tuple[float, int]] = [(0.0, int(self._limit))]
+        self.throttled = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self):
+        """Block until a request slot is free under the current limit."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float = None, throttled: bool = False):
+        """Free a slot and adjust the limit from the request outcome."""
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+
+            if throttled:
+                self.throttled += 1
+                # One decrease per congestion event: requests already in flight
+                # when the limit dropped will often fail too
+                if now - self._last_decrease > (self._min_latency or 1.0):
+                    self._set_limit(max(self.min_limit, self._limit * self.decrease))
+                    self._last_decrease = now
+            elif latency is not None:
+                if self._min_latency is None or latency < self._min_latency:
+                    self._min_latency = latency
+                if latency <= self._min_latency * self.latency_factor:
+                    self._set_limit(min(self.max_limit, self._limit + self.increase / self._limit))
+
+            self._cond.notify_all()
+
+    def _set_limit(self, value: float):
+        previous = int(self._limit)
+        self._limit = value
+        if int(value) != previous:
+            self.history.append((round(time.monotonic() - self._start, 2), int(value)))
+            logger.info(f"Concurrency limit {previous} -> {int(value)}")
+
+    @contextmanager
+    def slot(self):
+        """Context manager that holds a slot for one request attempt."""
+        self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.release(throttled=is_throttle_error(e))
+            raise
+        self.release(latency=time.monotonic() - start)
+
+    def summary(self) -> dict:
+        """Concurrency statistics for the run summary."""
+        limits = [limit for _, limit in self.history]
+
+        # Time-weighted average of the limit
+        elapsed = time.monotonic() - self._start
+        weighted = 0.0
+        for (t0, limit), (t1, _) in zip(self.history, self.history[1:] + [(elapsed, 0)]):
+            weighted += limit * (t1 - t0)
+
+        return {
+            "initial": limits[0],
+            "final": self.limit,
+            "min": min(limits),
+            "max": max(limits),
+            "average": round(weighted / elapsed, 2) if elapsed > 0 else limits[0],
+            "throttled_requests": self.throttled,
+            "history": self.history,
+        }
+
+
+class RequestGate:
+    """
+    Concurrency and rate limit for the requests of one model.
+
+    Wraps an AIMDController (adaptive, or fixed when min == max) and
+    optionally spaces requests to stay under a requests-per-minute limit.
+    Like AIMDController, it is used around each request attempt via slot().
+    """
+
+    def __init__(self, controller: AIMDController, rpm: float = None):
+        self.controller = controller
+        self.rpm = rpm
+        self._next_request = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.controller.max_limit
+
+    def _wait_for_rate(self):
+        if not self.rpm:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + 60.0 / self.rpm
+        if start > now:
+            time.sleep(start - now)
+
+    @contextmanager
+    def slot(self):
+        # Rate spacing happens before taking a slot so it is not counted as latency
+        self._wait_for_rate()
+        with self.controller.slot():
+            yield
+
+
+def parse_model_limits(spec: str) -> dict:
+    """
+    Parse per-model limits such as "gpt-4o=2:100,gpt-4o-mini=8:500".
+
+    Each entry is model=concurrency[:rpm[:tpm]]. The tokens-per-minute
+    limit is enforced by the API, not by RequestGate; the planner uses it
+    to predict the wall time.
+
+    Returns:
+        dict: {model: (concurrency, rpm or None, tpm or None)}
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        model, _, values = entry.partition("=")
+        concurrency, _, rates = values.partition(":")
+        rpm, _, tpm = rates.partition(":")
+        if not model or not concurrency:
+            raise ValueError(f"Invalid model limit '{entry}', expected model=concurrency[:rpm[:tpm]]")
+        limits[model.strip()] = (int(concurrency), float(rpm) if rpm else None, float(tpm) if tpm else None)
+    return limits
@@ -0,0 +1,44 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LockUnavailable(Exception):
+    """Raised when a non-blocking lock is held by another process."""
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    Inter-process exclusive lock on a lock file.
+
+    Works across processes sharing a directory (fcntl on POSIX, msvcrt on
+    Windows). With blocking=False, raises LockUnavailable instead of waiting.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "a+")
+    try:
+        try:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            raise LockUnavailable(path)
+
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        f.close()
@@ -0,0 +1,24 @@
+import base64
+from io import BytesIO
+from PIL import Image
+
+
+def encode_image_to_base64(image: Image.Image) -> str:
+    """Convert a PIL image to base64-encoded PNG string."""
+    buffered = BytesIO()
+    image.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+def page_image(page: dict) -> Image.Image:
+    """
+    Image of a scanned page.
+
+    Under a memory budget the loader keeps rendered images on disk only
+    (content is None); they are read back from page["image_path"] when used.
+    """
+    if page["content"] is not None:
+        return page["content"]
+    image = Image.open(page["image_path"])
+    image.load()
+    return image
@@ -0,0 +1,157 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# Writing system of each language offered in the UI
+LANGUAGE_SCRIPTS = {
+    "English": "Latin", "Spanish": "Latin", "French": "Latin", "German": "Latin",
+    "Italian": "Latin", "Portuguese": "Latin", "Dutch": "Latin", "Polish": "Latin",
+    "Swedish": "Latin", "Turkish": "Latin", "Czech": "Latin", "Croatian": "Latin",
+    "Romanian": "Latin", "Hungarian": "Latin", "Serbian": "Cyrillic",
+    "Russian": "Cyrillic", "Bulgarian": "Cyrillic", "Greek": "Greek",
+    "Arabic": "Arabic", "Hindi": "Devanagari", "Chinese": "Han",
+    "Japanese": "Japanese", "Korean": "Hangul",
+}
+
+# Most frequent function words; a page in a language uses many of them
+STOPWORDS = {
+    "English": "the of and to in is that it for was on are with as be by this have from or not at but an which",
+    "Spanish": "de la que el en y los del se las por un para con una su al lo como más pero sus le es",
+    "French": "de la le et les des en un du une que est pour qui dans par sur pas au plus ne se avec il",
+    "German": "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an",
+    "Italian": "di e il la che in a per un è del non una sono le si con da della alla gli dei nel",
+    "Portuguese": "de a o que e do da em um para é com não uma os no se na por mais as dos",
+    "Dutch": "de en van het een in is dat op te zijn met voor niet aan er als die ook bij",
+    "Polish": "i w na z do że się nie to jest o jak po co ale od za przez dla jego",
+    "Swedish": "och i att det som en på är av för med till den har de inte om ett men",
+    "Turkish": "ve bir bu da de için ile ne çok daha olarak gibi olan kadar ama sonra her",
+    "Czech": "a v se na je že o s z do to jako by ale pro jsou k po jeho nebo",
+    "Croatian": "i je u da se na za su od s koji a ne kao iz o ili bi što",
+    "Romanian": "și de la în a cu din pe care nu este o un că să mai pentru se ca",
+    "Hungarian": "a az és hogy nem is egy meg de van volt csak már mint ha el vagy",
+    "Russian": "и в не на я что он с как а то все она так его но да ты к у же вы за бы по",
+    "Bulgarian": "и на да се в не е от за че с са ще по как това но към",
+    "Serbian": "и је у да се на за су од с који а не као из о или би што",
+}
+_STOPWORDS = {lang: set(words.split()) for lang, words in STOPWORDS.items()}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Lines that look like source code rather than prose
+_CODE_LINE = re.compile(
+    r"[;{}]\s*$|^\s*(def|class|import|from|return|if|for|while|public|private|function|var|let|const|#include)\b"
+    r"|[=!<>]=|\w\(.*\)|^\s*(//|#|/\*)"
+)
+
+
+def char_script(ch: str) -> Optional[str]:
+    """Writing system of a letter, or None for digits, punctuation and symbols."""
+    if not ch.isalpha():
+        return None
+    try:
+        name = unicodedata.name(ch)
+    except ValueError:
+        return None
+    if name.startswith("CJK"):
+        return "Han"
+    if name.startswith(("HIRAGANA", "KATAKANA")):
+        return "Kana"
+    return name.split(" ", 1)[0].title()
+
+
+def script_profile(text: str) -> Counter:
+    """Count of letters per writing system."""
+    return Counter(script for script in map(char_script, text) if script)
+
+
+def _covers(profile: Counter, language: str) -> float:
+    """Fraction of letters written in the language's script."""
+    letters = sum(profile.values())
+    if not letters:
+        return 0.0
+    script = LANGUAGE_SCRIPTS.get(language)
+    if script == "Japanese":
+        count = profile["Han"] + profile["Kana"]
+    else:
+        count = profile[script]
+    return count / letters
+
+
+def identify_language(text: str, min_words: int = 20) -> Tuple[Optional[str], float]:
+    """
+    Guess the language of text from its function words.
+
+    Only languages in STOPWORDS can be recognized; the score is the fraction
+    of words that are function words of the best language.
+
+    Returns:
+        (language, score), or (None, 0.0) if there are too few words
+    """
+    words = [w.lower() for w in _WORD.findall(text) if not w.isdigit()]
+    if len(words) < min_words:
+        return None, 0.0
+
+    counts = Counter(words)
+    scores: Dict[str, float] = {
+        lang: sum(counts[w] for w in stopwords) / len(words)
+        for lang, stopwords in _STOPWORDS.items()
+    }
+    best = max(scores, key=scores.get)
+    return best, scores[best]
+
+
+def looks_like_code(text: str, min_ratio: float = 0.6) -> bool:
+    """True if most non-blank lines look like source code."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 3:
+        return False
+    return sum(1 for line in lines if _CODE_LINE.search(line)) / len(lines) >= min_ratio
+
+
+def skip_reason(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    min_letters: int = 20,
+    min_letter_share: float = 0.2,
+    min_score: float = 0.15
+) -> Optional[str]:
+    """
+    Decide locally whether a text page needs no translation.
+
+    Args:
+        text: Extracted page text
+        source_lang: Language the document is translated from
+        target_lang: Language the document is translated into
+        min_letters: Pages with fewer letters (page numbers, figures)
+            have no translatable content
+        min_letter_share: Neither do pages where letters are a smaller
+            share of the non-space characters (numeric tables)
+        min_score: Minimum function-word score to accept a language guess
+
+    Returns:
+        "no_text", "code" or "target_language" if the page can be copied
+        unchanged, or None if it should be translated
+    """
+    profile = script_profile(text)
+    letters = sum(profile.values())
+    if letters < min_letters or letters < min_letter_share * len("".join(text.split())):
+        return "no_text"
+
+    if looks_like_code(text):
+        return "code"
+
+    if _covers(profile, target_lang) < 0.9:
+        return None
+
+    if target_lang in _STOPWORDS:
+        # Same script as other languages: the function words must match
+        language, score = identify_language(text)
+        return "target_language" if language == target_lang and score >= min_score else None
+
+    # No word list (e.g. Japanese, Greek): the script decides, unless the
+    # source language is written in it as well
+    if LANGUAGE_SCRIPTS.get(source_lang) == LANGUAGE_SCRIPTS.get(target_lang):
+        return None
+    return "target_language"
@@ -0,0 +1,74 @@
+import gc
+import os
+import time
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss() -> Optional[int]:
+    """
+    Current resident set size of this process in bytes, or None where it
+    cannot be read (no /proc, e.g. macOS and Windows).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # resource's ru_maxrss is the peak, which never drops back under
+        # the budget, so no reading is better than a wrong one
+        return None
+
+
+class MemoryBudget:
+    """
+    Soft limit on the process RSS, enforced by waiting instead of failing.
+
+    Work that would allocate (loading a page image, starting a request)
+    calls wait() first; while the process is over the budget it blocks
+    until other work in flight finishes and frees memory. Work that runs
+    alone is never blocked, so a budget below the baseline footprint only
+    serializes the job. Where the RSS cannot be read the budget is off.
+    """
+
+    def __init__(self, max_bytes: int, poll_interval: float = 0.2):
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.waits = 0
+        self.peak_rss = 0
+        self._warned = False
+        self._lock = threading.Lock()
+        if current_rss() is None:
+            logger.warning("Cannot read the process RSS on this platform; --max-memory is ignored")
+
+    def over(self) -> bool:
+        rss = current_rss()
+        if rss is None:
+            return False
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss > self.max_bytes
+
+    def wait(self, busy: Callable[[], bool]):
+        """
+        Block while over the budget and busy() reports other work in flight.
+        """
+        if not self.over():
+            return
+
+        gc.collect()
+        waited = False
+        while self.over() and busy():
+            waited = True
+            time.sleep(self.poll_interval)
+
+        still_over = self.over()
+        with self._lock:
+            if waited:
+                self.waits += 1
+            warn = still_over and not self._warned
+            self._warned = self._warned or still_over
+        if warn:
+            logger.warning("Memory budget exceeded with no other work in flight; continuing one page at a time")
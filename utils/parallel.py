@@ -1,64 +1,238 @@
+import time
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Callable, Any, Optional
 
+from .tokens import page_image_stats, estimate_page_work
+from .cancellation import Cancelled
+
 logger = logging.getLogger(__name__)
 
 
+def group_image_pages(
+    pages: List[dict],
+    max_group_size: int = 4,
+    max_pixels: int = 8_000_000,
+    output_budget: int = 3000
+) -> List[dict]:
+    """
+    Pack consecutive short scanned pages into multi-page work items.
+    
+    A group grows while its pages fit the pixel budget (request payload and
+    vision tokens) and their estimated output fits the response budget.
+    Pages expected to fill half the budget on their own stay single.
+    
+    Args:
+        pages: List of page dicts
+        max_group_size: Maximum number of pages per request
+        max_pixels: Maximum total pixels of the images in one request
+        output_budget: Maximum estimated output tokens per request
+        
+    Returns:
+        List of work items: plain page dicts, or
+        {"page_num": int, "type": "image_group", "pages": [page, ...]}
+    """
+    items = []
+    group = []
+    group_pixels = 0
+    group_tokens = 0
+    
+    def flush():
+        if len(group) > 1:
+            items.append({"page_num": group[0]["page_num"], "type": "image_group", "pages": list(group)})
+        else:
+            items.extend(group)
+        group.clear()
+    
+    for page in pages:
+        if page["type"] != "image":
+            flush()
+            items.append(page)
+            continue
+        
+        width, height, tokens = page_image_stats(page)
+        pixels = width * height
+        
+        if tokens > output_budget // 2:
+            flush()
+            items.append(page)
+            continue
+        
+        if group and (len(group) >= max_group_size
+                      or group_pixels + pixels > max_pixels
+                      or group_tokens + tokens > output_budget):
+            flush()
+        
+        if not group:
+            group_pixels = group_tokens = 0
+        group.append(page)
+        group_pixels += pixels
+        group_tokens += tokens
+    
+    flush()
+    return items
+
+
+def _item_page_count(item: dict) -> int:
+    return len(item["pages"]) if item.get("type") == "image_group" else 1
+
+
+def _as_results(item: dict, output) -> List[dict]:
+    """Normalize translate_func output (one result or a list for groups) to a list."""
+    if isinstance(output, list):
+        return output
+    output["page_num"] = item["page_num"]
+    return [output]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
 def parallel_translate(
     pages: List[dict],
     translate_func: Callable,
     max_workers: int = 3,
-    progress_callback: Optional[Callable[[int, int, dict], None]] = None
+    progress_callback: Optional[Callable[[int, int, dict], None]] = None,
+    largest_first: bool = False,
+    hedge_factor: Optional[float] = None,
+    min_hedge_samples: int = 5,
+    memory_budget=None,
+    cancel=None
 ) -> dict:
     """
     Process pages in parallel with a translation function.
     
     Args:
-        pages: List of page dicts with {"page_num": int, "content": str|Image, "type": str}
+        pages: List of page dicts with {"page_num": int, "content": str|Image, "type": str},
+            or "image_group" work items from group_image_pages
         translate_func: Function that takes a page dict and returns {"original": str, "translated": str}
+            (or, for an image group, a list of such dicts each carrying "page_num")
         max_workers: Maximum number of parallel workers
         progress_callback: Optional callback(completed, total, result) for progress updates
+        largest_first: Submit the pages with the most estimated tokens first, so a
+            large page does not start last and decide the total job time
+        hedge_factor: If set, once every page has started, a page running longer than
+            hedge_factor * p95 latency gets a duplicate request; the first response wins
+        min_hedge_samples: Completed pages needed before the p95 latency is trusted
+        memory_budget: Optional utils.memory.MemoryBudget; while the process is
+            over it, a page waits to start until pages in flight finish
+        cancel: Optional utils.cancellation.CancellationToken. Once it is
+            cancelled, queued pages are dropped, results that already
+            arrived are still reported, and the call returns without waiting
+            for pages in flight (their requests abort, see translate_func)
         
     Returns:
         dict: Mapping of page_num (str) to translation result
     """
     results = {}
-    total = len(pages)
+    total = sum(_item_page_count(page) for page in pages)
     completed = 0
     
+    if largest_first:
+        pages = sorted(pages, key=estimate_page_work, reverse=True)
+    
+    started = {}
+    started_lock = threading.Lock()
+    in_flight = 0
+    
     def process_page(page: dict) -> tuple:
-        """Process a single page and return (page_num, result)."""
+        """Process a single work item and return (page_num, results, error, latency)."""
+        nonlocal in_flight
         page_num = page["page_num"]
+        if memory_budget is not None:
+            memory_budget.wait(lambda: in_flight > 0)
+        if cancel is not None and cancel.cancelled:
+            return page_num, None, "Job cancelled", 0.0
+        start = time.monotonic()
+        with started_lock:
+            started.setdefault(page_num, start)
+            in_flight += 1
         try:
-            result = translate_func(page)
-            result["page_num"] = page_num
-            return page_num, result, None
+            return page_num, _as_results(page, translate_func(page)), None, time.monotonic() - start
+        except Cancelled as e:
+            return page_num, None, str(e), time.monotonic() - start
         except Exception as e:
             logger.error(f"Error translating page {page_num}: {e}")
-            return page_num, None, str(e)
+            return page_num, None, str(e), time.monotonic() - start
+        finally:
+            with started_lock:
+                in_flight -= 1
+    
+    def report(item: dict, page_results: Optional[List[dict]], error: Optional[str]):
+        nonlocal completed
+        if page_results:
+            for result in page_results:
+                completed += 1
+                results[str(result["page_num"])] = result
+                
+                if progress_callback:
+                    progress_callback(completed, total, result)
+        else:
+            logger.warning(f"Page {item['page_num']} failed: {error}")
+            for failed in item.get("pages", [item]):
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total, {"page_num": failed["page_num"], "error": error})
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    items = {page["page_num"]: page for page in pages}
+    running = {}   # page_num -> number of copies still running
+    hedged = set()
+    latencies = []
+    
+    # Not used as a context manager: a losing hedge copy must not delay the return
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
         # Submit all tasks
-        future_to_page = {
-            executor.submit(process_page, page): page 
-            for page in pages
-        }
+        future_to_page = {}
+        for page in pages:
+            future_to_page[executor.submit(process_page, page)] = page["page_num"]
+            running[page["page_num"]] = 1
         
         # Collect results as they complete
-        for future in as_completed(future_to_page):
-            page_num, result, error = future.result()
-            completed += 1
+        pending = set(future_to_page)
+        while running:
+            done, pending = wait(pending, timeout=0.5 if hedge_factor or cancel else None,
+                                 return_when=FIRST_COMPLETED)
+            cancelled = cancel is not None and cancel.cancelled
             
-            if result:
-                results[str(page_num)] = result
+            for future in done:
+                page_num, page_results, error, latency = future.result()
+                if page_num not in running:
+                    continue  # the other copy of a hedged page already finished
+                if cancelled and not page_results:
+                    continue  # not failed, only stopped; a resumed run translates it
                 
-                if progress_callback:
-                    progress_callback(completed, total, result)
-            else:
-                logger.warning(f"Page {page_num} failed: {error}")
-                if progress_callback:
-                    progress_callback(completed, total, {"page_num": page_num, "error": error})
+                running[page_num] -= 1
+                if page_results or running[page_num] == 0:
+                    del running[page_num]
+                    if page_results:
+                        latencies.append(latency)
+                    report(items[page_num], page_results, error)
+            
+            if cancelled:
+                logger.info(f"Cancelled with {len(running)} pages unfinished")
+                break
+            
+            # Hedge stragglers once the queue has drained
+            if hedge_factor and len(started) == len(items) and len(latencies) >= min_hedge_samples:
+                threshold = hedge_factor * _percentile(latencies, 0.95)
+                now = time.monotonic()
+                for page_num in list(running):
+                    if page_num not in hedged and now - started[page_num] > threshold:
+                        logger.info(f"Hedging page {page_num} after {now - started[page_num]:.1f}s")
+                        hedged.add(page_num)
+                        running[page_num] += 1
+                        future = executor.submit(process_page, items[page_num])
+                        future_to_page[future] = page_num
+                        pending.add(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    if hedged:
+        logger.info(f"Sent hedge requests for {len(hedged)} slow pages")
     
     return results
 
@@ -67,7 +241,8 @@ def sequential_translate(
     pages: List[dict],
     translate_func: Callable,
     progress_callback: Optional[Callable[[int, int, dict], None]] = None,
-    sleep_between: float = 0
+    sleep_between: float = 0,
+    cancel=None
 ) -> dict:
     """
     Process pages sequentially (fallback for when parallel isn't desired).
@@ -77,6 +252,8 @@ def sequential_translate(
         translate_func: Translation function
         progress_callback: Progress callback
         sleep_between: Sleep time between pages
+        cancel: Optional CancellationToken; the remaining pages are skipped
+            once it is cancelled
         
     Returns:
         dict: Mapping of page_num (str) to translation result
@@ -84,26 +261,36 @@ def sequential_translate(
     import time
     
     results = {}
-    total = len(pages)
+    total = sum(_item_page_count(page) for page in pages)
+    completed = 0
     
     for i, page in enumerate(pages):
         page_num = page["page_num"]
+        if cancel is not None and cancel.cancelled:
+            break
         
         try:
-            result = translate_func(page)
-            result["page_num"] = page_num
-            results[str(page_num)] = result
-            
-            if progress_callback:
-                progress_callback(i + 1, total, result)
+            for result in _as_results(page, translate_func(page)):
+                completed += 1
+                results[str(result["page_num"])] = result
                 
+                if progress_callback:
+                    progress_callback(completed, total, result)
+        
+        except Cancelled:
+            break
         except Exception as e:
             logger.error(f"Error translating page {page_num}: {e}")
-            if progress_callback:
-                progress_callback(i + 1, total, {"page_num": page_num, "error": str(e)})
+            for failed in page.get("pages", [page]):
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total, {"page_num": failed["page_num"], "error": str(e)})
         
         if sleep_between > 0 and i < len(pages) - 1:
-            time.sleep(sleep_between)
+            if cancel is not None:
+                cancel.wait(sleep_between)
+            else:
+                time.sleep(sleep_between)
     
     return results
 
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .memory import current_rss
+
+MB = 1024 * 1024
+
+
+class StageProfiler:
+    """
+    CPU and memory profile of the pipeline, split into stages (load, ocr,
+    translate, export, ...).
+
+    For each stage it records the wall and CPU time, a cProfile profile,
+    the peak Python heap (tracemalloc) and the peak RSS, sampled by a
+    background thread. Work that a stage runs in pool threads is profiled
+    by wrapping the function with wrap(). A disabled profiler does nothing,
+    so the pipeline can use it unconditionally.
+
+    Args:
+        enabled: Record profiles (tracemalloc slows allocation-heavy code down)
+        sample_interval: Seconds between RSS samples
+    """
+
+    def __init__(self, enabled: bool = True, sample_interval: float = 0.05):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.stages: Dict[str, dict] = {}
+        self._profiles: Dict[str, List[cProfile.Profile]] = {}
+        self._lock = threading.Lock()
+        self._rss_peak = 0
+        self._sampler = None
+        self._stop = threading.Event()
+        self._report_path = None
+
+        if enabled:
+            tracemalloc.start()
+            self._sampler = threading.Thread(target=self._sample_rss, name="rss-sampler", daemon=True)
+            self._sampler.start()
+
+    def _sample_rss(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss() or 0
+            with self._lock:
+                self._rss_peak = max(self._rss_peak, rss)
+
+    def _add_profile(self, name: str, profile: cProfile.Profile):
+        with self._lock:
+            self._profiles.setdefault(name, []).append(profile)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the code in the with block as stage name."""
+        if not self.enabled:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None  # another profiler is active (Python 3.12+ allows one)
+
+        rss_start = current_rss() or 0
+        with self._lock:
+            self._rss_peak = rss_start
+        tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            _, heap_peak = tracemalloc.get_traced_memory()
+            if profile:
+                profile.disable()
+                self._add_profile(name, profile)
+
+            with self._lock:
+                rss_peak = max(self._rss_peak, current_rss() or 0)
+                totals = self.stages.setdefault(name, {
+                    "seconds": 0.0, "cpu_seconds": 0.0, "python_peak_mb": 0.0,
+                    "rss_start_mb": round(rss_start / MB, 1), "rss_peak_mb": 0.0,
+                })
+                totals["seconds"] = round(totals["seconds"] + wall, 3)
+                totals["cpu_seconds"] = round(totals["cpu_seconds"] + cpu, 3)
+                totals["python_peak_mb"] = max(totals["python_peak_mb"], round(heap_peak / MB, 1))
+                totals["rss_peak_mb"] = max(totals["rss_peak_mb"], round(rss_peak / MB, 1))
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """
+        Profile every call of func (run in worker threads) as part of stage name.
+
+        cProfile only sees the thread that enabled it, so each call gets its
+        own profile, merged into the stage when the report is written.
+        """
+        if not self.enabled:
+            return func
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+: the stage profiler already covers all threads
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._add_profile(name, profile)
+
+        return profiled
+
+    def stop(self):
+        """Stop the RSS sampler and tracemalloc; safe to call more than once."""
+        if not self.enabled or self._stop.is_set():
+            return
+        self._stop.set()
+        tracemalloc.stop()
+
+    def report(self, output_dir: str, top: int = 15) -> Optional[str]:
+        """
+        Stop the profiler and write the profile to <output_dir>/profile:
+        profile_report.json with the per-stage figures and the top functions
+        by cumulative time, and <stage>.prof files for pstats, snakeviz and
+        similar tools. Later calls return the report already written.
+
+        Returns:
+            Path of the report, or None if the profiler is disabled
+        """
+        if not self.enabled:
+            return None
+        if self._report_path:
+            return self._report_path
+
+        self.stop()
+        profile_dir = os.path.join(output_dir, "profile")
+        os.makedirs(profile_dir, exist_ok=True)
+
+        report = {"stages": {}}
+        for name, totals in self.stages.items():
+            stage = dict(totals)
+            profiles = self._profiles.get(name)
+            if profiles:
+                stats = pstats.Stats(*profiles)
+                stats.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+                stage["top_functions"] = _top_functions(stats, top)
+            report["stages"][name] = stage
+
+        path = os.path.join(profile_dir, "profile_report.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        print(f"\n{'Stage':<12} {'Wall':>9} {'CPU':>9} {'Py peak':>10} {'RSS peak':>10}")
+        for name, stage in report["stages"].items():
+            print(f"{name:<12} {stage['seconds']:>8.2f}s {stage['cpu_seconds']:>8.2f}s "
+                  f"{stage['python_peak_mb']:>7.1f} MB {stage['rss_peak_mb']:>7.1f} MB")
+        print(f"Profile written to: {profile_dir}")
+        self._report_path = path
+        return path
+
+
+def _top_functions(stats: pstats.Stats, top: int) -> List[dict]:
+    """The top functions of a profile by cumulative time."""
+    rows = []
+    for (filename, line, function), (_, calls, self_time, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "self_seconds": round(self_time, 4),
+            "cumulative_seconds": round(cumulative, 4),
+        })
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:top]
@@ -3,6 +3,8 @@ import logging
 from functools import wraps
 from typing import Callable, Type, Tuple
 
+from .cancellation import Cancelled
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,7 +12,8 @@ def retry_with_backoff(
     max_retries: int = 3,
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,)
+    exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    cancel=None
 ) -> Callable:
     """
     Decorator that retries a function with exponential backoff.
@@ -20,6 +23,9 @@ def retry_with_backoff(
         initial_delay: Initial delay in seconds before first retry
         backoff_factor: Multiplier for delay after each retry
         exceptions: Tuple of exception types to catch and retry
+        cancel: Optional CancellationToken that ends the backoff delays early;
+            Cancelled is never retried. Without it, the token passed to the
+            decorated function as its cancel keyword argument is used
         
     Returns:
         Decorated function with retry logic
@@ -35,10 +41,13 @@ def retry_with_backoff(
         def wrapper(*args, **kwargs):
             delay = initial_delay
             last_exception = None
+            token = cancel if cancel is not None else kwargs.get("cancel")
             
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
+                except Cancelled:
+                    raise
                 except exceptions as e:
                     last_exception = e
                     
@@ -50,7 +59,10 @@ def retry_with_backoff(
                         f"Attempt {attempt + 1}/{max_retries + 1} failed for {func.__name__}: {e}. "
                         f"Retrying in {delay:.1f}s..."
                     )
-                    time.sleep(delay)
+                    if token is None:
+                        time.sleep(delay)
+                    elif token.wait(delay):
+                        raise Cancelled("Job cancelled")
                     delay *= backoff_factor
             
             raise last_exception
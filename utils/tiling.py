@@ -0,0 +1,188 @@
+import math
+from difflib import SequenceMatcher
+from typing import List, Tuple
+from PIL import Image
+
+from .tokens import estimate_image_text_tokens
+
+# Gray level below which a pixel counts as ink
+_INK_THRESHOLD = 160
+
+
+def _ink_profile(image: Image.Image, axis: str) -> List[float]:
+    """Fraction of ink pixels (0-1) in every column or row of an image."""
+    ink = image.convert("L").point(lambda p: 255 if p < _INK_THRESHOLD else 0)
+    size = (ink.width, 1) if axis == "columns" else (1, ink.height)
+    return [v / 255 for v in ink.resize(size, Image.BOX).tobytes()]
+
+
+def find_columns(
+    image: Image.Image,
+    max_columns: int = 4,
+    min_gutter: float = 0.015,
+    min_column_width: float = 0.2
+) -> List[Tuple[int, int]]:
+    """
+    Find text columns separated by blank vertical gutters.
+
+    Column regions must be at least min_column_width of the content width,
+    so tables with many narrow columns are not split.
+
+    Returns:
+        List of (x0, x1) column ranges from left to right (one range if the
+        page has a single column)
+    """
+    thumb = image.copy()
+    thumb.thumbnail((600, 600))
+    scale = image.width / thumb.width
+    profile = _ink_profile(thumb, "columns")
+
+    inked = [i for i, v in enumerate(profile) if v > 0.005]
+    if not inked:
+        return [(0, image.width)]
+    left, right = inked[0], inked[-1] + 1
+    width = right - left
+
+    # Runs of blank columns inside the content area
+    gutters = []
+    start = None
+    for x in range(left, right + 1):
+        blank = x < right and profile[x] <= 0.005
+        if blank and start is None:
+            start = x
+        elif not blank and start is not None:
+            if x - start >= min_gutter * width:
+                gutters.append((start + x) // 2)
+            start = None
+
+    bounds = [left] + gutters + [right]
+    columns = list(zip(bounds, bounds[1:]))
+    if len(columns) > max_columns or any(x1 - x0 < min_column_width * width for x0, x1 in columns):
+        return [(0, image.width)]
+
+    # Column edges extend to the page edges and gutter centers
+    edges = [0] + gutters + [thumb.width]
+    return [(int(x0 * scale), int(x1 * scale)) for x0, x1 in zip(edges, edges[1:])]
+
+
+def find_band_cuts(image: Image.Image, bands: int, search: float = 0.5) -> List[int]:
+    """
+    Choose rows to cut an image into horizontal bands.
+
+    Each cut is placed on the emptiest row near its ideal position (within
+    search * band height), so cuts fall between lines of text.
+
+    Returns:
+        Sorted list of bands - 1 cut rows
+    """
+    profile = _ink_profile(image, "rows")
+    height = len(profile)
+    band_height = height / bands
+    window = int(band_height * search / 2)
+
+    cuts = []
+    for k in range(1, bands):
+        ideal = int(k * band_height)
+        lo, hi = max(1, ideal - window), min(height - 1, ideal + window)
+        cuts.append(min(range(lo, hi + 1), key=lambda y: (profile[y], abs(y - ideal))))
+    return sorted(set(cuts))
+
+
+def _merge_columns(columns: List[Tuple[int, int]], count: int) -> List[Tuple[int, int]]:
+    """Merge neighbouring columns, narrowest pair first, until at most count remain."""
+    columns = list(columns)
+    while len(columns) > count:
+        i = min(range(len(columns) - 1), key=lambda i: columns[i + 1][1] - columns[i][0])
+        columns[i:i + 2] = [(columns[i][0], columns[i + 1][1])]
+    return columns
+
+
+def split_dense_page(
+    image: Image.Image,
+    tile_tokens: int = 2000,
+    max_tiles: int = 6,
+    overlap: float = 0.02
+) -> List[List[Image.Image]]:
+    """
+    Split a dense scanned page into tiles in reading order.
+
+    Multi-column pages are split into columns first (neighbouring columns
+    are merged when there are more than max_tiles); each column is cut into
+    overlapping horizontal bands at blank rows, so that no tile needs more
+    than about tile_tokens output tokens.
+
+    Args:
+        image: Scanned page
+        tile_tokens: Target output tokens per tile
+        max_tiles: Upper bound on the number of tiles
+        overlap: Fraction of the page height each band extends past its cuts
+
+    Returns:
+        List of columns, each a list of band images from top to bottom
+    """
+    max_tiles = max(1, max_tiles)
+    columns = _merge_columns(find_columns(image), max_tiles)
+    pad = int(overlap * image.height)
+
+    tiles = []
+    budget = max_tiles
+    for i, (x0, x1) in enumerate(columns):
+        column = image.crop((x0, 0, x1, image.height))
+        # Token estimates are per full page; scale the column's share by its width
+        share = estimate_image_text_tokens(column) * (x1 - x0) / image.width
+        bands = max(1, min(math.ceil(share / tile_tokens), budget - (len(columns) - i - 1)))
+        budget -= bands
+
+        bounds = [0] + find_band_cuts(column, bands) + [column.height]
+        tiles.append([
+            column.crop((0, max(0, y0 - pad), column.width, min(column.height, y1 + pad)))
+            for y0, y1 in zip(bounds, bounds[1:])
+        ])
+    return tiles
+
+
+def _normalize(line: str) -> str:
+    return " ".join(line.lower().split())
+
+
+def _seam_overlap(previous: List[str], following: List[str], max_lines: int = 6) -> int:
+    """Number of leading lines of following that repeat the last lines of previous."""
+    for k in range(min(max_lines, len(previous), len(following)), 0, -1):
+        if all(
+            SequenceMatcher(None, _normalize(a), _normalize(b)).ratio() >= 0.85
+            for a, b in zip(previous[-k:], following[:k])
+        ):
+            return k
+    return 0
+
+
+def stitch_bands(texts: List[str]) -> str:
+    """
+    Join the text of consecutive overlapping bands, dropping the lines the
+    overlap transcribed twice.
+    """
+    lines = []
+    for text in texts:
+        new_lines = text.strip().splitlines()
+        previous = [line for line in lines if line.strip()]
+        following = [line for line in new_lines if line.strip()]
+        duplicate = _seam_overlap(previous, following)
+
+        # Skip the duplicated non-blank lines (and blank lines among them)
+        skip = 0
+        while duplicate and skip < len(new_lines):
+            if new_lines[skip].strip():
+                duplicate -= 1
+            skip += 1
+        lines.extend(new_lines[skip:])
+    return "\n".join(lines).strip()
+
+
+def stitch_tiles(columns: List[List[str]]) -> str:
+    """Join tile texts in reading order: bands within a column, then columns."""
+    return "\n\n".join(text for text in (stitch_bands(bands) for bands in columns) if text)
+
+
+def is_dense_page(image: Image.Image, min_tokens: int = 2500) -> bool:
+    """True if a scanned page likely needs more than min_tokens output tokens."""
+    return estimate_image_text_tokens(image) >= min_tokens
@@ -0,0 +1,128 @@
+import math
+from typing import Tuple
+from PIL import Image
+
+# Response limit used by every translation request
+MAX_OUTPUT_TOKENS = 4096
+
+# Approximate size of the system prompt and message framing
+PROMPT_OVERHEAD_TOKENS = 200
+
+# Largest image area GPT-4o keeps at high detail (longest side 2048, shortest 768);
+# larger renders are downscaled by the API before the model sees them
+VISION_MAX_PIXELS = 2048 * 768
+
+# A full page of body text is roughly 10% ink and yields ~2,500 output tokens
+# (transcription + translation)
+_TOKENS_PER_INK_FRACTION = 25000
+
+
+def estimate_image_text_tokens(image: Image.Image) -> int:
+    """
+    Estimate the output tokens needed for all text on a scanned image,
+    without the response limit (dense pages can exceed it).
+
+    Measures the fraction of dark pixels on a small grayscale thumbnail,
+    which tracks the amount of text on the page.
+    """
+    thumb = image.convert("L")
+    thumb.thumbnail((256, 256))
+    histogram = thumb.histogram()
+    ink = sum(histogram[:160]) / max(1, thumb.width * thumb.height)
+
+    return int(ink * _TOKENS_PER_INK_FRACTION)
+
+
+def estimate_image_output_tokens(image: Image.Image) -> int:
+    """Estimate how many output tokens a scanned page will produce."""
+    return min(MAX_OUTPUT_TOKENS, max(50, estimate_image_text_tokens(image)))
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    ASCII text averages ~4 characters per token, other alphabets (Cyrillic,
+    Greek, accented Latin) ~2.5, and CJK ideographs/kana ~1 token each.
+    """
+    ascii_chars = cjk_chars = other_chars = 0
+    for ch in text:
+        code = ord(ch)
+        if code < 128:
+            ascii_chars += 1
+        elif 0x3040 <= code <= 0x9FFF or 0xAC00 <= code <= 0xD7AF or 0xF900 <= code <= 0xFAFF:
+            cjk_chars += 1
+        else:
+            other_chars += 1
+
+    return int(ascii_chars / 4 + other_chars / 2.5 + cjk_chars)
+
+
+def estimate_image_input_tokens(width: int, height: int) -> int:
+    """
+    Vision input tokens for a high-detail image (GPT-4o accounting).
+
+    The image is scaled to fit 2048x2048, then its shortest side to 768px,
+    and billed as 85 tokens plus 170 per 512px tile.
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+def page_image_stats(page: dict) -> Tuple[int, int, int]:
+    """
+    (width, height, estimated output tokens) of a scanned page.
+
+    Pages whose image the loader keeps on disk only carry these figures as
+    "image_stats", so estimates do not read the image back.
+    """
+    if page["content"] is None:
+        return tuple(page["image_stats"])
+    image = page["content"]
+    return image.width, image.height, estimate_image_output_tokens(image)
+
+
+def estimate_page_tokens(page: dict) -> Tuple[int, int]:
+    """
+    Estimate (input_tokens, output_tokens) for translating a page or work item.
+
+    Output covers both the transcribed original and the translation.
+    """
+    if page["type"] == "image_group":
+        estimates = [estimate_page_tokens(p) for p in page["pages"]]
+        return (
+            sum(e[0] for e in estimates),
+            min(MAX_OUTPUT_TOKENS, sum(e[1] for e in estimates)),
+        )
+
+    if page["type"] == "text":
+        text_tokens = estimate_text_tokens(page["content"])
+        return (
+            PROMPT_OVERHEAD_TOKENS + text_tokens,
+            min(MAX_OUTPUT_TOKENS, 2 * text_tokens + 20),
+        )
+
+    width, height, output_tokens = page_image_stats(page)
+    return (
+        PROMPT_OVERHEAD_TOKENS + estimate_image_input_tokens(width, height),
+        output_tokens,
+    )
+
+
+def estimate_page_work(page: dict) -> float:
+    """
+    Relative duration of a translation request, for scheduling.
+
+    Generation dominates: output tokens are produced roughly an order of
+    magnitude slower than input tokens are processed. Pages of a job
+    planned with --plan carry the planner's estimate as "planned_work".
+    """
+    if "planned_work" in page:
+        return page["planned_work"]
+    input_tokens, output_tokens = estimate_page_tokens(page)
+    return output_tokens + input_tokens / 10
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    settings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    page_num INTEGER PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_status ON pages (status, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+    Page work queue in a SQLite file shared by worker processes and hosts.
+
+    Workers lease pages for a limited time, translate them and commit the
+    results. A page whose lease runs out (crashed or stalled worker) can be
+    leased again by any worker; after max_attempts failures it is marked
+    failed. Every state change is a single transaction, so the file can
+    live on a network filesystem that supports file locking. WAL mode is
+    not used because it requires shared memory on one host.
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self.timeout = timeout
+
+    @contextmanager
+    def _transaction(self):
+        # One short-lived connection per operation: safe across threads and forks
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def init(self, settings: dict, page_nums: List[int]):
+        """
+        Create the queue for a job, or add missing pages to an existing one.
+
+        Raises:
+            ValueError: If the queue already holds a job with other settings
+        """
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT settings FROM job").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO job (id, settings) VALUES (1, ?)", (json.dumps(settings),))
+            elif json.loads(row[0]) != settings:
+                raise ValueError(f"Queue {self.path} already holds a job with different settings")
+            conn.executemany(
+                "INSERT OR IGNORE INTO pages (page_num) VALUES (?)",
+                [(n,) for n in page_nums]
+            )
+
+    def settings(self) -> dict:
+        """Return the job settings stored by init()."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT settings FROM job").fetchone()
+        if row is None:
+            raise ValueError(f"Queue {self.path} has not been initialized")
+        return json.loads(row[0])
+
+    def lease(self, worker: str, lease_seconds: float, limit: int = 1,
+              max_attempts: int = 3) -> List[int]:
+        """
+        Lease up to limit pages that are pending or whose lease has expired.
+
+        Pages whose lease expired max_attempts times (e.g. they crash every
+        worker that takes them) are marked failed instead.
+
+        Returns:
+            List of leased page numbers (empty when nothing is available)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE pages SET status = ?, error = COALESCE(error, 'Lease expired') "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, LEASED, now, max_attempts)
+            )
+            page_nums = [row[0] for row in conn.execute(
+                "SELECT page_num FROM pages WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY attempts, page_num LIMIT ?",
+                (PENDING, LEASED, now, limit)
+            )]
+            conn.executemany(
+                "UPDATE pages SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE page_num = ?",
+                [(LEASED, worker, now + lease_seconds, n) for n in page_nums]
+            )
+        return page_nums
+
+    def renew(self, worker: str, lease_seconds: float) -> int:
+        """Extend every lease held by worker. Returns the number of pages renewed."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE pages SET lease_expires = ? WHERE status = ? AND worker = ?",
+                (time.time() + lease_seconds, LEASED, worker)
+            ).rowcount
+
+    def complete(self, page_num: int, worker: str, result: dict) -> bool:
+        """
+        Commit a page result.
+
+        The first result wins: a worker whose lease expired may still finish
+        after another worker has committed the page.
+
+        Returns:
+            True if the result was stored
+        """
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE pages SET status = ?, worker = ?, lease_expires = NULL, result = ?, error = NULL "
+                "WHERE page_num = ? AND status != ?",
+                (DONE, worker, json.dumps(result, ensure_ascii=False), page_num, DONE)
+            ).rowcount == 1
+
+    def fail(self, page_num: int, worker: str, error: str, max_attempts: int = 3):
+        """Release a page after an error; it is marked failed after max_attempts."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE pages SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "lease_expires = NULL, error = ? "
+                "WHERE page_num = ? AND status = ? AND worker = ?",
+                (max_attempts, FAILED, PENDING, error, page_num, LEASED, worker)
+            )
+
+    def counts(self) -> dict:
+        """Return the number of pages per status."""
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_finished(self) -> bool:
+        """True when no page is pending or leased."""
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def results(self) -> Iterator[dict]:
+        """Yield committed page results in page order."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT result FROM pages WHERE status = ? ORDER BY page_num", (DONE,)
+            ).fetchall()
+        for (result,) in rows:
+            yield json.loads(result)
+
+    def failures(self) -> List[dict]:
+        """Return {"page_num", "attempts", "error"} for pages that failed permanently."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT page_num, attempts, error FROM pages WHERE status = ? ORDER BY page_num",
+                (FAILED,)
+            ).fetchall()
+        return [{"page_num": n, "attempts": a, "error": e} for n, a, e in rows]
+
+    def release_failed(self) -> int:
+        """Put permanently failed pages back in the queue. Returns their count."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE pages SET status = ?, attempts = 0 WHERE status = ?", (PENDING, FAILED)
+            ).rowcount
+
+
+def worker_id(suffix: Optional[str] = None) -> str:
+    """Identifier of this worker: host name and process id."""
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    return f"{name}-{suffix}" if suffix else name